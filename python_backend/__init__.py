@@ -6,18 +6,47 @@ Módulo para predicción de diagnósticos médicos con balanceo SMOTE.
 __version__ = "1.0.0"
 __author__ = "DEMALE-HSJM Team"
 
-from .data_processor import DataProcessor
+from .data_processor import DataProcessor, load_class_config
 from .smote_balancing import SMOTEBalancer
-from .prediction_models import LogisticRegressionModel, NeuralNetworkModel
+from .prediction_models import (
+    LogisticRegressionModel,
+    NeuralNetworkModel,
+    FeatureMatrix,
+    register_model,
+    create_model
+)
 from .metrics_calculator import MetricsCalculator
+from .pipeline import StagePipeline
+from .threshold_sweep import ThresholdSweep
+from .progress import ProgressTracker
+from .server import PredictionServer, ProgressServer
+from .transport import decode_frame, encode_frame, encode_results
+from .load_test import LoadGenerator
+from .profiling import StageProfiler
+from .results_archive import ResultsArchive
 from .main import BatchPredictionSystem
 
 __all__ = [
     'DataProcessor',
+    'load_class_config',
     'SMOTEBalancer',
     'LogisticRegressionModel',
     'NeuralNetworkModel',
+    'FeatureMatrix',
+    'register_model',
+    'create_model',
     'MetricsCalculator',
+    'StagePipeline',
+    'ThresholdSweep',
+    'ProgressTracker',
+    'ProgressServer',
+    'PredictionServer',
+    'encode_frame',
+    'decode_frame',
+    'encode_results',
+    'LoadGenerator',
+    'StageProfiler',
+    'ResultsArchive',
     'BatchPredictionSystem'
 ]
 
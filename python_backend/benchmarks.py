@@ -0,0 +1,355 @@
+"""
+Mediciones de rendimiento y verificaciones de reproducibilidad del backend.
+
+Uso:
+    python benchmarks.py concurrencia <archivo.csv> [--jobs=4]
+    python benchmarks.py lectura <archivo.csv> [--repeat=3]
+    python benchmarks.py transporte <archivo.csv> [--repeat=3]
+    python benchmarks.py clases <archivo.csv> [--repeat=3]
+"""
+
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_processor import DEFAULT_CLASS_CONFIG, DataProcessor, derive_seed
+from main import BatchPredictionSystem, _get_option
+from prediction_models import MODEL_REGISTRY
+from transport import (
+    JSON_CONTENT_TYPE,
+    decode_frame,
+    encode_frame,
+    encode_results,
+    supported_content_types
+)
+
+
+def job_seeds(random_seed: int, n_jobs: int) -> List[int]:
+    """
+    Deriva una semilla independiente por trabajo a partir de una semilla base.
+    
+    Args:
+        random_seed: Semilla base
+        n_jobs: Cantidad de trabajos
+        
+    Returns:
+        Lista con una semilla entera por trabajo
+    """
+    return [int(derive_seed(random_seed, job).generate_state(1)[0]) for job in range(n_jobs)]
+
+
+def _run_job(job: Tuple[str, str, int]) -> Dict[str, Any]:
+    """
+    Ejecuta un trabajo completo (procesamiento balanceado y aproximado).
+    
+    Args:
+        job: Tupla con (archivo, tipo de modelo, semilla)
+        
+    Returns:
+        Diccionario con las salidas a comparar y la cantidad de registros predichos
+    """
+    file_path, model_type, random_seed = job
+    system = BatchPredictionSystem(model_type=model_type, random_seed=random_seed)
+    
+    full = system.process_file(file_path, balance_data=True)
+    approximate = system.process_file_approximate(file_path, margin_of_error=0.02)
+    
+    return {
+        'outputs': {
+            'predictions': full['predictions'],
+            'confusion_matrix': full['confusion_matrix'],
+            'approximate_metrics': approximate['metrics'],
+            'approximate_intervals': approximate['confidence_intervals']['metrics']
+        },
+        'rows': full['total_records'] + approximate['sampled_records']
+    }
+
+
+def concurrency_benchmark(
+    file_path: str,
+    n_jobs: int = 4,
+    random_seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Compara N trabajos ejecutados en serie contra los mismos trabajos en hilos.
+    
+    Cada trabajo usa su propia instancia de BatchPredictionSystem con una semilla
+    derivada de la semilla base; como ningún componente usa el estado aleatorio
+    global de NumPy, las salidas deben ser idénticas en ambos modos.
+    
+    Args:
+        file_path: Archivo CSV o Excel a procesar
+        n_jobs: Cantidad de trabajos (y de hilos)
+        random_seed: Semilla base de la que se derivan las semillas de los trabajos
+        
+    Returns:
+        Diccionario con tiempos, registros por segundo, aceleración y si las salidas
+        coinciden
+    """
+    model_types = list(MODEL_REGISTRY)
+    jobs = [
+        (file_path, model_types[job % len(model_types)], seed)
+        for job, seed in enumerate(job_seeds(random_seed, n_jobs))
+    ]
+    
+    # La salida de los trabajos se descarta: varios hilos imprimirían intercalados
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        serial = [_run_job(job) for job in jobs]
+        serial_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            parallel = list(executor.map(_run_job, jobs))
+        parallel_seconds = time.perf_counter() - start
+    
+    rows = sum(result['rows'] for result in serial)
+    mismatched = [
+        job for job, (expected, actual) in enumerate(zip(serial, parallel))
+        if expected['outputs'] != actual['outputs']
+    ]
+    
+    return {
+        'jobs': n_jobs,
+        'rows': rows,
+        'serial_seconds': serial_seconds,
+        'parallel_seconds': parallel_seconds,
+        'serial_rows_per_second': rows / serial_seconds if serial_seconds > 0 else 0.0,
+        'parallel_rows_per_second': rows / parallel_seconds if parallel_seconds > 0 else 0.0,
+        'speedup': serial_seconds / parallel_seconds if parallel_seconds > 0 else 0.0,
+        'identical': not mismatched,
+        'mismatched_jobs': mismatched
+    }
+
+
+def parse_benchmark(file_path: str, repeat: int = 3) -> List[Dict[str, Any]]:
+    """
+    Mide el tiempo y la memoria de lectura con distintas opciones de DataProcessor.
+    
+    Configuraciones: lectura por defecto de pandas, motor rápido con tipos sugeridos
+    por el esquema clínico, y además solo las columnas que usa el modelo.
+    
+    Args:
+        file_path: Archivo CSV o Excel a leer
+        repeat: Repeticiones por configuración (se informa el mejor tiempo)
+        
+    Returns:
+        Lista con una entrada por configuración
+    """
+    system = BatchPredictionSystem()
+    processor = DataProcessor(csv_engine='pyarrow')
+    _, hinted = system._read_options(file_path, None, prune_columns=False)
+    _, pruned = system._read_options(file_path, None, prune_columns=True)
+    
+    configurations = [
+        ('por defecto', lambda: pd.read_csv(file_path), 'c'),
+        ('motor + tipos', lambda: processor.load_data(file_path, **hinted), None),
+        ('motor + tipos + columnas', lambda: processor.load_data(file_path, **pruned), None)
+    ]
+    
+    report = []
+    for name, read, engine in configurations:
+        best_seconds = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            read()
+            best_seconds = min(best_seconds, time.perf_counter() - start)
+        
+        tracemalloc.start()
+        df = read()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        report.append({
+            'configuration': name,
+            'engine': engine or processor.csv_engine,
+            'seconds': best_seconds,
+            'columns': len(df.columns),
+            'frame_bytes': int(df.memory_usage(deep=True).sum()),
+            'peak_bytes': peak_bytes
+        })
+    
+    return report
+
+
+def transport_benchmark(file_path: str, repeat: int = 3) -> List[Dict[str, Any]]:
+    """
+    Compara tamaño y tiempos de codificación de los formatos de transporte.
+    
+    Mide el lote de solicitud (los registros del archivo) y el de respuesta
+    (identificador, diagnóstico real y predicción de cada registro, con métricas y
+    matriz de confusión en los metadatos), en cada formato disponible.
+    
+    Args:
+        file_path: Archivo CSV o Excel a enviar
+        repeat: Repeticiones por medición (se informa el mejor tiempo)
+        
+    Returns:
+        Lista con una entrada por formato y dirección, con tamaño, tiempos y tamaño
+        relativo a JSON
+    """
+    request_frame = DataProcessor().load_data(file_path)
+    results = BatchPredictionSystem().process_frame(request_frame)
+    
+    report = []
+    for direction, rows, encode in [
+        ('solicitud', len(request_frame), lambda content_type: encode_frame(request_frame, content_type)),
+        ('respuesta', results['total_records'], lambda content_type: encode_results(results, content_type))
+    ]:
+        for content_type in supported_content_types():
+            encode_seconds = decode_seconds = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                payload = encode(content_type)
+                encode_seconds = min(encode_seconds, time.perf_counter() - start)
+                
+                start = time.perf_counter()
+                decode_frame(payload, content_type)
+                decode_seconds = min(decode_seconds, time.perf_counter() - start)
+            
+            report.append({
+                'direction': direction,
+                'content_type': content_type,
+                'rows': rows,
+                'bytes': len(payload),
+                'encode_seconds': encode_seconds,
+                'decode_seconds': decode_seconds
+            })
+    
+    for entry in report:
+        json_entry = next(
+            other for other in report
+            if other['direction'] == entry['direction'] and other['content_type'] == JSON_CONTENT_TYPE
+        )
+        entry['size_vs_json'] = entry['bytes'] / json_entry['bytes']
+    
+    return report
+
+
+def class_scaling_benchmark(
+    file_path: str,
+    class_counts: Tuple[int, ...] = (3, 10, 50),
+    repeat: int = 3,
+    random_seed: int = 42
+) -> List[Dict[str, Any]]:
+    """
+    Mide el procesamiento balanceado de un mismo lote con distinta cantidad de clases.
+    
+    A las clases por defecto se agregan clases "Enfermedad_NN" y el diagnóstico de
+    cada registro se reasigna al azar entre todas, así que el tamaño del lote no
+    cambia. Se informa además cuántas clases compartirían semilla con la derivación
+    anterior por primera letra (todas las agregadas empiezan con "E").
+    
+    Args:
+        file_path: Archivo CSV o Excel a procesar
+        class_counts: Cantidades de clases a medir
+        repeat: Repeticiones por medición (se informa el mejor tiempo)
+        random_seed: Semilla de la reasignación de diagnósticos
+        
+    Returns:
+        Lista con una entrada por cantidad de clases
+    """
+    processor = DataProcessor()
+    frame = processor.load_data(file_path)
+    diagnosis_col = processor.resolve_diagnosis_column(frame, None)
+    
+    report = []
+    for num_classes in class_counts:
+        class_config = list(DEFAULT_CLASS_CONFIG[:num_classes]) + [
+            {'label': f"Enfermedad_{number:02d}"}
+            for number in range(len(DEFAULT_CLASS_CONFIG) + 1, num_classes + 1)
+        ]
+        labels = np.array([entry['label'] for entry in class_config], dtype=object)
+        rng = np.random.default_rng(derive_seed(random_seed, num_classes))
+        df = frame.copy()
+        df[diagnosis_col] = labels[rng.integers(num_classes, size=len(df))]
+        
+        system = BatchPredictionSystem(random_seed=random_seed, class_config=class_config)
+        best_seconds = metrics_seconds = float('inf')
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                results = system.process_frame(df, diagnosis_col, balance_data=True)
+                best_seconds = min(best_seconds, time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            metrics = system.metrics_calculator.calculate_all_metrics(results['actual'], results['predictions'])
+            system.metrics_calculator.calculate_class_metrics(np.array(metrics['confusion_matrix']))
+            metrics_seconds = min(metrics_seconds, time.perf_counter() - start)
+        
+        report.append({
+            'classes': num_classes,
+            'rows': results['total_records'],
+            'seconds': best_seconds,
+            'rows_per_second': results['total_records'] / best_seconds if best_seconds > 0 else 0.0,
+            'metrics_seconds': metrics_seconds,
+            'accuracy': results['metrics']['accuracy'],
+            'first_letter_collisions': num_classes - len({label[0] for label in labels})
+        })
+    
+    return report
+
+
+def main():
+    """Función principal."""
+    positional = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    
+    if len(positional) < 2 or positional[0] not in ("concurrencia", "lectura", "transporte", "clases"):
+        print("Uso: python benchmarks.py concurrencia <archivo.csv> [--jobs=4]")
+        print("       python benchmarks.py lectura <archivo.csv> [--repeat=3]")
+        print("       python benchmarks.py transporte <archivo.csv> [--repeat=3]")
+        print("       python benchmarks.py clases <archivo.csv> [--repeat=3]")
+        sys.exit(1)
+    
+    if positional[0] == "clases":
+        for entry in class_scaling_benchmark(positional[1], repeat=int(_get_option("repeat", "3"))):
+            print(
+                f"  • {entry['classes']} clases ({entry['rows']} registros balanceados): "
+                f"{entry['seconds']:.2f} s ({entry['rows_per_second']:.0f} registros/s), "
+                f"métricas {entry['metrics_seconds'] * 1000:.1f} ms, "
+                f"accuracy {entry['accuracy']:.1f}%, "
+                f"{entry['first_letter_collisions']} semillas repetidas con la inicial"
+            )
+        return
+    
+    if positional[0] == "transporte":
+        for entry in transport_benchmark(positional[1], repeat=int(_get_option("repeat", "3"))):
+            print(
+                f"  • {entry['direction']} {entry['content_type']} ({entry['rows']} registros): "
+                f"{entry['bytes'] / 1e6:.2f} MB ({entry['size_vs_json']:.2f}x JSON), "
+                f"codificar {entry['encode_seconds'] * 1000:.1f} ms, "
+                f"decodificar {entry['decode_seconds'] * 1000:.1f} ms"
+            )
+        return
+    
+    if positional[0] == "lectura":
+        for entry in parse_benchmark(positional[1], repeat=int(_get_option("repeat", "3"))):
+            print(
+                f"  • {entry['configuration']} ({entry['engine']}, {entry['columns']} columnas): "
+                f"{entry['seconds']:.3f} s, DataFrame {entry['frame_bytes'] / 1e6:.1f} MB, "
+                f"pico {entry['peak_bytes'] / 1e6:.1f} MB"
+            )
+        return
+    
+    report = concurrency_benchmark(positional[1], n_jobs=int(_get_option("jobs", "4")))
+    
+    print(f"Trabajos: {report['jobs']} ({report['rows']} registros predichos en total)")
+    print(f"  • En serie: {report['serial_seconds']:.2f} s ({report['serial_rows_per_second']:.0f} registros/s)")
+    print(f"  • En hilos: {report['parallel_seconds']:.2f} s ({report['parallel_rows_per_second']:.0f} registros/s)")
+    print(f"  • Aceleración: {report['speedup']:.2f}x")
+    if report['identical']:
+        print("✓ Las salidas en hilos son idénticas a las de la ejecución en serie")
+    else:
+        print(f"✗ Salidas distintas en los trabajos: {report['mismatched_jobs']}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,226 @@ Módulo para procesamiento de datos: lectura de CSV/Excel y normalización.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Iterator, Any
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Motores de lectura de CSV: 'c' es el lector de pandas; 'pyarrow' es multihilo pero
+# infiere algunos tipos de otra forma (por ejemplo, convierte las fechas)
+CSV_ENGINES = ('c', 'pyarrow')
+
+# Registros con los que se comprueba que el motor pyarrow lee igual que el de pandas
+ENGINE_CHECK_ROWS = 1000
+
+# Columna agregada al combinar las hojas de un libro Excel con varias hojas
+SOURCE_SHEET_COLUMN = "Hoja_Origen"
+
+# Clases de diagnóstico por defecto, en el orden de sus códigos: etiqueta, valores
+# numéricos que la representan y palabras clave que se buscan en el texto
+DEFAULT_CLASS_CONFIG = [
+    {'label': 'Dengue', 'codes': ['0', '1'], 'keywords': ['dengue']},
+    {'label': 'Malaria', 'codes': ['2'], 'keywords': ['malaria']},
+    {'label': 'Leptospirosis', 'codes': ['3'], 'keywords': ['leptospir']}
+]
+
+
+def label_seed(label: str) -> int:
+    """
+    Deriva la semilla de una clase a partir de su etiqueta completa.
+    
+    Usa los primeros 32 bits del MD5 de la etiqueta, así que no depende del orden
+    de las clases ni de la configuración, y dos etiquetas con la misma inicial
+    (Chikungunya y Cólera, por ejemplo) tienen semillas distintas.
+    
+    Args:
+        label: Etiqueta de la clase
+        
+    Returns:
+        Entero entre 0 y 2**32 - 1
+    """
+    return int(hashlib.md5(str(label).encode('utf-8')).hexdigest()[:8], 16)
+
+
+def normalize_class_config(classes: List[Any]) -> List[Dict[str, List[str]]]:
+    """
+    Valida y completa una configuración de clases.
+    
+    Cada clase puede ser una etiqueta o un diccionario con 'label' y, opcionalmente,
+    'codes' (valores numéricos del archivo) y 'keywords' (texto a buscar, sin
+    distinguir mayúsculas; por defecto la etiqueta en minúsculas).
+    
+    Args:
+        classes: Lista de clases, en el orden de sus códigos
+        
+    Returns:
+        Lista de diccionarios con label, codes y keywords
+        
+    Raises:
+        ValueError: Si no hay clases, o si se repiten etiquetas, códigos o semillas
+    """
+    if not classes:
+        raise ValueError("La configuración no define ninguna clase")
+    
+    config = []
+    for entry in classes:
+        if not isinstance(entry, dict):
+            entry = {'label': entry}
+        label = str(entry.get('label', '')).strip()
+        if not label:
+            raise ValueError(f"Clase sin etiqueta en la configuración: {entry}")
+        config.append({
+            'label': label,
+            'codes': [str(code).strip() for code in entry.get('codes', [])],
+            'keywords': [str(keyword).lower() for keyword in entry.get('keywords', [label.lower()])]
+        })
+    
+    for field, values in [
+        ('etiquetas', [entry['label'] for entry in config]),
+        ('claves numéricas', [code for entry in config for code in entry['codes']]),
+        ('semillas', [label_seed(entry['label']) for entry in config])
+    ]:
+        repeated = sorted({str(value) for value in values if values.count(value) > 1})
+        if repeated:
+            raise ValueError(f"Configuración de clases con {field} repetidas: {', '.join(repeated)}")
+    
+    return config
+
+
+def load_class_config(file_path: str) -> List[Dict[str, List[str]]]:
+    """
+    Lee una configuración de clases desde un archivo JSON.
+    
+    El archivo contiene una lista de clases o un objeto {"classes": [...]}, con el
+    formato de normalize_class_config.
+    
+    Args:
+        file_path: Ruta del archivo JSON
+        
+    Returns:
+        Configuración de clases validada
+        
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+        ValueError: Si el archivo no es JSON válido o la configuración no es válida
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
+    
+    try:
+        with open(file_path, encoding='utf-8') as f:
+            content = json.load(f)
+    except ValueError as e:
+        raise ValueError(f"Configuración de clases inválida: {str(e)}")
+    
+    if isinstance(content, dict):
+        content = content.get('classes', [])
+    return normalize_class_config(content)
+
+
+def frame_row_keys(
+    df: pd.DataFrame,
+    column_values: Optional[Dict[str, List[Any]]] = None
+) -> List[str]:
+    """
+    Construye para cada fila la misma cadena que str(sorted(registro.items())).
+    
+    Trabaja columna por columna, sin convertir las filas en diccionarios. La cadena
+    es la entrada de los hashes determinísticos de los modelos y del balanceo SMOTE.
+    
+    Args:
+        df: DataFrame con los registros
+        column_values: Valores por columna ya convertidos con tolist() (opcional)
+        
+    Returns:
+        Lista con una cadena por fila
+    """
+    if column_values is None:
+        column_values = {col: df[col].tolist() for col in df.columns}
+    
+    if len(df.columns) == 0:
+        return ["[]"] * len(df)
+    
+    parts = [
+        [f"({col!r}, {value!r})" for value in column_values[col]]
+        for col in sorted(df.columns)
+    ]
+    return ["[" + ", ".join(row) + "]" for row in zip(*parts)]
+
+
+def derive_seed(random_seed: int, *key: int) -> np.random.SeedSequence:
+    """
+    Deriva una semilla independiente para un trabajo o bloque.
+    
+    Usa SeedSequence con spawn_key, así que cada clave produce un flujo aleatorio
+    propio y reproducible sin depender del orden en que se procesen los bloques.
+    
+    Args:
+        random_seed: Semilla base
+        key: Identificadores del trabajo o bloque (por ejemplo número de bloque)
+        
+    Returns:
+        Secuencia de semilla para np.random.default_rng
+    """
+    return np.random.SeedSequence(random_seed, spawn_key=tuple(int(part) for part in key))
+
+
+def _read_sheets(task: Tuple) -> List[pd.DataFrame]:
+    """
+    Lee varias hojas de un libro Excel abriéndolo una sola vez.
+    
+    Se define a nivel de módulo para poder ejecutarse en un pool de procesos.
+    
+    Args:
+        task: Tupla con (ruta del archivo, nombres de las hojas, usecols, dtype)
+        
+    Returns:
+        Lista con los registros de cada hoja, en el orden pedido
+    """
+    file_path, sheet_names, usecols, dtype = task
+    with pd.ExcelFile(file_path) as workbook:
+        return [
+            pd.read_excel(workbook, sheet_name=sheet_name, usecols=usecols, dtype=dtype)
+            for sheet_name in sheet_names
+        ]
 
 
 class DataProcessor:
     """Clase para procesar datos de archivos CSV y Excel."""
     
-    def __init__(self):
-        """Inicializa el procesador de datos."""
-        self.class_labels = ["Dengue", "Malaria", "Leptospirosis"]
+    def __init__(self, class_config: Optional[List[Any]] = None, csv_engine: str = 'c'):
+        """
+        Inicializa el procesador de datos.
+        
+        Args:
+            class_config: Clases de diagnóstico (ver normalize_class_config). Por
+                defecto, DEFAULT_CLASS_CONFIG.
+            csv_engine: Motor preferido para leer los CSV completos ('c' o 'pyarrow';
+                ver _read_csv)
+            
+        Raises:
+            ValueError: Si el motor no es válido
+        """
+        if csv_engine not in CSV_ENGINES:
+            raise ValueError(f"Motor de CSV no válido: {csv_engine}. Use uno de: {', '.join(CSV_ENGINES)}")
+        self.class_config = normalize_class_config(class_config or DEFAULT_CLASS_CONFIG)
+        self.class_labels = [entry['label'] for entry in self.class_config]
+        self._numeric_map = {
+            code: entry['label'] for entry in self.class_config for code in entry['codes']
+        }
+        self._keywords = [
+            (keyword, entry['label']) for entry in self.class_config for keyword in entry['keywords']
+        ]
+        self.preferred_csv_engine = csv_engine
+        # Motor usado en la última lectura completa de un CSV
+        self.csv_engine: Optional[str] = None
     
     def normalize_diagnosis(self, value: any) -> str:
         """
@@ -31,24 +241,14 @@ class DataProcessor:
         str_value = str(value).strip()
         
         # Mapeo numérico
-        numeric_map = {
-            "0": "Dengue",
-            "1": "Dengue",
-            "2": "Malaria",
-            "3": "Leptospirosis"
-        }
-        
-        if str_value in numeric_map:
-            return numeric_map[str_value]
+        if str_value in self._numeric_map:
+            return self._numeric_map[str_value]
         
-        # Mapeo por palabras clave
+        # Mapeo por palabras clave, en el orden de la configuración
         lower_value = str_value.lower()
-        if "dengue" in lower_value:
-            return "Dengue"
-        if "malaria" in lower_value:
-            return "Malaria"
-        if "leptospir" in lower_value:
-            return "Leptospirosis"
+        for keyword, label in self._keywords:
+            if keyword in lower_value:
+                return label
         
         return str_value
     
@@ -73,12 +273,47 @@ class DataProcessor:
         
         return None
     
-    def load_data(self, file_path: str) -> pd.DataFrame:
+    def find_id_column(self, df: pd.DataFrame) -> Optional[str]:
+        """
+        Encuentra la columna con el identificador del paciente.
+        
+        Args:
+            df: DataFrame a analizar
+            
+        Returns:
+            Nombre de la columna de identificador o None
+        """
+        valid_names = [
+            "id", "paciente_id", "id_paciente", "patient_id",
+            "paciente", "historia_clinica"
+        ]
+        
+        for col in df.columns:
+            if str(col).lower() in valid_names:
+                return col
+        
+        return None
+    
+    def load_data(
+        self,
+        file_path: str,
+        usecols: Optional[List[str]] = None,
+        dtype: Optional[Dict[str, str]] = None,
+        sheet_names: Optional[List[str]] = None
+    ) -> pd.DataFrame:
         """
         Carga datos de un archivo CSV o Excel.
         
+        Los CSV se leen con el lector de pandas, o con pyarrow si se eligió ese motor
+        (ver _read_csv). Los libros Excel con varias hojas se leen completos (ver
+        _read_excel).
+        
         Args:
             file_path: Ruta del archivo
+            usecols: Columnas a leer (None lee todas)
+            dtype: Tipos sugeridos por columna (opcional)
+            sheet_names: Hojas del libro Excel ya leídas con inspect_file (opcional;
+                evita abrir el libro solo para listarlas)
             
         Returns:
             DataFrame con los datos cargados
@@ -93,9 +328,9 @@ class DataProcessor:
         
         try:
             if file_ext == '.csv':
-                df = pd.read_csv(file_path)
+                df = self._read_csv(file_path, usecols=usecols, dtype=dtype)
             elif file_ext in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_path)
+                df = self._read_excel(file_path, usecols=usecols, dtype=dtype, sheet_names=sheet_names)
             else:
                 raise ValueError(f"Formato de archivo no soportado: {file_ext}")
             
@@ -107,25 +342,230 @@ class DataProcessor:
         except Exception as e:
             raise ValueError(f"Error al leer el archivo: {str(e)}")
     
-    def process_data(
-        self, 
+    def _read_csv(self, file_path: str, **options: Any) -> pd.DataFrame:
+        """
+        Lee un CSV completo.
+        
+        Por defecto usa el lector de pandas, el mismo de read_sample e iter_chunks.
+        Con preferred_csv_engine 'pyarrow' (y pyarrow instalado) lee con ese motor,
+        pero solo conserva el resultado si los primeros ENGINE_CHECK_ROWS registros
+        tienen los mismos tipos y la misma representación que con el lector de
+        pandas: esa representación alimenta el hash de las predicciones, así que un
+        valor leído distinto (una fecha convertida, por ejemplo) las cambiaría. Si
+        difieren o pyarrow no acepta alguna opción, se usa el lector de pandas.
+        
+        Args:
+            file_path: Ruta del archivo
+            options: Opciones adicionales para read_csv
+            
+        Returns:
+            DataFrame con los datos
+        """
+        if self.preferred_csv_engine == 'pyarrow' and PYARROW_AVAILABLE:
+            try:
+                df = pd.read_csv(file_path, engine='pyarrow', **options)
+            except (ValueError, TypeError):
+                # Opción no soportada por pyarrow: se usa el lector de pandas
+                df = None
+            
+            if df is not None:
+                sample = pd.read_csv(file_path, nrows=ENGINE_CHECK_ROWS, **options)
+                head = df.iloc[:len(sample)]
+                if head.dtypes.equals(sample.dtypes) and frame_row_keys(head) == frame_row_keys(sample):
+                    self.csv_engine = 'pyarrow'
+                    return df
+        
+        df = pd.read_csv(file_path, **options)
+        self.csv_engine = 'c'
+        return df
+    
+    def _read_excel(
+        self,
         file_path: str,
-        diagnosis_column: Optional[str] = None
-    ) -> Tuple[pd.DataFrame, str, Dict[str, int]]:
+        usecols: Optional[List[str]] = None,
+        dtype: Optional[Dict[str, str]] = None,
+        sheet_names: Optional[List[str]] = None
+    ) -> pd.DataFrame:
         """
-        Procesa datos de un archivo y normaliza el diagnóstico.
+        Lee todas las hojas de un libro Excel.
+        
+        Con una sola hoja se lee directamente. Con varias, las hojas se reparten en
+        grupos consecutivos entre los procesos de un pool (cada proceso abre el libro
+        una sola vez para todas sus hojas) y se concatenan en el orden del libro,
+        agregando la columna SOURCE_SHEET_COLUMN con el nombre de la hoja de origen.
+        Las columnas que falten en alguna hoja quedan vacías en sus registros.
         
         Args:
             file_path: Ruta del archivo
-            diagnosis_column: Nombre de la columna de diagnóstico (opcional)
+            usecols: Columnas a leer (None lee todas)
+            dtype: Tipos sugeridos por columna (opcional)
+            sheet_names: Hojas del libro (None las lista abriendo el libro)
             
         Returns:
-            Tupla con (DataFrame procesado, nombre de columna de diagnóstico, conteos de clase)
+            DataFrame con los registros de todas las hojas
         """
-        # Cargar datos
-        df = self.load_data(file_path)
+        if sheet_names is None:
+            with pd.ExcelFile(file_path) as workbook:
+                sheet_names = workbook.sheet_names
         
-        # Encontrar columna de diagnóstico
+        if len(sheet_names) <= 1:
+            return pd.read_excel(file_path, usecols=usecols, dtype=dtype)
+        
+        max_workers = min(len(sheet_names), os.cpu_count() or 1)
+        if max_workers > 1:
+            bounds = [len(sheet_names) * worker // max_workers for worker in range(max_workers + 1)]
+            tasks = [
+                (file_path, sheet_names[start:stop], usecols, dtype)
+                for start, stop in zip(bounds, bounds[1:])
+            ]
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                sheets = [sheet for group in executor.map(_read_sheets, tasks) for sheet in group]
+        else:
+            # Con un solo procesador el pool solo agrega costo
+            sheets = _read_sheets((file_path, sheet_names, usecols, dtype))
+        
+        for sheet_name, sheet in zip(sheet_names, sheets):
+            sheet[SOURCE_SHEET_COLUMN] = sheet_name
+        
+        return pd.concat(sheets, ignore_index=True)
+    
+    def get_sheet_counts(self, df: pd.DataFrame) -> Dict[str, int]:
+        """
+        Cuenta los registros de cada hoja de origen.
+        
+        Args:
+            df: DataFrame leído de un libro Excel
+            
+        Returns:
+            Diccionario hoja -> cantidad de registros (vacío si hay una sola hoja)
+        """
+        if SOURCE_SHEET_COLUMN not in df.columns:
+            return {}
+        
+        return {
+            str(sheet): int(count)
+            for sheet, count in df[SOURCE_SHEET_COLUMN].value_counts(sort=False).items()
+        }
+    
+    def read_sample(
+        self,
+        file_path: str,
+        n_rows: int = 1000,
+        usecols: Optional[List[str]] = None,
+        dtype: Optional[Dict[str, str]] = None
+    ) -> pd.DataFrame:
+        """
+        Lee los primeros registros de un archivo (para inspeccionar columnas y tipos).
+        
+        Args:
+            file_path: Ruta del archivo
+            n_rows: Cantidad de registros a leer
+            usecols: Columnas a leer (None lee todas)
+            dtype: Tipos sugeridos por columna (opcional)
+            
+        Returns:
+            DataFrame con los primeros registros
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"El archivo {file_path} no existe")
+        
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext == '.csv':
+            return pd.read_csv(file_path, nrows=n_rows, usecols=usecols, dtype=dtype)
+        
+        return pd.read_excel(file_path, nrows=n_rows, usecols=usecols, dtype=dtype)
+    
+    def inspect_file(
+        self,
+        file_path: str,
+        n_rows: int = 1000
+    ) -> Tuple[pd.DataFrame, Optional[List[str]]]:
+        """
+        Lee los primeros registros y, en los libros Excel, los nombres de las hojas.
+        
+        Un libro Excel se abre una sola vez para ambas cosas; los nombres se pasan
+        después a load_data o iter_chunks para no volver a abrirlo solo para listarlos.
+        
+        Args:
+            file_path: Ruta del archivo
+            n_rows: Cantidad de registros a leer
+            
+        Returns:
+            Tupla con (primeros registros, hojas del libro o None si es un CSV)
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"El archivo {file_path} no existe")
+        
+        if os.path.splitext(file_path)[1].lower() == '.csv':
+            return pd.read_csv(file_path, nrows=n_rows), None
+        
+        with pd.ExcelFile(file_path) as workbook:
+            sheet_names = list(workbook.sheet_names)
+            sample = pd.read_excel(workbook, sheet_name=sheet_names[0], nrows=n_rows)
+        return sample, sheet_names
+    
+    def count_rows(self, file_path: str) -> int:
+        """
+        Cuenta los registros de un archivo sin cargarlo en un DataFrame.
+        
+        En los CSV se cuentan los saltos de línea leyendo el archivo en bloques
+        binarios (un campo entre comillas con saltos de línea cuenta de más). En los
+        libros Excel se suman las dimensiones declaradas de todas las hojas.
+        
+        Args:
+            file_path: Ruta del archivo
+            
+        Returns:
+            Cantidad de registros (sin encabezados)
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"El archivo {file_path} no existe")
+        
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext == '.csv':
+            lines = 0
+            last_byte = b'\n'
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    lines += block.count(b'\n')
+                    last_byte = block[-1:]
+            if last_byte != b'\n':
+                # Última línea sin salto de línea final
+                lines += 1
+            return max(0, lines - 1)
+        
+        from openpyxl import load_workbook
+        
+        workbook = load_workbook(file_path, read_only=True)
+        try:
+            rows = 0
+            for sheet in workbook.worksheets:
+                if sheet.max_row is None:
+                    # Hoja sin dimensión declarada: se recorre para calcularla
+                    sheet.calculate_dimension(force=True)
+                rows += max(0, (sheet.max_row or 0) - 1)
+            return rows
+        finally:
+            workbook.close()
+    
+    def resolve_diagnosis_column(
+        self,
+        df: pd.DataFrame,
+        diagnosis_column: Optional[str] = None
+    ) -> str:
+        """
+        Determina y valida la columna de diagnóstico del DataFrame.
+        
+        Args:
+            df: DataFrame (o solo su encabezado) a analizar
+            diagnosis_column: Nombre de la columna de diagnóstico (opcional)
+            
+        Returns:
+            Nombre de la columna de diagnóstico
+            
+        Raises:
+            ValueError: Si la columna no se encuentra
+        """
         if diagnosis_column is None:
             diagnosis_column = self.find_diagnosis_column(df)
         
@@ -138,17 +578,292 @@ class DataProcessor:
         if diagnosis_column not in df.columns:
             raise ValueError(f"La columna '{diagnosis_column}' no existe en el archivo")
         
-        # Normalizar diagnósticos
-        df[diagnosis_column] = df[diagnosis_column].apply(self.normalize_diagnosis)
+        return diagnosis_column
+    
+    def prepare_frame(self, df: pd.DataFrame, diagnosis_column: str) -> pd.DataFrame:
+        """
+        Normaliza el diagnóstico y descarta los registros con clases no válidas.
+        
+        Args:
+            df: DataFrame con los datos cargados
+            diagnosis_column: Nombre de la columna de diagnóstico
+            
+        Returns:
+            DataFrame filtrado con diagnósticos normalizados
+        """
+        df[diagnosis_column] = self.normalize_diagnoses(df[diagnosis_column])
+        return df[df[diagnosis_column].isin(self.class_labels)]
+    
+    def normalize_diagnoses(self, values: pd.Series) -> pd.Series:
+        """
+        Normaliza una columna de diagnósticos evaluando cada valor distinto una vez.
+        
+        Args:
+            values: Columna de diagnósticos
+            
+        Returns:
+            Serie con los diagnósticos normalizados (mismo índice)
+        """
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        # Una posición extra al final para los faltantes (código -1)
+        normalized = np.array(
+            [self.normalize_diagnosis(value) for value in uniques.tolist()] + [""],
+            dtype=object
+        )
+        return pd.Series(normalized[codes], index=values.index)
+    
+    def encode_labels(self, labels: Any) -> np.ndarray:
+        """
+        Convierte diagnósticos en códigos de clase (posición en class_labels).
+        
+        Args:
+            labels: Diagnósticos normalizados
+            
+        Returns:
+            Arreglo de enteros; -1 para los diagnósticos fuera de class_labels
+        """
+        return pd.Index(self.class_labels).get_indexer(pd.Index(labels, dtype=object))
+    
+    def read_header(self, file_path: str) -> pd.DataFrame:
+        """
+        Lee solo el encabezado de un archivo, sin cargar los registros.
+        
+        Args:
+            file_path: Ruta del archivo
+            
+        Returns:
+            DataFrame vacío con las columnas del archivo
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"El archivo {file_path} no existe")
+        
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext == '.csv':
+            return pd.read_csv(file_path, nrows=0)
+        
+        # Encabezados de todas las hojas con una sola apertura del libro, con las
+        # mismas columnas que tendría el libro cargado con load_data
+        with pd.ExcelFile(file_path) as workbook:
+            headers = [
+                pd.read_excel(workbook, sheet_name=sheet_name, nrows=0)
+                for sheet_name in workbook.sheet_names
+            ]
+        if len(headers) <= 1:
+            return headers[0] if headers else pd.DataFrame()
+        return pd.concat(headers).assign(**{SOURCE_SHEET_COLUMN: pd.Series(dtype=object)})
+    
+    def iter_chunks(
+        self,
+        file_path: str,
+        diagnosis_column: str,
+        chunk_size: int = 10000,
+        usecols: Optional[List[str]] = None,
+        dtype: Optional[Dict[str, str]] = None,
+        sheet_names: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lee el archivo por bloques y entrega cada bloque ya normalizado y filtrado.
+        
+        Los archivos CSV se leen de forma incremental; los archivos Excel no admiten
+        lectura por bloques, por lo que se cargan completos y se dividen en memoria.
+        El índice de cada bloque conserva la posición del registro en el archivo.
+        
+        Args:
+            file_path: Ruta del archivo
+            diagnosis_column: Nombre de la columna de diagnóstico
+            chunk_size: Cantidad de registros por bloque
+            usecols: Columnas a leer (None lee todas)
+            dtype: Tipos sugeridos por columna (opcional)
+            sheet_names: Hojas del libro Excel ya leídas con inspect_file (opcional)
+            
+        Yields:
+            DataFrames con los registros válidos de cada bloque
+        """
+        file_ext = os.path.splitext(file_path)[1].lower()
+        
+        if file_ext == '.csv':
+            try:
+                reader = pd.read_csv(file_path, chunksize=chunk_size, usecols=usecols, dtype=dtype)
+            except Exception as e:
+                raise ValueError(f"Error al leer el archivo: {str(e)}")
+            
+            with reader:
+                for chunk in reader:
+                    yield self.prepare_frame(chunk, diagnosis_column)
+            return
+        
+        df = self.load_data(file_path, usecols=usecols, dtype=dtype, sheet_names=sheet_names)
+        for start in range(0, len(df), chunk_size):
+            yield self.prepare_frame(df.iloc[start:start + chunk_size].copy(), diagnosis_column)
+    
+    def process_data(
+        self, 
+        file_path: str,
+        diagnosis_column: Optional[str] = None,
+        usecols: Optional[List[str]] = None,
+        dtype: Optional[Dict[str, str]] = None,
+        sheet_names: Optional[List[str]] = None
+    ) -> Tuple[pd.DataFrame, str, Dict[str, int]]:
+        """
+        Procesa datos de un archivo y normaliza el diagnóstico.
+        
+        Args:
+            file_path: Ruta del archivo
+            diagnosis_column: Nombre de la columna de diagnóstico (opcional)
+            usecols: Columnas a leer (None lee todas; debe incluir el diagnóstico)
+            dtype: Tipos sugeridos por columna (opcional)
+            sheet_names: Hojas del libro Excel ya leídas con inspect_file (opcional)
+            
+        Returns:
+            Tupla con (DataFrame procesado, nombre de columna de diagnóstico, conteos de clase)
+        """
+        # Cargar datos
+        df = self.load_data(file_path, usecols=usecols, dtype=dtype, sheet_names=sheet_names)
+        
+        # Encontrar columna de diagnóstico
+        diagnosis_column = self.resolve_diagnosis_column(df, diagnosis_column)
         
-        # Filtrar solo diagnósticos válidos
-        df = df[df[diagnosis_column].isin(self.class_labels)]
+        # Normalizar diagnósticos y filtrar solo diagnósticos válidos
+        df = self.prepare_frame(df, diagnosis_column)
         
         # Contar clases
         class_counts = df[diagnosis_column].value_counts().to_dict()
         
         return df, diagnosis_column, class_counts
     
+    def count_classes(
+        self,
+        file_path: str,
+        diagnosis_column: str,
+        chunk_size: int = 100000
+    ) -> Dict[str, int]:
+        """
+        Cuenta los registros válidos de cada clase leyendo solo la columna de diagnóstico.
+        
+        Args:
+            file_path: Ruta del archivo
+            diagnosis_column: Nombre de la columna de diagnóstico
+            chunk_size: Cantidad de registros por bloque de lectura
+            
+        Returns:
+            Diccionario clase -> cantidad de registros
+        """
+        class_counts: Dict[str, int] = {}
+        for chunk in self.iter_chunks(file_path, diagnosis_column, chunk_size, usecols=[diagnosis_column]):
+            for label, count in chunk[diagnosis_column].value_counts().items():
+                class_counts[label] = class_counts.get(label, 0) + int(count)
+        
+        return class_counts
+    
+    def reservoir_sample(
+        self,
+        file_path: str,
+        diagnosis_column: str,
+        sample_size: int,
+        chunk_size: int = 100000,
+        random_seed: int = 42
+    ) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """
+        Toma una muestra aleatoria por clase leyendo el archivo una sola vez.
+        
+        Cada registro recibe una clave aleatoria y, por clase, se conservan los
+        sample_size registros con las claves más pequeñas (muestreo de reservorio),
+        así que la memoria depende del tamaño de muestra y del bloque, no del archivo.
+        La muestra se devuelve ordenada por clave: cualquier prefijo de una clase es
+        también una muestra aleatoria simple de esa clase. El índice conserva la
+        posición del registro en el archivo.
+        
+        Args:
+            file_path: Ruta del archivo
+            diagnosis_column: Nombre de la columna de diagnóstico
+            sample_size: Cantidad máxima de registros por clase
+            chunk_size: Cantidad de registros leídos por bloque
+            random_seed: Semilla de las claves aleatorias
+            
+        Returns:
+            Tupla con (muestra, conteos de clase en el archivo completo)
+        """
+        if sample_size < 1:
+            raise ValueError("El tamaño de muestra debe ser al menos 1")
+        
+        reservoirs: Dict[str, Tuple[pd.DataFrame, np.ndarray]] = {}
+        class_counts = {label: 0 for label in self.class_labels}
+        
+        chunks = self.iter_chunks(file_path, diagnosis_column, chunk_size)
+        for chunk_number, chunk in enumerate(chunks):
+            codes = self.encode_labels(chunk[diagnosis_column])
+            # Claves de cada bloque con su propio generador derivado de la semilla
+            keys = np.random.default_rng(derive_seed(random_seed, chunk_number)).random(len(chunk))
+            
+            # Solo las clases presentes en el bloque, en el orden de class_labels
+            for code in np.unique(codes[codes >= 0]).tolist():
+                label = self.class_labels[code]
+                mask = codes == code
+                count = int(mask.sum())
+                class_counts[label] += count
+                
+                rows, row_keys = chunk[mask], keys[mask]
+                if label in reservoirs:
+                    rows = pd.concat([reservoirs[label][0], rows])
+                    row_keys = np.concatenate([reservoirs[label][1], row_keys])
+                
+                if len(row_keys) > sample_size:
+                    keep = np.argpartition(row_keys, sample_size - 1)[:sample_size]
+                    rows, row_keys = rows.iloc[keep], row_keys[keep]
+                reservoirs[label] = (rows, row_keys)
+        
+        parts = []
+        for label in self.class_labels:
+            if label in reservoirs:
+                rows, row_keys = reservoirs[label]
+                parts.append(rows.iloc[np.argsort(row_keys, kind='stable')])
+        
+        if not parts:
+            raise ValueError("El archivo no contiene registros con diagnósticos válidos")
+        
+        class_counts = {label: count for label, count in class_counts.items() if count > 0}
+        return pd.concat(parts), class_counts
+    
+    def stratified_folds(
+        self,
+        df: pd.DataFrame,
+        diagnosis_column: str,
+        n_folds: int = 5,
+        random_seed: int = 42
+    ) -> List[np.ndarray]:
+        """
+        Divide los registros en pliegues estratificados por diagnóstico.
+        
+        Los registros de cada clase se barajan y se reparten de forma circular entre
+        los pliegues, de modo que cada pliegue conserva la proporción de clases.
+        
+        Args:
+            df: DataFrame con los datos
+            diagnosis_column: Nombre de la columna de diagnóstico
+            n_folds: Cantidad de pliegues
+            random_seed: Semilla para el barajado
+            
+        Returns:
+            Lista con las posiciones (no etiquetas de índice) de cada pliegue
+        """
+        if n_folds < 2:
+            raise ValueError("Se necesitan al menos 2 pliegues")
+        
+        rng = np.random.default_rng(random_seed)
+        labels = df[diagnosis_column].to_numpy()
+        folds = [[] for _ in range(n_folds)]
+        offset = 0
+        
+        for label in self.class_labels:
+            positions = np.flatnonzero(labels == label)
+            rng.shuffle(positions)
+            for i, position in enumerate(positions):
+                folds[(offset + i) % n_folds].append(position)
+            # Continuar la rotación para no cargar siempre los primeros pliegues
+            offset += len(positions)
+        
+        return [np.sort(np.array(fold, dtype=int)) for fold in folds]
+    
     def get_class_distribution(self, df: pd.DataFrame, diagnosis_column: str) -> Dict[str, int]:
         """
         Obtiene la distribución de clases.
@@ -0,0 +1,400 @@
+"""
+Generador de carga para el backend de predicción.
+
+El generador y el cliente HTTP con cuerpos JSON usan solo la biblioteca estándar;
+pandas solo se necesita para el destino en proceso y el formato columnar.
+
+Envía pacientes sintéticos en solicitudes individuales y por lotes, con una
+concurrencia fija (lazo cerrado) o a una tasa objetivo (lazo abierto), contra el
+servidor de predicción por HTTP o directamente contra BatchPredictionSystem, e
+informa en JSON el rendimiento, las latencias p50/p95/p99 y los errores.
+
+Uso:
+    python load_test.py [--target=inproc|http] [--url=http://127.0.0.1:8766]
+                        [--concurrency=4 | --rate=50] [--duration=10]
+                        [--batch-size=100] [--batch-ratio=0.2]
+                        [--format=json|columnar] [--model=logistic] [--output=reporte.json]
+
+Con --target=http y sin --url se inicia un servidor de predicción local en un
+puerto libre durante la prueba.
+"""
+
+import json
+import math
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+# Etiquetas y ciudades de los pacientes sintéticos
+SYNTHETIC_LABELS = ("Dengue", "Malaria", "Leptospirosis")
+SYNTHETIC_CITIES = ("Cali", "Medellín", "Bogotá", "Barranquilla", "Cartagena")
+
+# Solicitud: (registros, aplicar balanceo); debe lanzar una excepción si falla
+Target = Callable[[List[Dict[str, Any]], bool], None]
+
+
+def synthetic_patients(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """
+    Genera pacientes con las columnas clínicas que usan los modelos.
+    
+    Args:
+        count: Cantidad de pacientes
+        rng: Generador aleatorio (la misma semilla produce los mismos pacientes)
+        
+    Returns:
+        Lista de registros (uno por paciente)
+    """
+    return [
+        {
+            "ID": rng.randrange(1, 10_000_000),
+            "Plaquetas": rng.randint(20, 450),
+            "Temperatura": round(rng.uniform(36.0, 40.5), 1),
+            "Hemoglobina": round(rng.uniform(8.0, 17.0), 1),
+            "Fiebre": rng.choice(("Sí", "No")),
+            "Dolor_Cabeza": rng.choice(("Sí", "No")),
+            "Edad": rng.randint(1, 90),
+            "Ciudad": rng.choice(SYNTHETIC_CITIES),
+            "Diagnóstico": rng.choice(SYNTHETIC_LABELS)
+        }
+        for _ in range(count)
+    ]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Percentil por rango más cercano.
+    
+    Args:
+        sorted_values: Valores ordenados de menor a mayor
+        fraction: Percentil entre 0 y 1 (0.95 = p95)
+        
+    Returns:
+        Valor del percentil (0.0 si no hay valores)
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    """
+    Resume latencias en segundos como milisegundos.
+    
+    Args:
+        latencies: Latencias de las solicitudes completadas
+        
+    Returns:
+        Diccionario con p50, p95, p99, media y máximo en milisegundos
+    """
+    ordered = sorted(latencies)
+    return {
+        'p50_ms': percentile(ordered, 0.50) * 1000,
+        'p95_ms': percentile(ordered, 0.95) * 1000,
+        'p99_ms': percentile(ordered, 0.99) * 1000,
+        'mean_ms': (sum(ordered) / len(ordered) * 1000) if ordered else 0.0,
+        'max_ms': (ordered[-1] * 1000) if ordered else 0.0
+    }
+
+
+class InProcessTarget:
+    """Envía las solicitudes directamente a BatchPredictionSystem.process_frame."""
+    
+    def __init__(self, model_type: str = "logistic", random_seed: int = 42):
+        """
+        Inicializa el destino. Cada hilo usa su propia instancia del sistema.
+        
+        Args:
+            model_type: Tipo de modelo registrado
+            random_seed: Semilla del sistema de predicción
+        """
+        self.model_type = model_type
+        self.random_seed = random_seed
+        self._local = threading.local()
+    
+    def __call__(self, records: List[Dict[str, Any]], balance_data: bool):
+        system = getattr(self._local, 'system', None)
+        if system is None:
+            # Importación diferida: el modo HTTP no necesita pandas en el cliente
+            from main import BatchPredictionSystem
+            system = self._local.system = BatchPredictionSystem(
+                model_type=self.model_type,
+                random_seed=self.random_seed
+            )
+        
+        import pandas as pd
+        system.process_frame(pd.DataFrame.from_records(records), balance_data=balance_data)
+
+
+class HTTPTarget:
+    """Envía las solicitudes a POST /predict de un servidor de predicción."""
+    
+    def __init__(self, url: str, payload_format: str = "json", timeout: float = 60.0):
+        """
+        Inicializa el destino.
+        
+        Args:
+            url: URL base del servidor (por ejemplo http://127.0.0.1:8766)
+            payload_format: 'json' (biblioteca estándar) o 'columnar' (usa transport)
+            timeout: Tiempo máximo por solicitud en segundos
+        """
+        if payload_format not in ("json", "columnar"):
+            raise ValueError(f"Formato no válido: {payload_format}. Use json o columnar")
+        
+        self.url = url.rstrip('/')
+        self.payload_format = payload_format
+        self.timeout = timeout
+    
+    def __call__(self, records: List[Dict[str, Any]], balance_data: bool):
+        if self.payload_format == "columnar":
+            import pandas as pd
+            from transport import COLUMNAR_CONTENT_TYPE, encode_frame
+            content_type = COLUMNAR_CONTENT_TYPE
+            body = encode_frame(pd.DataFrame.from_records(records), content_type)
+        else:
+            content_type = "application/json"
+            body = json.dumps({'records': records}).encode('utf-8')
+        
+        request = urllib.request.Request(
+            f"{self.url}/predict?balance={'true' if balance_data else 'false'}",
+            data=body,
+            headers={'Content-Type': content_type, 'Accept': content_type},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class LoadGenerator:
+    """Genera carga mixta de solicitudes individuales y por lotes."""
+    
+    def __init__(
+        self,
+        target: Target,
+        batch_size: int = 100,
+        batch_ratio: float = 0.2,
+        random_seed: int = 42
+    ):
+        """
+        Inicializa el generador.
+        
+        Args:
+            target: Destino de las solicitudes (InProcessTarget, HTTPTarget o similar)
+            batch_size: Pacientes por solicitud por lotes
+            batch_ratio: Fracción de solicitudes que son lotes (el resto son de un
+                paciente, sin balanceo)
+            random_seed: Semilla de los pacientes y de la mezcla de solicitudes
+        """
+        self.target = target
+        self.batch_size = batch_size
+        self.batch_ratio = batch_ratio
+        self.random_seed = random_seed
+        
+        self._lock = threading.Lock()
+        self._samples: List[Dict[str, Any]] = []
+        self._next_index = 0
+    
+    def run_concurrency(self, concurrency: int, duration: float) -> Dict[str, Any]:
+        """
+        Lazo cerrado: cada trabajador envía una solicitud apenas termina la anterior.
+        
+        Args:
+            concurrency: Cantidad de solicitudes simultáneas
+            duration: Duración de la prueba en segundos
+            
+        Returns:
+            Reporte de la prueba (ver _report)
+        """
+        self._reset()
+        deadline = time.perf_counter() + duration
+        
+        def worker():
+            while time.perf_counter() < deadline:
+                self._send(self._take_index(), time.perf_counter())
+        
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        return self._report('concurrency', {'concurrency': concurrency}, time.perf_counter() - start)
+    
+    def run_rate(self, rate: float, duration: float, max_in_flight: int = 64) -> Dict[str, Any]:
+        """
+        Lazo abierto: las solicitudes salen a intervalos fijos, terminen o no las
+        anteriores.
+        
+        La latencia se mide desde el momento programado de cada solicitud, así que
+        incluye la espera cuando el destino no da abasto (evita la omisión
+        coordinada).
+        
+        Args:
+            rate: Solicitudes por segundo
+            duration: Duración de la prueba en segundos
+            max_in_flight: Máximo de solicitudes en curso a la vez
+            
+        Returns:
+            Reporte de la prueba (ver _report)
+        """
+        self._reset()
+        total = max(1, int(rate * duration))
+        start = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for index in range(total):
+                scheduled = start + index / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._send, self._take_index(), scheduled)
+        
+        return self._report('rate', {'target_rate': rate}, time.perf_counter() - start)
+    
+    def _reset(self):
+        with self._lock:
+            self._samples = []
+            self._next_index = 0
+    
+    def _take_index(self) -> int:
+        with self._lock:
+            index = self._next_index
+            self._next_index += 1
+            return index
+    
+    def _send(self, index: int, started: float):
+        """Envía la solicitud número index y registra su latencia o su error."""
+        # Cada solicitud tiene su propio generador: el contenido no depende del hilo
+        rng = random.Random(self.random_seed * 1_000_003 + index)
+        is_batch = rng.random() < self.batch_ratio
+        records = synthetic_patients(self.batch_size if is_batch else 1, rng)
+        
+        error = None
+        try:
+            self.target(records, is_batch)
+        except urllib.error.HTTPError as e:
+            error = f"HTTP {e.code}"
+        except Exception as e:
+            error = type(e).__name__
+        
+        with self._lock:
+            self._samples.append({
+                'kind': 'batch' if is_batch else 'single',
+                'patients': len(records),
+                'latency': time.perf_counter() - started,
+                'error': error
+            })
+    
+    def _report(self, mode: str, settings: Dict[str, Any], elapsed: float) -> Dict[str, Any]:
+        """
+        Construye el reporte de la prueba.
+        
+        Returns:
+            Diccionario con modo y parámetros, duración, solicitudes, errores por
+            tipo, solicitudes y pacientes por segundo, y latencias global y por tipo
+            de solicitud (solo de las solicitudes sin error)
+        """
+        with self._lock:
+            samples = list(self._samples)
+        
+        def section(selected: List[Dict[str, Any]]) -> Dict[str, Any]:
+            succeeded = [sample for sample in selected if sample['error'] is None]
+            errors: Dict[str, int] = {}
+            for sample in selected:
+                if sample['error'] is not None:
+                    errors[sample['error']] = errors.get(sample['error'], 0) + 1
+            
+            return {
+                'requests': len(selected),
+                'errors': len(selected) - len(succeeded),
+                'error_types': errors,
+                'throughput_rps': len(succeeded) / elapsed if elapsed > 0 else 0.0,
+                'patients_per_second': (
+                    sum(sample['patients'] for sample in succeeded) / elapsed if elapsed > 0 else 0.0
+                ),
+                'latency': summarize_latencies([sample['latency'] for sample in succeeded])
+            }
+        
+        report = {
+            'mode': mode,
+            **settings,
+            'batch_size': self.batch_size,
+            'batch_ratio': self.batch_ratio,
+            'duration_seconds': elapsed,
+            **section(samples),
+            'by_kind': {
+                kind: section([sample for sample in samples if sample['kind'] == kind])
+                for kind in ('single', 'batch')
+            }
+        }
+        return report
+
+
+def _get_option(name: str, default: Optional[str]) -> Optional[str]:
+    """Obtiene el valor de una opción --nombre=valor de la línea de comandos."""
+    prefix = f"--{name}="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return arg[len(prefix):]
+    return default
+
+
+def main():
+    """Función principal."""
+    if "--help" in sys.argv or "-h" in sys.argv:
+        print(__doc__.split("Uso:")[1])
+        return
+    
+    target_name = _get_option("target", "inproc")
+    url = _get_option("url", None)
+    duration = float(_get_option("duration", "10"))
+    rate = _get_option("rate", None)
+    concurrency = int(_get_option("concurrency", "4"))
+    model_type = _get_option("model", "logistic")
+    output_path = _get_option("output", None)
+    
+    server = None
+    if target_name == "inproc":
+        target = InProcessTarget(model_type=model_type)
+    elif target_name == "http":
+        if url is None:
+            from main import BatchPredictionSystem
+            from server import PredictionServer
+            server = PredictionServer(BatchPredictionSystem(model_type=model_type), port=0).start()
+            url = server.url
+        target = HTTPTarget(url, payload_format=_get_option("format", "json"))
+    else:
+        print(f"Error: Destino '{target_name}' no válido. Use inproc o http")
+        sys.exit(1)
+    
+    generator = LoadGenerator(
+        target,
+        batch_size=int(_get_option("batch-size", "100")),
+        batch_ratio=float(_get_option("batch-ratio", "0.2"))
+    )
+    
+    try:
+        if rate is not None:
+            report = generator.run_rate(float(rate), duration)
+        else:
+            report = generator.run_concurrency(concurrency, duration)
+    finally:
+        if server is not None:
+            server.stop()
+    
+    report['target'] = target_name if target_name == "inproc" else url
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if output_path is not None:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,133 +5,662 @@ Integra todos los módulos: procesamiento de datos, balanceo SMOTE, predicción
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import sys
 import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
 
 # Importar módulos locales
-from data_processor import DataProcessor
+from data_processor import CSV_ENGINES, DataProcessor, load_class_config
 from smote_balancing import SMOTEBalancer
-from prediction_models import LogisticRegressionModel, NeuralNetworkModel
+from prediction_models import FeatureMatrix, MODEL_REGISTRY, create_model, clinical_dtypes
 from metrics_calculator import MetricsCalculator
+from pipeline import StagePipeline
+from memory_budget import MemoryTracker, current_memory_bytes, estimate_mode_peaks, select_mode
+from profiling import PROFILE_MODES, StageProfiler
+from progress import ProgressTracker
+from results_archive import ResultsArchive
+from server import PredictionServer, ProgressServer
+from threshold_sweep import ThresholdSweep
 
 
 class BatchPredictionSystem:
     """Sistema completo de predicción por lotes."""
     
-    def __init__(self, model_type: str = "logistic", random_seed: int = 42):
+    def __init__(
+        self,
+        model_type: str = "logistic",
+        random_seed: int = 42,
+        memory_budget_mb: Optional[float] = None,
+        class_config: Optional[List] = None,
+        csv_engine: str = 'c'
+    ):
         """
         Inicializa el sistema de predicción.
         
         Args:
-            model_type: Tipo de modelo ("logistic" o "neural")
+            model_type: Tipo de modelo registrado ("logistic", "neural", ...)
             random_seed: Semilla para reproducibilidad
+            memory_budget_mb: Pico de memoria permitido para el proceso en MB. Si la
+                estimación de un archivo lo supera, process_file pasa al modo diferido
+                (ver estimate_memory). None = sin límite. El pico real informado
+                es el del proceso: solo es válido si se procesa un archivo a la vez.
+            class_config: Clases de diagnóstico (ver load_class_config). None = las
+                clases por defecto (Dengue, Malaria y Leptospirosis).
+            csv_engine: Motor para leer los CSV completos ('c' o 'pyarrow'; ver
+                DataProcessor._read_csv)
         """
         self.model_type = model_type
         self.random_seed = random_seed
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024) if memory_budget_mb is not None else None
         
         # Inicializar componentes
-        self.data_processor = DataProcessor()
+        self.data_processor = DataProcessor(class_config, csv_engine=csv_engine)
+        self.class_config = self.data_processor.class_config
         self.smote_balancer = SMOTEBalancer(random_seed=random_seed)
         
-        if model_type == "logistic":
-            self.prediction_model = LogisticRegressionModel(random_seed=random_seed)
-        elif model_type == "neural":
-            self.prediction_model = NeuralNetworkModel(random_seed=random_seed)
-        else:
-            raise ValueError(f"Tipo de modelo no válido: {model_type}")
-        
         self.class_labels = self.data_processor.class_labels
+        self.prediction_model = self._create_model(model_type)
         self.metrics_calculator = MetricsCalculator(self.class_labels)
     
     def process_file(
         self,
         file_path: str,
         diagnosis_column: str = None,
-        balance_data: bool = True
+        balance_data: bool = True,
+        confidence_intervals: bool = False,
+        lazy: bool = False,
+        block_size: int = 10000,
+        progress: Optional[ProgressTracker] = None,
+        prune_columns: bool = False,
+        memory_plan: Optional[Dict] = None,
+        profile: Optional[StageProfiler] = None
     ) -> Dict:
         """
         Procesa un archivo completo y realiza predicciones.
         
+        En modo diferido (lazy) el dataset balanceado no se materializa: SMOTE genera
+        los registros por bloques y cada bloque se predice apenas se genera. Los
+        resultados son idénticos a los del modo normal.
+        
+        Con progress, la predicción se hace siempre por bloques para reportar el avance
+        después de cada uno. Si se cancela, se deja de predecir entre bloques y las
+        métricas se calculan con los registros ya predichos (results['cancelled']).
+        
+        Si hay un presupuesto de memoria (o se indica memory_plan), antes de cargar el
+        archivo se estima el pico de memoria (estimate_memory) y, si el modo normal no
+        cabe, se usa el modo diferido. El pico estimado y el real quedan en
+        results['memory']. Sin presupuesto no se estima nada.
+        
+        Con profile, cada etapa (carga, balanceo, prediccion, metricas) se perfila por
+        separado y el resumen de las funciones más costosas queda en
+        results['profile']. En modo diferido, la generación SMOTE ocurre dentro de la
+        etapa de predicción. Si una etapa falla, el perfilador se detiene igual.
+        
         Args:
             file_path: Ruta del archivo CSV o Excel
             diagnosis_column: Nombre de la columna de diagnóstico (opcional)
             balance_data: Si True, aplica balanceo SMOTE
+            confidence_intervals: Si True, agrega intervalos de confianza bootstrap
+            lazy: Si True, balancea y predice por bloques
+            block_size: Cantidad de registros por bloque (modo diferido o con progress)
+            progress: Seguimiento del avance y de la cancelación (opcional)
+            prune_columns: Si True, lee solo el diagnóstico y las columnas que usa el
+                modelo. Las columnas descartadas dejan de formar parte del hash de cada
+                registro, así que las predicciones pueden cambiar.
+            memory_plan: Estimación de memoria ya calculada con estimate_memory
+                (opcional; si no se indica y hay presupuesto, se calcula)
+            profile: Perfilador por etapas (opcional)
             
         Returns:
             Diccionario con resultados completos
         """
         print(f"\n{'='*60}")
         print(f"PROCESANDO ARCHIVO: {file_path}")
-        print(f"Modelo: {'Regresión Logística' if self.model_type == 'logistic' else 'Red Neuronal'}")
+        print(f"Modelo: {self.prediction_model.display_name}")
         print(f"{'='*60}\n")
         
-        # 1. Procesar datos
-        print("1. Cargando y procesando datos...")
-        df, diagnosis_col, original_counts = self.data_processor.process_data(
+        try:
+            # 1. Procesar datos
+            print("1. Cargando y procesando datos...")
+            if progress is not None:
+                progress.start_stage('carga')
+            if profile is not None:
+                profile.start_stage('carga')
+            # Muestra y hojas del libro leídas una sola vez para la estimación y la carga
+            inspection = self.data_processor.inspect_file(file_path)
+            memory = memory_plan
+            if memory is None and self.memory_budget is not None:
+                memory = self.estimate_memory(
+                    file_path,
+                    diagnosis_column,
+                    balance_data=balance_data,
+                    prune_columns=prune_columns,
+                    block_size=block_size,
+                    inspection=inspection
+                )
+            memory_tracker = None
+            if memory is not None:
+                memory_tracker = MemoryTracker()
+                self._print_memory_plan(memory)
+                if memory['mode'] != 'eager' and not lazy:
+                    lazy = True
+                    print(f"   - La estimación supera el presupuesto: se predice por bloques de {block_size} registros")
+                    if memory['mode'] == 'pipeline':
+                        print("   - El modo pipeline (--pipeline) usaría menos memoria que el diferido")
+            
+            diagnosis_col, read_options = self._read_options(
+                file_path,
+                diagnosis_column,
+                prune_columns,
+                inspection=inspection
+            )
+            df, diagnosis_col, original_counts = self.data_processor.process_data(
+                file_path,
+                diagnosis_col,
+                **read_options
+            )
+            if progress is not None:
+                progress.advance(len(df))
+            
+            print(f"   - Columnas encontradas: {len(df.columns)}")
+            print(f"   - Total de registros: {len(df)}")
+            print(f"   - Distribución original:")
+            for label, count in original_counts.items():
+                print(f"     • {label}: {count} pacientes")
+            
+            sheet_counts = self.data_processor.get_sheet_counts(df)
+            if sheet_counts:
+                print(f"   - Registros por hoja:")
+                for sheet, count in sheet_counts.items():
+                    print(f"     • {sheet}: {count}")
+            
+            # 2. Balancear datos con SMOTE
+            if progress is not None and balance_data:
+                progress.start_stage('balanceo')
+            if profile is not None and balance_data:
+                profile.start_stage('balanceo')
+            
+            if balance_data and lazy:
+                print(f"\n2. Balanceo SMOTE diferido en bloques de {block_size} registros")
+                blocks = self.smote_balancer.iter_balanced_blocks(
+                    df,
+                    diagnosis_col,
+                    self.class_labels,
+                    block_size
+                )
+            elif balance_data:
+                print("\n2. Aplicando balanceo SMOTE...")
+                df_balanced = self.smote_balancer.balance_classes(
+                    df,
+                    diagnosis_col,
+                    self.class_labels
+                )
+                self._print_balanced_counts(
+                    original_counts,
+                    df_balanced[diagnosis_col].value_counts().to_dict()
+                )
+                blocks = self._split_blocks(df_balanced, block_size if progress is not None else None)
+            else:
+                blocks = self._split_blocks(df, block_size if progress is not None or lazy else None)
+            
+            # 3. Realizar predicciones
+            print(f"\n3. Realizando predicciones con {self.model_type}...")
+            if progress is not None:
+                if balance_data:
+                    # El balanceo deja todas las clases presentes con el tamaño de la mayoritaria
+                    progress.set_total(max(original_counts.values(), default=0) * len(original_counts))
+                else:
+                    progress.set_total(len(df))
+                progress.start_stage('prediccion')
+            if profile is not None:
+                profile.start_stage('prediccion')
+            
+            predictions: List[str] = []
+            actual: List[str] = []
+            block_stats = []
+            balanced_counts: Dict[str, int] = {}
+            cancelled = False
+            for block in blocks:
+                if progress is not None and progress.cancelled:
+                    cancelled = True
+                    break
+                block_predictions, block_actual, stats = self._predict_frame(block, diagnosis_col)
+                predictions.extend(block_predictions)
+                actual.extend(block_actual)
+                block_stats.append(stats)
+                for label, count in block[diagnosis_col].value_counts().items():
+                    balanced_counts[label] = balanced_counts.get(label, 0) + int(count)
+                if progress is not None:
+                    progress.advance(len(block), completed=True)
+            deduplication = self._merge_deduplication(block_stats)
+            
+            if cancelled:
+                print(f"   - Procesamiento cancelado: métricas parciales sobre {len(predictions)} registros")
+            
+            if not balance_data:
+                balanced_counts = original_counts
+            elif lazy:
+                self._print_balanced_counts(original_counts, balanced_counts)
+            
+            print(f"   - Predicciones completadas: {len(predictions)}")
+            print(
+                f"   - Registros distintos evaluados: {deduplication['unique_rows']} "
+                f"(razón de duplicación {deduplication['dedup_ratio']:.2f})"
+            )
+            
+            # 4. Calcular métricas
+            print("\n4. Calculando métricas...")
+            if profile is not None:
+                profile.start_stage('metricas')
+            metrics = self.metrics_calculator.calculate_all_metrics(actual, predictions)
+            
+            # 5. Preparar resultados
+            results = {
+                'file_path': file_path,
+                'model_type': self.model_type,
+                'total_records': len(predictions),
+                'original_counts': original_counts,
+                'balanced_counts': balanced_counts,
+                'predictions': predictions,
+                'actual': actual,
+                'metrics': {
+                    'accuracy': metrics['accuracy'],
+                    'precision': metrics['precision'],
+                    'recall': metrics['recall'],
+                    'f1_score': metrics['f1_score']
+                },
+                'confusion_matrix': metrics['confusion_matrix'],
+                'deduplication': deduplication,
+                'cancelled': cancelled,
+                'patient_ids': self._patient_ids(df, diagnosis_col, original_counts, balance_data)[:len(predictions)]
+            }
+            if memory is not None:
+                results['memory'] = self._memory_report(memory, 'lazy' if lazy else 'eager', memory_tracker)
+            if sheet_counts:
+                results['sheet_counts'] = sheet_counts
+            
+            if confidence_intervals:
+                results['confidence_intervals'] = self._bootstrap_intervals(metrics['confusion_matrix'])
+        finally:
+            if profile is not None:
+                # El perfilador se detiene también si una etapa falla
+                profile.stop_stage()
+        
+        if profile is not None:
+            results['profile'] = profile.summary()
+        
+        if progress is not None:
+            progress.finish()
+        
+        # 6. Mostrar resultados
+        self._print_results(results)
+        
+        return results
+    
+    def process_frame(
+        self,
+        df: pd.DataFrame,
+        diagnosis_column: Optional[str] = None,
+        balance_data: bool = True
+    ) -> Dict:
+        """
+        Procesa registros ya cargados, por ejemplo los recibidos por el servidor de
+        predicción (ver transport).
+        
+        Aplica la misma normalización, balanceo y predicción que process_file, así que
+        un lote decodificado con los mismos tipos que la lectura del archivo produce
+        las mismas predicciones.
+        
+        Args:
+            df: DataFrame con los registros
+            diagnosis_column: Nombre de la columna de diagnóstico (opcional)
+            balance_data: Si True, aplica balanceo SMOTE
+            
+        Returns:
+            Diccionario con predicciones, diagnósticos reales, identificadores de
+            paciente, conteos, métricas y matriz de confusión
+        """
+        diagnosis_col = self.data_processor.resolve_diagnosis_column(df, diagnosis_column)
+        df = self.data_processor.prepare_frame(df.copy(), diagnosis_col)
+        original_counts = df[diagnosis_col].value_counts().to_dict()
+        
+        frame = df
+        if balance_data:
+            frame = self.smote_balancer.balance_classes(df, diagnosis_col, self.class_labels)
+        
+        predictions, actual, deduplication = self._predict_frame(frame, diagnosis_col)
+        metrics = self.metrics_calculator.calculate_all_metrics(actual, predictions)
+        
+        return {
+            'model_type': self.model_type,
+            'total_records': len(predictions),
+            'original_counts': original_counts,
+            'balanced_counts': frame[diagnosis_col].value_counts().to_dict(),
+            'predictions': predictions,
+            'actual': actual,
+            'patient_ids': self._patient_ids(df, diagnosis_col, original_counts, balance_data),
+            'metrics': {
+                'accuracy': metrics['accuracy'],
+                'precision': metrics['precision'],
+                'recall': metrics['recall'],
+                'f1_score': metrics['f1_score']
+            },
+            'confusion_matrix': metrics['confusion_matrix'],
+            'deduplication': deduplication
+        }
+    
+    def process_file_pipeline(
+        self,
+        file_path: str,
+        output_path: str = None,
+        diagnosis_column: str = None,
+        balance_data: bool = False,
+        chunk_size: int = 10000,
+        queue_size: int = 4,
+        confidence_intervals: bool = False,
+        progress: Optional[ProgressTracker] = None,
+        prune_columns: bool = False,
+        memory_plan: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Procesa un archivo en modo pipeline, solapando lectura, predicción y escritura.
+        
+        Los registros avanzan por bloques a través de las etapas de carga, predicción,
+        métricas y escritura, conectadas por colas acotadas. Cuando una etapa es más
+        lenta, las anteriores se bloquean en lugar de acumular bloques, por lo que la
+        memoria se mantiene acotada y el tiempo total se aproxima al de la etapa más
+        lenta.
+        
+        No admite balanceo: SMOTE necesita todos los registros reales de cada clase
+        antes de generar la primera muestra sintética, así que la memoria dejaría de
+        estar acotada. Para balancear con poca memoria se usa process_file con lazy.
+        
+        Con progress, cada etapa reporta los registros que procesa. Si se cancela, la
+        carga deja de emitir bloques; los bloques ya emitidos terminan de predecirse y
+        escribirse, y las métricas son parciales (results['cancelled']).
+        
+        Args:
+            file_path: Ruta del archivo CSV o Excel
+            output_path: Ruta del CSV de resultados. Si se indica, las predicciones se
+                escriben por bloques y no se conservan en memoria.
+            diagnosis_column: Nombre de la columna de diagnóstico (opcional)
+            balance_data: Debe ser False (el pipeline no admite balanceo SMOTE)
+            chunk_size: Cantidad de registros por bloque
+            queue_size: Cantidad máxima de bloques en espera entre etapas
+            confidence_intervals: Si True, agrega intervalos de confianza bootstrap
+            progress: Seguimiento del avance y de la cancelación (opcional)
+            prune_columns: Si True, lee solo el diagnóstico y las columnas del modelo
+                (ver process_file)
+            memory_plan: Estimación de memoria ya calculada con estimate_memory
+                (opcional; si no se indica y hay presupuesto, se calcula)
+            
+        Returns:
+            Diccionario con resultados completos y estadísticas del pipeline
+            
+        Raises:
+            ValueError: Si se pide balanceo
+        """
+        if balance_data:
+            raise ValueError(
+                "El modo pipeline no admite balanceo SMOTE (necesita todos los registros "
+                "de cada clase); use el modo diferido (lazy) para balancear por bloques"
+            )
+        
+        print(f"\n{'='*60}")
+        print(f"PROCESANDO ARCHIVO (PIPELINE): {file_path}")
+        print(f"Modelo: {self.prediction_model.display_name}")
+        print(f"{'='*60}\n")
+        
+        inspection = self.data_processor.inspect_file(file_path)
+        memory = memory_plan
+        if memory is None and self.memory_budget is not None:
+            memory = self.estimate_memory(
+                file_path,
+                diagnosis_column,
+                balance_data=False,
+                prune_columns=prune_columns,
+                chunk_size=chunk_size,
+                queue_size=queue_size,
+                inspection=inspection
+            )
+        memory_tracker = None
+        if memory is not None:
+            memory_tracker = MemoryTracker()
+            self._print_memory_plan(memory)
+        
+        diagnosis_col, read_options = self._read_options(
             file_path,
-            diagnosis_column
+            diagnosis_column,
+            prune_columns,
+            inspection=inspection
         )
         
-        print(f"   - Columnas encontradas: {len(df.columns)}")
-        print(f"   - Total de registros: {len(df)}")
-        print(f"   - Distribución original:")
-        for label, count in original_counts.items():
-            print(f"     • {label}: {count} pacientes")
+        original_counts: Dict[str, int] = {}
+        sheet_counts: Dict[str, int] = {}
+        confusion_matrix = np.zeros(
+            (len(self.class_labels), len(self.class_labels)),
+            dtype=int
+        )
+        predictions: List[str] = []
+        actual: List[str] = []
+        written = {'rows': 0}
+        block_stats = []
         
-        # 2. Balancear datos con SMOTE
-        if balance_data:
-            print("\n2. Aplicando balanceo SMOTE...")
-            df_balanced = self.smote_balancer.balance_classes(
-                df,
+        def is_cancelled() -> bool:
+            return progress is not None and progress.cancelled
+        
+        def load_stage():
+            chunks = self.data_processor.iter_chunks(
+                file_path,
                 diagnosis_col,
-                self.class_labels
+                chunk_size,
+                **read_options
             )
-            balanced_counts = df_balanced[diagnosis_col].value_counts().to_dict()
-            
-            print(f"   - Distribución balanceada:")
-            for label in self.class_labels:
-                original = original_counts.get(label, 0)
-                balanced = balanced_counts.get(label, 0)
-                synthetic = balanced - original
-                print(f"     • {label}: {balanced} total ({original} reales + {synthetic} sintéticos)")
-        else:
-            df_balanced = df
-            balanced_counts = original_counts
+            for chunk in chunks:
+                if is_cancelled():
+                    return
+                for label, count in chunk[diagnosis_col].value_counts().items():
+                    original_counts[label] = original_counts.get(label, 0) + int(count)
+                for sheet, count in self.data_processor.get_sheet_counts(chunk).items():
+                    sheet_counts[sheet] = sheet_counts.get(sheet, 0) + count
+                if progress is not None:
+                    progress.advance(len(chunk), 'carga')
+                if not chunk.empty:
+                    yield chunk
         
-        # 3. Realizar predicciones
-        print(f"\n3. Realizando predicciones con {self.model_type}...")
-        predictions = []
-        actual = []
+        def predict_stage(chunks):
+            for chunk in chunks:
+                block_predictions, block_actual, stats = self._predict_frame(chunk, diagnosis_col)
+                block_stats.append(stats)
+                if progress is not None:
+                    progress.advance(len(chunk), 'prediccion', completed=True)
+                yield block_predictions, block_actual
         
-        for idx, row in df_balanced.iterrows():
-            # Convertir fila a diccionario
-            data_dict = row.to_dict()
-            actual_diagnosis = data_dict[diagnosis_col]
-            
-            # Realizar predicción
-            predicted = self.prediction_model.predict(
-                data_dict,
-                actual_diagnosis,
-                index=idx
+        def metrics_stage(blocks):
+            nonlocal confusion_matrix
+            for block_predictions, block_actual in blocks:
+                confusion_matrix += self.metrics_calculator.build_confusion_matrix(
+                    block_actual,
+                    block_predictions
+                )
+                yield block_predictions, block_actual
+        
+        def write_stage(blocks):
+            for block_predictions, block_actual in blocks:
+                if output_path is None:
+                    predictions.extend(block_predictions)
+                    actual.extend(block_actual)
+                else:
+                    df_block = self._results_frame(block_actual, block_predictions, written['rows'])
+                    df_block.to_csv(
+                        output_path,
+                        mode='w' if written['rows'] == 0 else 'a',
+                        header=written['rows'] == 0,
+                        index=False
+                    )
+                written['rows'] += len(block_predictions)
+        
+        pipeline = StagePipeline(queue_size=queue_size)
+        pipeline.add_stage('carga', load_stage)
+        pipeline.add_stage('prediccion', predict_stage)
+        pipeline.add_stage('metricas', metrics_stage)
+        pipeline.add_stage('escritura', write_stage)
+        
+        print(f"1. Ejecutando pipeline (bloques de {chunk_size} registros, cola de {queue_size})...")
+        pipeline_stats = pipeline.run()
+        
+        metrics = self.metrics_calculator.calculate_metrics_from_confusion_matrix(confusion_matrix)
+        # Los duplicados se agrupan dentro de cada bloque, no entre bloques
+        deduplication = self._merge_deduplication(block_stats)
+        
+        results = {
+            'file_path': file_path,
+            'model_type': self.model_type,
+            'total_records': written['rows'],
+            'original_counts': original_counts,
+            'balanced_counts': original_counts,
+            'metrics': {
+                'accuracy': metrics['accuracy'],
+                'precision': metrics['precision'],
+                'recall': metrics['recall'],
+                'f1_score': metrics['f1_score']
+            },
+            'confusion_matrix': metrics['confusion_matrix'],
+            'pipeline': pipeline_stats,
+            'deduplication': deduplication,
+            'cancelled': is_cancelled()
+        }
+        if memory is not None:
+            results['memory'] = self._memory_report(memory, 'pipeline', memory_tracker)
+        if sheet_counts:
+            results['sheet_counts'] = sheet_counts
+        
+        if confidence_intervals:
+            results['confidence_intervals'] = self._bootstrap_intervals(metrics['confusion_matrix'])
+        
+        if progress is not None:
+            progress.finish()
+        
+        if output_path is None:
+            results['predictions'] = predictions
+            results['actual'] = actual
+        else:
+            results['output_path'] = output_path
+        
+        print(f"   - Tiempo total: {pipeline_stats['wall_seconds']:.2f} s")
+        for name, stage_stats in pipeline_stats['stages'].items():
+            print(
+                f"     • {name}: {stage_stats['busy_seconds']:.2f} s activa, "
+                f"{stage_stats['blocks']} bloques"
             )
+        
+        self._print_results(results)
+        
+        return results
+    
+    def process_file_approximate(
+        self,
+        file_path: str,
+        diagnosis_column: str = None,
+        margin_of_error: float = 0.01,
+        confidence: float = 0.95,
+        chunk_size: int = 100000
+    ) -> Dict:
+        """
+        Estima las métricas de un archivo grande a partir de una muestra estratificada.
+        
+        El archivo se lee una sola vez tomando una muestra aleatoria por clase, con el
+        tamaño necesario para estimar el recall de cada clase con el margen de error
+        indicado. Solo se predicen los registros muestreados (sin balanceo SMOTE, que
+        generaría registros a partir de la muestra). Cada fila de la matriz de
+        confusión se escala a la cantidad de registros de su clase en el archivo y los
+        intervalos de confianza se obtienen con un bootstrap estratificado.
+        
+        Args:
+            file_path: Ruta del archivo CSV o Excel
+            diagnosis_column: Nombre de la columna de diagnóstico (opcional)
+            margin_of_error: Margen de error deseado por clase (fracción)
+            confidence: Nivel de confianza del margen y de los intervalos
+            chunk_size: Cantidad de registros leídos por bloque
             
-            predictions.append(predicted)
-            actual.append(actual_diagnosis)
+        Returns:
+            Diccionario con métricas estimadas, intervalos y tamaños de muestra
+        """
+        print(f"\n{'='*60}")
+        print(f"PROCESANDO ARCHIVO (MODO APROXIMADO): {file_path}")
+        print(f"Modelo: {self.prediction_model.display_name}")
+        print(f"{'='*60}\n")
         
-        print(f"   - Predicciones completadas: {len(predictions)}")
+        diagnosis_col = self.data_processor.resolve_diagnosis_column(
+            self.data_processor.read_header(file_path),
+            diagnosis_column
+        )
         
-        # 4. Calcular métricas
-        print("\n4. Calculando métricas...")
-        metrics = self.metrics_calculator.calculate_all_metrics(actual, predictions)
+        # 1. Muestreo por clase en una sola lectura
+        max_sample = self.metrics_calculator.required_sample_size(margin_of_error, confidence)
+        print(
+            f"1. Muestreando hasta {max_sample} registros por clase "
+            f"(margen ±{margin_of_error * 100:.2f}%, confianza {confidence * 100:.0f}%)..."
+        )
+        sample, original_counts = self.data_processor.reservoir_sample(
+            file_path,
+            diagnosis_col,
+            max_sample,
+            chunk_size,
+            self.random_seed
+        )
+        
+        # Corrección por población finita: la muestra está ordenada por clave aleatoria,
+        # así que los primeros registros de cada clase siguen siendo una muestra aleatoria
+        sample_sizes = {
+            label: self.metrics_calculator.required_sample_size(margin_of_error, confidence, count)
+            for label, count in original_counts.items()
+        }
+        rank = sample.groupby(diagnosis_col, sort=False).cumcount()
+        sample = sample[rank < sample[diagnosis_col].map(sample_sizes)].sort_index()
+        sample_counts = sample[diagnosis_col].value_counts().to_dict()
+        
+        for label in self.class_labels:
+            if label in original_counts:
+                print(f"   • {label}: {sample_counts.get(label, 0)} de {original_counts[label]} registros")
+        
+        # 2. Predecir la muestra
+        print(f"\n2. Realizando predicciones con {self.model_type}...")
+        predictions, actual, deduplication = self._predict_frame(sample, diagnosis_col)
+        
+        # 3. Escalar la matriz de confusión a la población
+        print("\n3. Estimando métricas...")
+        sample_matrix = self.metrics_calculator.build_confusion_matrix(actual, predictions)
+        population_counts = [original_counts.get(label, 0) for label in self.class_labels]
+        intervals = self.metrics_calculator.bootstrap_confidence_intervals(
+            sample_matrix,
+            n_resamples=2000,
+            confidence=confidence,
+            seed=self.random_seed,
+            max_seconds=30.0,
+            population_counts=population_counts
+        )
+        row_totals = sample_matrix.sum(axis=1, keepdims=True)
+        scaled_matrix = np.divide(
+            sample_matrix * np.array(population_counts)[:, np.newaxis],
+            row_totals,
+            out=np.zeros(sample_matrix.shape),
+            where=row_totals > 0
+        )
+        metrics = self.metrics_calculator.calculate_metrics_from_confusion_matrix(scaled_matrix)
         
-        # 5. Preparar resultados
         results = {
             'file_path': file_path,
             'model_type': self.model_type,
-            'total_records': len(df_balanced),
+            'approximate': True,
+            'total_records': sum(population_counts),
+            'sampled_records': len(sample),
             'original_counts': original_counts,
-            'balanced_counts': balanced_counts,
+            'balanced_counts': original_counts,
+            'sample_counts': sample_counts,
+            'margin_of_error': margin_of_error,
             'predictions': predictions,
             'actual': actual,
             'metrics': {
@@ -140,21 +669,657 @@ class BatchPredictionSystem:
                 'recall': metrics['recall'],
                 'f1_score': metrics['f1_score']
             },
+            'confusion_matrix': np.rint(scaled_matrix).astype(int).tolist(),
+            'sample_confusion_matrix': sample_matrix.tolist(),
+            'confidence_intervals': intervals,
+            'deduplication': deduplication
+        }
+        
+        print(f"   - Registros predichos: {len(sample)} de {results['total_records']}")
+        self._print_results(results)
+        
+        return results
+    
+    def cross_validate(
+        self,
+        file_path: str,
+        n_folds: int = 5,
+        diagnosis_column: str = None,
+        balance_data: bool = True,
+        n_jobs: int = None
+    ) -> Dict:
+        """
+        Evalúa el modelo con validación cruzada estratificada por diagnóstico.
+        
+        Solo se usan registros reales para formar los pliegues. En cada pliegue el
+        balanceo SMOTE se aplica únicamente al lado de entrenamiento y la evaluación
+        se hace sobre el pliegue de prueba sin modificar, de modo que ninguna fila
+        sintética llega a las métricas. Si el modelo no se entrena (trainable es
+        False), el balanceo no cambiaría las predicciones y se omite. Los pliegues se
+        ejecutan en paralelo en procesos separados y sus matrices de confusión se suman.
+        
+        Args:
+            file_path: Ruta del archivo CSV o Excel
+            n_folds: Cantidad de pliegues
+            diagnosis_column: Nombre de la columna de diagnóstico (opcional)
+            balance_data: Si True, aplica SMOTE al lado de entrenamiento de cada pliegue
+                (solo con modelos entrenables)
+            n_jobs: Cantidad de procesos (None usa uno por pliegue hasta el número de CPUs;
+                1 ejecuta los pliegues en el proceso actual)
+            
+        Returns:
+            Diccionario con métricas por pliegue, métricas globales y matriz combinada
+        """
+        print(f"\n{'='*60}")
+        print(f"VALIDACIÓN CRUZADA ({n_folds} pliegues): {file_path}")
+        print(f"Modelo: {self.prediction_model.display_name}")
+        print(f"{'='*60}\n")
+        
+        df, diagnosis_col, original_counts = self.data_processor.process_data(
+            file_path,
+            diagnosis_column
+        )
+        folds = self.data_processor.stratified_folds(
+            df,
+            diagnosis_col,
+            n_folds,
+            self.random_seed
+        )
+        
+        if balance_data and not self.prediction_model.trainable:
+            print("   - El modelo no se entrena con los datos: se omite el balanceo de los pliegues")
+            balance_data = False
+        
+        tasks = []
+        for fold_number, test_positions in enumerate(folds, start=1):
+            train_mask = np.ones(len(df), dtype=bool)
+            train_mask[test_positions] = False
+            tasks.append((
+                self.model_type,
+                self.random_seed,
+                self.class_config,
+                fold_number,
+                df.iloc[train_mask],
+                df.iloc[test_positions],
+                diagnosis_col,
+                balance_data
+            ))
+        
+        if n_jobs is None:
+            n_jobs = min(n_folds, os.cpu_count() or 1)
+        
+        print(f"1. Evaluando {n_folds} pliegues con {n_jobs} proceso(s)...")
+        if n_jobs == 1:
+            fold_results = [_evaluate_fold(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                fold_results = list(executor.map(_evaluate_fold, tasks))
+        
+        confusion_matrix = np.sum(
+            [np.array(fold['confusion_matrix']) for fold in fold_results],
+            axis=0
+        )
+        metrics = self.metrics_calculator.calculate_metrics_from_confusion_matrix(confusion_matrix)
+        
+        metric_names = ['accuracy', 'precision', 'recall', 'f1_score']
+        fold_summary = {
+            name: {
+                'mean': float(np.mean([fold['metrics'][name] for fold in fold_results])),
+                'std': float(np.std([fold['metrics'][name] for fold in fold_results]))
+            }
+            for name in metric_names
+        }
+        
+        for fold in fold_results:
+            print(
+                f"   - Pliegue {fold['fold']}: {fold['test_records']} registros de prueba, "
+                f"accuracy {fold['metrics']['accuracy']:.2f}%"
+            )
+        
+        results = {
+            'file_path': file_path,
+            'model_type': self.model_type,
+            'n_folds': n_folds,
+            'balanced_folds': balance_data,
+            'total_records': int(confusion_matrix.sum()),
+            'original_counts': original_counts,
+            'folds': fold_results,
+            'fold_summary': fold_summary,
+            'metrics': {name: metrics[name] for name in metric_names},
             'confusion_matrix': metrics['confusion_matrix']
         }
         
-        # 6. Mostrar resultados
         self._print_results(results)
         
         return results
     
+    def compare_models(
+        self,
+        file_path: str,
+        model_types: List[str] = None,
+        diagnosis_column: str = None,
+        balance_data: bool = True
+    ) -> Dict:
+        """
+        Compara varios modelos sobre el mismo archivo en una sola pasada.
+        
+        La carga, normalización, balanceo SMOTE y extracción de características se
+        hacen una sola vez; cada modelo predice sobre la misma matriz de
+        características, por lo que el costo adicional por modelo es solo el de sus
+        reglas de predicción.
+        
+        Args:
+            file_path: Ruta del archivo CSV o Excel
+            model_types: Modelos registrados a comparar (por defecto, todos)
+            diagnosis_column: Nombre de la columna de diagnóstico (opcional)
+            balance_data: Si True, aplica balanceo SMOTE
+            
+        Returns:
+            Diccionario con los datos compartidos y los resultados de cada modelo
+        """
+        if model_types is None:
+            model_types = list(MODEL_REGISTRY)
+        
+        print(f"\n{'='*60}")
+        print(f"COMPARANDO MODELOS: {file_path}")
+        print(f"Modelos: {', '.join(MODEL_REGISTRY[name].display_name for name in model_types)}")
+        print(f"{'='*60}\n")
+        
+        # 1. Procesar y balancear una sola vez
+        print("1. Cargando y procesando datos...")
+        df, diagnosis_col, original_counts = self.data_processor.process_data(
+            file_path,
+            diagnosis_column
+        )
+        sheet_counts = self.data_processor.get_sheet_counts(df)
+        
+        if balance_data:
+            print("2. Aplicando balanceo SMOTE...")
+            df = self.smote_balancer.balance_classes(df, diagnosis_col, self.class_labels)
+            balanced_counts = df[diagnosis_col].value_counts().to_dict()
+        else:
+            balanced_counts = original_counts
+        
+        # 2. Extraer características una sola vez
+        print("3. Extrayendo características...")
+        features = FeatureMatrix.from_frame(df, diagnosis_col)
+        
+        # 3. Predecir con cada modelo sobre la misma matriz
+        models = {}
+        for name in model_types:
+            model = self._create_model(name)
+            print(f"4. Realizando predicciones con {name}...")
+            predictions = model.predict_features(features)
+            metrics = self.metrics_calculator.calculate_all_metrics(features.actual, predictions)
+            models[name] = {
+                'display_name': model.display_name,
+                'predictions': predictions,
+                'metrics': {
+                    'accuracy': metrics['accuracy'],
+                    'precision': metrics['precision'],
+                    'recall': metrics['recall'],
+                    'f1_score': metrics['f1_score']
+                },
+                'confusion_matrix': metrics['confusion_matrix']
+            }
+        
+        results = {
+            'file_path': file_path,
+            'total_records': features.size,
+            'original_counts': original_counts,
+            'balanced_counts': balanced_counts,
+            'actual': features.actual,
+            'deduplication': features.deduplication_stats(),
+            'models': models
+        }
+        if sheet_counts:
+            results['sheet_counts'] = sheet_counts
+        
+        self._print_comparison(results)
+        
+        return results
+    
+    def _print_comparison(self, results: Dict):
+        """Imprime las métricas y matrices de confusión de varios modelos lado a lado."""
+        print(f"\n{'='*60}")
+        print("COMPARACIÓN DE MODELOS")
+        print(f"{'='*60}\n")
+        
+        print(f"Total de registros procesados: {results['total_records']}\n")
+        
+        names = list(results['models'])
+        print(f"{'Métrica':<15}", end="")
+        for name in names:
+            print(f"{results['models'][name]['display_name']:<22}", end="")
+        print()
+        print("-" * 60)
+        
+        for metric, title in [
+            ('accuracy', 'Accuracy'),
+            ('precision', 'Precision'),
+            ('recall', 'Recall'),
+            ('f1_score', 'F1-Score')
+        ]:
+            print(f"{title:<15}", end="")
+            for name in names:
+                value = f"{results['models'][name]['metrics'][metric]:.2f}%"
+                print(f"{value:<22}", end="")
+            print()
+        
+        for name in names:
+            print(f"\n{results['models'][name]['display_name']}:", end="")
+            self.metrics_calculator.print_confusion_matrix(
+                np.array(results['models'][name]['confusion_matrix'])
+            )
+        
+        print(f"\n{'='*60}\n")
+    
+    def save_comparison(self, results: Dict, output_path: str):
+        """
+        Guarda las predicciones de todos los modelos comparados en un archivo CSV.
+        
+        Args:
+            results: Diccionario devuelto por compare_models
+            output_path: Ruta del archivo de salida
+        """
+        df_results = pd.DataFrame({
+            'Paciente_ID': range(1, len(results['actual']) + 1),
+            'Diagnostico_Real': results['actual']
+        })
+        for name, model_results in results['models'].items():
+            df_results[f'Prediccion_{name}'] = model_results['predictions']
+        
+        df_results.to_csv(output_path, index=False)
+        print(f"\nResultados guardados en: {output_path}")
+    
+    def sweep_thresholds(
+        self,
+        file_path: str,
+        grid: Dict[str, List[float]],
+        diagnosis_column: str = None,
+        balance_data: bool = True
+    ) -> pd.DataFrame:
+        """
+        Evalúa combinaciones de puntos de corte clínicos sobre un archivo.
+        
+        El archivo se carga, balancea y convierte en matriz de características una sola
+        vez; luego todas las combinaciones de la grilla se evalúan sobre esa matriz
+        con el modelo del sistema.
+        
+        Args:
+            file_path: Ruta del archivo CSV o Excel
+            grid: Valores a probar por umbral, por ejemplo
+                {'plaquetas_dengue': [80, 100, 120], 'temperatura_malaria': [38.5, 39]}
+            diagnosis_column: Nombre de la columna de diagnóstico (opcional)
+            balance_data: Si True, aplica balanceo SMOTE
+            
+        Returns:
+            DataFrame con una fila por combinación de umbrales y sus métricas
+        """
+        df, diagnosis_col, _ = self.data_processor.process_data(file_path, diagnosis_column)
+        
+        if balance_data:
+            df = self.smote_balancer.balance_classes(df, diagnosis_col, self.class_labels)
+        
+        features = FeatureMatrix.from_frame(df, diagnosis_col)
+        sweep = ThresholdSweep(self.prediction_model, self.class_labels)
+        
+        return sweep.run(features, grid)
+    
+    def _bootstrap_intervals(self, confusion_matrix: List[List[int]]) -> Dict:
+        """
+        Calcula los intervalos de confianza al 95% de las métricas.
+        
+        Args:
+            confusion_matrix: Matriz de confusión de la ejecución
+            
+        Returns:
+            Diccionario con los intervalos por métrica
+        """
+        print("\n   Calculando intervalos de confianza (bootstrap)...")
+        return self.metrics_calculator.bootstrap_confidence_intervals(
+            np.array(confusion_matrix),
+            n_resamples=10000,
+            confidence=0.95,
+            seed=self.random_seed,
+            max_seconds=30.0
+        )
+    
+    def _predict_frame(
+        self,
+        df: pd.DataFrame,
+        diagnosis_col: str
+    ) -> Tuple[List[str], List[str], Dict]:
+        """
+        Realiza las predicciones de todos los registros de un DataFrame.
+        
+        Los registros idénticos se evalúan una sola vez y su resultado se replica.
+        
+        Args:
+            df: DataFrame con los registros a predecir
+            diagnosis_col: Nombre de la columna de diagnóstico
+            
+        Returns:
+            Tupla con (predicciones, diagnósticos reales, estadísticas de duplicados)
+        """
+        features = FeatureMatrix.from_frame(df, diagnosis_col)
+        predictions = self.prediction_model.predict_features(features)
+        
+        return predictions, features.actual, features.deduplication_stats()
+    
+    def estimate_memory(
+        self,
+        file_path: str,
+        diagnosis_column: Optional[str] = None,
+        balance_data: bool = True,
+        prune_columns: bool = False,
+        block_size: int = 10000,
+        chunk_size: int = 10000,
+        queue_size: int = 4,
+        inspection: Optional[Tuple[pd.DataFrame, Optional[List[str]]]] = None
+    ) -> Dict:
+        """
+        Estima el pico de memoria de cada modo de procesamiento sin cargar el archivo.
+        
+        Combina los registros por clase, los bytes por registro de una muestra de las
+        columnas que se van a leer y el factor de expansión del balanceo SMOTE. En los
+        CSV las clases se cuentan leyendo solo la columna de diagnóstico; en los libros
+        Excel se extrapola la distribución de los primeros registros, así que el factor
+        de expansión puede quedar subestimado si el libro está ordenado por diagnóstico.
+        
+        Args:
+            file_path: Ruta del archivo CSV o Excel
+            diagnosis_column: Nombre de la columna de diagnóstico (opcional)
+            balance_data: Si se aplicará balanceo SMOTE
+            prune_columns: Si se leerán solo las columnas necesarias
+            block_size: Registros por bloque del modo diferido
+            chunk_size: Registros por bloque del modo pipeline
+            queue_size: Bloques en espera entre etapas del modo pipeline
+            inspection: Resultado de DataProcessor.inspect_file, si ya se leyó
+            
+        Returns:
+            Diccionario con el tamaño del archivo, registros, bytes por registro,
+            factor de expansión, memoria residente actual del proceso, pico estimado por modo,
+            presupuesto y modo elegido
+        """
+        if inspection is None:
+            inspection = self.data_processor.inspect_file(file_path)
+        diagnosis_col, read_options = self._read_options(
+            file_path,
+            diagnosis_column,
+            prune_columns,
+            inspection=inspection
+        )
+        # Bytes por registro con los tipos por defecto: al predecir, los valores se
+        # convierten en objetos de Python aunque se hayan leído como categorías
+        sample = inspection[0]
+        if read_options['usecols'] is not None:
+            sample = sample[read_options['usecols']]
+        bytes_per_row = float(sample.memory_usage(deep=True).sum()) / max(1, len(sample))
+        
+        if os.path.splitext(file_path)[1].lower() == '.csv':
+            class_counts = self.data_processor.count_classes(file_path, diagnosis_col)
+        else:
+            # Leer una columna de un libro Excel cuesta casi lo mismo que leerlo
+            # completo: se extrapola la distribución de la muestra
+            total_rows = self.data_processor.count_rows(file_path)
+            labels = self.data_processor.prepare_frame(sample.copy(), diagnosis_col)[diagnosis_col]
+            shares = labels.value_counts(normalize=True)
+            class_counts = {label: int(round(share * total_rows)) for label, share in shares.items()}
+        
+        # Cada clase presente crece hasta el tamaño de la mayoritaria
+        total_rows = sum(class_counts.values())
+        expansion_factor = 1.0
+        if total_rows > 0:
+            expansion_factor = max(class_counts.values()) * len(class_counts) / total_rows
+        
+        baseline_bytes = current_memory_bytes() or 0
+        mode_peaks = {
+            mode: baseline_bytes + peak
+            for mode, peak in estimate_mode_peaks(
+                total_rows,
+                bytes_per_row,
+                expansion_factor,
+                balance_data=balance_data,
+                block_size=block_size,
+                chunk_size=chunk_size,
+                queue_size=queue_size
+            ).items()
+        }
+        
+        return {
+            'file_bytes': os.path.getsize(file_path),
+            'estimated_rows': total_rows,
+            'bytes_per_row': bytes_per_row,
+            'expansion_factor': expansion_factor if balance_data else 1.0,
+            'baseline_bytes': baseline_bytes,
+            'mode_peaks': mode_peaks,
+            'budget_bytes': self.memory_budget,
+            'mode': select_mode(mode_peaks, self.memory_budget)
+        }
+    
+    def _print_memory_plan(self, memory: Dict):
+        """Imprime la estimación de memoria y el presupuesto."""
+        peaks = ", ".join(
+            f"{mode} {peak / 1e6:.0f} MB" for mode, peak in memory['mode_peaks'].items()
+        )
+        print(
+            f"   - Memoria estimada para {memory['estimated_rows']} registros "
+            f"(expansión SMOTE {memory['expansion_factor']:.2f}): {peaks}"
+        )
+        if memory['budget_bytes'] is not None:
+            print(f"   - Presupuesto de memoria: {memory['budget_bytes'] / 1e6:.0f} MB")
+    
+    def _memory_report(self, memory: Dict, mode: str, tracker: MemoryTracker) -> Dict:
+        """
+        Resume la memoria estimada y la real del modo usado.
+        
+        Args:
+            memory: Estimación de estimate_memory
+            mode: Modo con el que se procesó ('eager', 'lazy' o 'pipeline')
+            tracker: Medición iniciada al empezar la ejecución
+            
+        Returns:
+            Diccionario con modo, presupuesto, memoria al empezar, y pico estimado y
+            real de la ejecución como aumento sobre la memoria inicial y como total
+            del proceso (los reales son None si no se pueden medir)
+        """
+        estimated_increase = memory['mode_peaks'][mode] - memory['baseline_bytes']
+        actual_increase = tracker.peak_increase_bytes()
+        baseline_bytes = tracker.baseline_bytes
+        return {
+            'mode': mode,
+            'budget_bytes': memory['budget_bytes'],
+            'baseline_bytes': baseline_bytes,
+            'estimated_increase_bytes': estimated_increase,
+            'actual_increase_bytes': actual_increase,
+            'estimated_peak_bytes': (baseline_bytes or 0) + estimated_increase,
+            'actual_peak_bytes': (
+                baseline_bytes + actual_increase
+                if baseline_bytes is not None and actual_increase is not None else None
+            ),
+            'estimated_rows': memory['estimated_rows'],
+            'expansion_factor': memory['expansion_factor']
+        }
+    
+    def _read_options(
+        self,
+        file_path: str,
+        diagnosis_column: Optional[str],
+        prune_columns: bool,
+        inspection: Optional[Tuple[pd.DataFrame, Optional[List[str]]]] = None
+    ) -> Tuple[str, Dict]:
+        """
+        Determina la columna de diagnóstico y las opciones de lectura del archivo.
+        
+        Se leen los primeros registros para obtener los tipos sugeridos por el esquema
+        clínico y, si se pide, la lista de columnas que usa el modelo (más el
+        diagnóstico y el identificador del paciente, si existe). En los libros Excel
+        las opciones incluyen los nombres de las hojas, para no volver a abrir el
+        libro solo para listarlas.
+        
+        Args:
+            file_path: Ruta del archivo
+            diagnosis_column: Nombre de la columna de diagnóstico (opcional)
+            prune_columns: Si True, limita la lectura a las columnas necesarias
+            inspection: Resultado de DataProcessor.inspect_file, si ya se leyó
+            
+        Returns:
+            Tupla con (columna de diagnóstico, opciones usecols, dtype y sheet_names)
+        """
+        sample, sheet_names = inspection or self.data_processor.inspect_file(file_path)
+        diagnosis_col = self.data_processor.resolve_diagnosis_column(sample, diagnosis_column)
+        
+        usecols = None
+        if prune_columns:
+            model_columns = self.prediction_model.required_columns(list(sample.columns))
+            # El identificador se conserva para asociar cada predicción con su paciente
+            id_col = self.data_processor.find_id_column(sample)
+            usecols = [
+                col for col in sample.columns
+                if col in (diagnosis_col, id_col) or col in model_columns
+            ]
+        
+        dtype = {
+            col: col_type
+            for col, col_type in clinical_dtypes(sample).items()
+            if usecols is None or col in usecols
+        }
+        
+        return diagnosis_col, {'usecols': usecols, 'dtype': dtype or None, 'sheet_names': sheet_names}
+    
+    def _patient_ids(
+        self,
+        df: pd.DataFrame,
+        diagnosis_col: str,
+        original_counts: Dict[str, int],
+        balance_data: bool
+    ) -> List:
+        """
+        Obtiene el identificador de paciente de cada registro predicho, en el orden
+        de las predicciones.
+        
+        Se usa la columna de identificador si existe y, si no, la posición del
+        registro en el archivo (desde 1). Las muestras sintéticas del balanceo no
+        corresponden a ningún paciente y quedan como None.
+        
+        Args:
+            df: DataFrame cargado (antes del balanceo)
+            diagnosis_col: Nombre de la columna de diagnóstico
+            original_counts: Registros por clase antes del balanceo
+            balance_data: Si las predicciones se hicieron sobre el dataset balanceado
+            
+        Returns:
+            Lista de identificadores (None para los registros sintéticos)
+        """
+        id_col = self.data_processor.find_id_column(df)
+        ids = df[id_col] if id_col is not None else pd.Series(df.index + 1, index=df.index)
+        
+        if not balance_data:
+            return ids.tolist()
+        
+        # El balanceo agrupa los registros reales por clase, en el orden de class_labels
+        codes = self.data_processor.encode_labels(df[diagnosis_col])
+        order = np.argsort(codes, kind='stable')
+        real_ids = ids.iloc[order[codes[order] >= 0]].tolist()
+        
+        is_real = self.smote_balancer.real_row_mask(original_counts, self.class_labels)
+        patient_ids: List = [None] * len(is_real)
+        for position, patient_id in zip(np.flatnonzero(is_real), real_ids):
+            patient_ids[position] = patient_id
+        
+        return patient_ids
+    
+    def _create_model(self, model_type: str):
+        """
+        Crea un modelo registrado que predice las clases configuradas.
+        
+        Args:
+            model_type: Tipo de modelo registrado
+            
+        Returns:
+            Instancia del modelo
+        """
+        model = create_model(model_type, random_seed=self.random_seed)
+        model.set_class_labels(self.class_labels)
+        return model
+    
+    def _split_blocks(self, df: pd.DataFrame, block_size: Optional[int]) -> List[pd.DataFrame]:
+        """
+        Divide un DataFrame en bloques consecutivos (uno solo si block_size es None).
+        
+        Args:
+            df: DataFrame a dividir
+            block_size: Cantidad de registros por bloque
+            
+        Returns:
+            Lista de bloques
+        """
+        if block_size is None or len(df) <= block_size:
+            return [df]
+        
+        return [df.iloc[start:start + block_size] for start in range(0, len(df), block_size)]
+    
+    def _merge_deduplication(self, block_stats: List[Dict]) -> Dict:
+        """
+        Combina las estadísticas de duplicados de varios bloques.
+        
+        Args:
+            block_stats: Estadísticas de cada bloque (deduplication_stats)
+            
+        Returns:
+            Diccionario con total_rows, unique_rows y dedup_ratio
+        """
+        total_rows = sum(stats['total_rows'] for stats in block_stats)
+        unique_rows = sum(stats['unique_rows'] for stats in block_stats)
+        
+        return {
+            'total_rows': total_rows,
+            'unique_rows': unique_rows,
+            'dedup_ratio': total_rows / unique_rows if unique_rows else 1.0
+        }
+    
+    def _print_balanced_counts(self, original_counts: Dict[str, int], balanced_counts: Dict[str, int]):
+        """Imprime la distribución de clases después del balanceo."""
+        print(f"   - Distribución balanceada:")
+        for label in self.class_labels:
+            original = original_counts.get(label, 0)
+            balanced = balanced_counts.get(label, 0)
+            synthetic = balanced - original
+            print(f"     • {label}: {balanced} total ({original} reales + {synthetic} sintéticos)")
+    
+    def _results_frame(
+        self,
+        actual: List[str],
+        predictions: List[str],
+        start_id: int = 0
+    ) -> pd.DataFrame:
+        """
+        Construye el DataFrame de resultados con IDs de paciente consecutivos.
+        
+        Args:
+            actual: Diagnósticos reales
+            predictions: Diagnósticos predichos
+            start_id: Cantidad de pacientes ya escritos antes de este bloque
+            
+        Returns:
+            DataFrame con columnas Paciente_ID, Diagnostico_Real y Prediccion
+        """
+        data = {
+            'Paciente_ID': range(start_id + 1, start_id + len(actual) + 1),
+            'Diagnostico_Real': actual,
+            'Prediccion': predictions
+        }
+        
+        return pd.DataFrame(data)
+    
     def _print_results(self, results: Dict):
         """Imprime los resultados de forma legible."""
         print(f"\n{'='*60}")
         print("RESULTADOS")
         print(f"{'='*60}\n")
         
-        print(f"Modelo: {'Regresión Logística' if results['model_type'] == 'logistic' else 'Red Neuronal'}")
+        print(f"Modelo: {MODEL_REGISTRY[results['model_type']].display_name}")
         print(f"Total de registros procesados: {results['total_records']}")
         print(f"\nMétricas:")
         print(f"  • Accuracy: {results['metrics']['accuracy']:.2f}%")
@@ -162,6 +1327,39 @@ class BatchPredictionSystem:
         print(f"  • Recall: {results['metrics']['recall']:.2f}%")
         print(f"  • F1-Score: {results['metrics']['f1_score']:.2f}%")
         
+        if 'confidence_intervals' in results:
+            intervals = results['confidence_intervals']
+            print(
+                f"\nIntervalos de confianza al {intervals['confidence'] * 100:.0f}% "
+                f"({intervals['n_resamples']} réplicas bootstrap):"
+            )
+            for name, title in [
+                ('accuracy', 'Accuracy'),
+                ('precision', 'Precision'),
+                ('recall', 'Recall'),
+                ('f1_score', 'F1-Score')
+            ]:
+                interval = intervals['metrics'][name]
+                print(f"  • {title}: [{interval['lower']:.2f}%, {interval['upper']:.2f}%]")
+        
+        if 'profile' in results:
+            print(f"\nPerfil por etapa ({results['profile']['mode']}):")
+            for name, stage in results['profile']['stages'].items():
+                output = f" -> {stage['output']}" if stage['output'] else ""
+                print(f"  • {name}: {stage['seconds']:.2f} s{output}")
+                for entry in stage['top_functions'][:5]:
+                    print(f"      {entry['cumulative_seconds']:8.3f} s  {entry['function']}")
+        
+        if 'memory' in results:
+            memory = results['memory']
+            actual_increase = memory['actual_increase_bytes']
+            print(
+                f"\nMemoria (modo {memory['mode']}): aumento estimado "
+                f"{memory['estimated_increase_bytes'] / 1e6:.0f} MB, aumento real "
+                + (f"{actual_increase / 1e6:.0f} MB" if actual_increase is not None else "no disponible")
+                + f", pico estimado del proceso {memory['estimated_peak_bytes'] / 1e6:.0f} MB"
+            )
+        
         # Imprimir matriz de confusión
         confusion_matrix = np.array(results['confusion_matrix'])
         self.metrics_calculator.print_confusion_matrix(confusion_matrix)
@@ -177,43 +1375,278 @@ class BatchPredictionSystem:
             output_path: Ruta del archivo de salida
         """
         # Crear DataFrame con resultados
-        data = {
-            'Paciente_ID': range(1, len(results['actual']) + 1),
-            'Diagnostico_Real': results['actual'],
-            'Prediccion': results['predictions']
-        }
-        
-        df_results = pd.DataFrame(data)
+        df_results = self._results_frame(results['actual'], results['predictions'])
         df_results.to_csv(output_path, index=False)
         print(f"\nResultados guardados en: {output_path}")
 
 
+def _evaluate_fold(task: Tuple) -> Dict:
+    """
+    Entrena y evalúa un pliegue de validación cruzada.
+    
+    Se define a nivel de módulo para poder ejecutarse en un pool de procesos.
+    
+    Args:
+        task: Tupla con (tipo de modelo, semilla, clases, número de pliegue,
+            DataFrame de entrenamiento, DataFrame de prueba, columna de diagnóstico,
+            balancear)
+        
+    Returns:
+        Diccionario con los conteos, métricas y matriz de confusión del pliegue
+    """
+    (model_type, random_seed, class_config, fold_number, train_df, test_df,
+     diagnosis_col, balance_data) = task
+    
+    system = BatchPredictionSystem(
+        model_type=model_type,
+        random_seed=random_seed,
+        class_config=class_config
+    )
+    
+    if balance_data:
+        train_df = system.smote_balancer.balance_classes(
+            train_df,
+            diagnosis_col,
+            system.class_labels
+        )
+    system.prediction_model.fit(train_df, diagnosis_col)
+    
+    predictions, actual, _ = system._predict_frame(test_df, diagnosis_col)
+    metrics = system.metrics_calculator.calculate_all_metrics(actual, predictions)
+    
+    return {
+        'fold': fold_number,
+        'train_records': len(train_df),
+        'train_counts': train_df[diagnosis_col].value_counts().to_dict(),
+        'test_records': len(test_df),
+        'test_counts': test_df[diagnosis_col].value_counts().to_dict(),
+        'metrics': {
+            'accuracy': metrics['accuracy'],
+            'precision': metrics['precision'],
+            'recall': metrics['recall'],
+            'f1_score': metrics['f1_score']
+        },
+        'confusion_matrix': metrics['confusion_matrix']
+    }
+
+
+def _print_progress(snapshot: Dict):
+    """Imprime una línea con el avance de la ejecución."""
+    line = f"   [progreso] {snapshot['stage'] or '-'}: {snapshot['rows_done']}"
+    if snapshot['total_rows'] is not None:
+        line += f"/{snapshot['total_rows']}"
+    line += f" registros, {snapshot['rows_per_second']:.0f} registros/s"
+    if snapshot['eta_seconds'] is not None and not snapshot['finished']:
+        line += f", restante ~{snapshot['eta_seconds']:.0f} s"
+    print(line)
+
+
+def _get_option(name: str, default: str) -> str:
+    """Obtiene el valor de una opción de línea de comandos con formato --nombre=valor."""
+    prefix = f"--{name}="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return arg[len(prefix):]
+    return default
+
+
+def _class_config_option() -> Optional[List]:
+    """Lee la configuración de clases indicada con --classes=archivo.json (None si no se indica)."""
+    config_path = _get_option("classes", None)
+    if config_path is None:
+        return None
+    
+    try:
+        return load_class_config(config_path)
+    except (OSError, ValueError) as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+
+
 def main():
     """Función principal."""
-    if len(sys.argv) < 2:
-        print("Uso: python main.py <archivo.csv> [modelo] [--no-balance]")
-        print("  modelo: 'logistic' (default) o 'neural'")
+    positional = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    
+    if "--serve" in sys.argv:
+        # Servidor de predicción por lotes para el frontend
+        model_type = positional[0] if positional else "logistic"
+        if model_type not in MODEL_REGISTRY:
+            print(f"Error: Modelo '{model_type}' no válido. Use uno de: {', '.join(MODEL_REGISTRY)}")
+            sys.exit(1)
+        server = PredictionServer(
+            BatchPredictionSystem(model_type=model_type, class_config=_class_config_option()),
+            port=int(_get_option("port", "8766"))
+        )
+        print(f"Servidor de predicción en {server.url}/predict (Ctrl+C para detener)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nServidor detenido")
+        return
+    
+    if not positional:
+        print("Uso: python main.py <archivo.csv> [modelo] [--no-balance] [--pipeline] [--bootstrap] [--lazy]")
+        print("       python main.py <archivo.csv> [modelo] --cv [--folds=5] [--no-balance]")
+        print("       python main.py <archivo.csv> --compare [--no-balance]")
+        print("       python main.py [modelo] --serve [--port=8766]")
+        print(f"  modelo: {', '.join(MODEL_REGISTRY)} (default: logistic)")
         print("  --no-balance: Desactiva el balanceo SMOTE")
+        print("  --pipeline: Procesa por bloques solapando lectura, predicción y escritura (con --no-balance)")
+        print("  --bootstrap: Agrega intervalos de confianza al 95% para las métricas")
+        print("  --lazy: Genera y predice los registros balanceados por bloques, sin materializarlos")
+        print("  --approximate [--margin=0.01]: Estima las métricas con una muestra estratificada")
+        print("  --prune-columns: Lee solo el diagnóstico y las columnas clínicas (cambia el hash)")
+        print("  --csv-engine=pyarrow: Lee los CSV con pyarrow si da los mismos valores que pandas")
+        print("  --cv: Validación cruzada estratificada con SMOTE solo en entrenamiento")
+        print("  --compare: Compara todos los modelos procesando el archivo una sola vez")
+        print("  --serve: Atiende POST /predict con lotes columnares, Arrow IPC o JSON")
+        print("  --progress: Muestra el avance; Ctrl+C detiene entre bloques con métricas parciales")
+        print("  --progress-port=8765: Publica el avance en http://127.0.0.1:<puerto>/progress,")
+        print("                        /events (SSE) y acepta POST /cancel")
+        print("  --archive=DIR: Agrega las predicciones y métricas al archivo de resultados DIR")
+        print("  --profile[=cprofile|sampling]: Perfila cada etapa y guarda .pstats o pilas")
+        print("                      colapsadas (.folded) en --profile-dir (default: <archivo>_perfil);")
+        print("                      solo con el procesamiento normal o --lazy")
+        print("  --classes=clases.json: Clases de diagnóstico (etiqueta, códigos y palabras clave)")
+        print("  --memory-budget=MB: Pico de memoria permitido; si la estimación lo supera,")
+        print("                      procesa por bloques (diferido) o en modo pipeline")
         sys.exit(1)
     
-    file_path = sys.argv[1]
-    model_type = sys.argv[2] if len(sys.argv) > 2 else "logistic"
+    file_path = positional[0]
+    model_type = positional[1] if len(positional) > 1 else "logistic"
     balance_data = "--no-balance" not in sys.argv
+    use_pipeline = "--pipeline" in sys.argv
+    confidence_intervals = "--bootstrap" in sys.argv
+    cross_validation = "--cv" in sys.argv
+    compare = "--compare" in sys.argv
+    lazy = "--lazy" in sys.argv
+    approximate = "--approximate" in sys.argv
+    prune_columns = "--prune-columns" in sys.argv
+    progress_port = _get_option("progress-port", None)
+    archive_dir = _get_option("archive", None)
+    memory_budget = _get_option("memory-budget", None)
+    profile_mode = "cprofile" if "--profile" in sys.argv else _get_option("profile", None)
+    csv_engine = _get_option("csv-engine", "c")
+    
+    if model_type not in MODEL_REGISTRY:
+        print(f"Error: Modelo '{model_type}' no válido. Use uno de: {', '.join(MODEL_REGISTRY)}")
+        sys.exit(1)
+    
+    if use_pipeline and balance_data:
+        # SMOTE necesita todos los registros de cada clase: la memoria no quedaría acotada
+        print("Error: --pipeline no admite balanceo; agregue --no-balance o use --lazy")
+        sys.exit(1)
+    
+    if archive_dir is not None and (use_pipeline or compare or cross_validation or approximate):
+        # El archivo guarda las predicciones por paciente: el pipeline las escribe por
+        # bloques sin conservarlas y los otros modos no producen predicciones por registro
+        print("Error: --archive solo se puede usar con el procesamiento normal o --lazy")
+        sys.exit(1)
+    
+    if profile_mode is not None and (use_pipeline or compare or cross_validation or approximate):
+        # Las etapas perfiladas son las de process_file: los otros modos no las tienen
+        print("Error: --profile solo se puede usar con el procesamiento normal o --lazy")
+        sys.exit(1)
     
-    if model_type not in ["logistic", "neural"]:
-        print(f"Error: Modelo '{model_type}' no válido. Use 'logistic' o 'neural'")
+    if csv_engine not in CSV_ENGINES:
+        print(f"Error: Motor de CSV '{csv_engine}' no válido. Use uno de: {', '.join(CSV_ENGINES)}")
         sys.exit(1)
     
+    if profile_mode is not None and profile_mode not in PROFILE_MODES:
+        print(f"Error: Modo de perfilado '{profile_mode}' no válido. Use uno de: {', '.join(PROFILE_MODES)}")
+        sys.exit(1)
+    
+    progress = None
+    progress_server = None
+    if "--progress" in sys.argv or progress_port is not None:
+        progress = ProgressTracker(callback=_print_progress, min_interval=1.0)
+        # Ctrl+C pide una cancelación cooperativa en lugar de interrumpir
+        signal.signal(signal.SIGINT, lambda signum, frame: progress.cancel())
+    if progress_port is not None:
+        progress_server = ProgressServer(progress, port=int(progress_port)).start()
+        print(f"Progreso disponible en {progress_server.url}/progress")
+    
     try:
         # Crear sistema de predicción
-        system = BatchPredictionSystem(model_type=model_type)
-        
-        # Procesar archivo
-        results = system.process_file(file_path, balance_data=balance_data)
+        system = BatchPredictionSystem(
+            model_type=model_type,
+            memory_budget_mb=float(memory_budget) if memory_budget is not None else None,
+            class_config=_class_config_option(),
+            csv_engine=csv_engine
+        )
         
-        # Guardar resultados
         output_path = file_path.replace('.csv', '_resultados.csv').replace('.xlsx', '_resultados.csv')
-        system.save_results(results, output_path)
+        
+        memory_plan = None
+        if system.memory_budget is not None and not (compare or cross_validation or approximate or use_pipeline):
+            memory_plan = system.estimate_memory(
+                file_path,
+                balance_data=balance_data,
+                prune_columns=prune_columns
+            )
+            # Si el modo pipeline es el que mejor se ajusta al presupuesto, se escribe por
+            # bloques (salvo con --archive, que necesita las predicciones, o con
+            # --profile, que perfila las etapas de process_file: modo diferido)
+            use_pipeline = (
+                memory_plan['mode'] == 'pipeline'
+                and archive_dir is None
+                and profile_mode is None
+            )
+        
+        if compare:
+            # Comparar todos los modelos registrados con una sola carga
+            results = system.compare_models(file_path, balance_data=balance_data)
+            system.save_comparison(results, output_path)
+        elif cross_validation:
+            # Evaluar por pliegues; no se genera archivo de resultados por registro
+            system.cross_validate(
+                file_path,
+                n_folds=int(_get_option("folds", "5")),
+                balance_data=balance_data
+            )
+        elif approximate:
+            # Estimar métricas con una muestra; no se genera archivo de resultados por registro
+            system.process_file_approximate(
+                file_path,
+                margin_of_error=float(_get_option("margin", "0.01"))
+            )
+        elif use_pipeline:
+            # Procesar y guardar por bloques
+            system.process_file_pipeline(
+                file_path,
+                output_path=output_path,
+                confidence_intervals=confidence_intervals,
+                progress=progress,
+                prune_columns=prune_columns,
+                memory_plan=memory_plan
+            )
+            print(f"\nResultados guardados en: {output_path}")
+        else:
+            # Procesar archivo
+            profile = None
+            if profile_mode is not None:
+                profile = StageProfiler(
+                    mode=profile_mode,
+                    output_dir=_get_option("profile-dir", os.path.splitext(file_path)[0] + "_perfil")
+                )
+            
+            results = system.process_file(
+                file_path,
+                balance_data=balance_data,
+                confidence_intervals=confidence_intervals,
+                lazy=lazy,
+                progress=progress,
+                prune_columns=prune_columns,
+                memory_plan=memory_plan,
+                profile=profile
+            )
+            
+            # Guardar resultados
+            system.save_results(results, output_path)
+            
+            if archive_dir is not None:
+                run_id = ResultsArchive(archive_dir).append_run(results)
+                print(f"Ejecución archivada en {archive_dir} como {run_id}")
         
         print("\n✓ Procesamiento completado exitosamente")
         
@@ -222,6 +1655,9 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if progress_server is not None:
+            progress_server.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,198 @@
+"""
+Módulo de presupuesto de memoria: estima el pico de memoria de cada modo de
+procesamiento antes de empezar y elige el modo que cabe en un presupuesto.
+"""
+
+import os
+import sys
+from typing import Dict, Optional
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    # No disponible en Windows: no se informa el pico real
+    RESOURCE_AVAILABLE = False
+
+# Bytes de trabajo por byte de registro durante la predicción de un bloque (claves
+# de hash, valores convertidos a objetos de Python y matriz de características).
+# Medido sobre archivos de 200 mil registros con columnas clínicas y extra.
+PREDICTION_WORKSPACE_FACTOR = 5.5
+
+# Bytes por registro predicho que se conservan hasta el final (listas de
+# predicciones, diagnósticos reales e identificadores, y arreglos de métricas)
+RESULT_BYTES_PER_ROW = 200
+
+# Modos de procesamiento en orden de preferencia (el primero es el más rápido)
+PROCESSING_MODES = ('eager', 'lazy', 'pipeline')
+
+
+def current_memory_bytes() -> Optional[int]:
+    """
+    Obtiene la memoria residente actual del proceso.
+    
+    Returns:
+        Bytes residentes (de /proc/self/statm) o None si no se pueden leer
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def peak_memory_bytes() -> Optional[int]:
+    """
+    Obtiene el pico de memoria residente del proceso.
+    
+    En Linux se lee VmHWM, que reset_peak_memory puede reiniciar; en otras
+    plataformas, ru_maxrss (el pico desde que empezó el proceso).
+    
+    Returns:
+        Bytes del pico o None si no se puede medir
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    
+    if not RESOURCE_AVAILABLE:
+        return None
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa kilobytes; macOS, bytes
+    return int(peak) if sys.platform == 'darwin' else int(peak) * 1024
+
+
+def reset_peak_memory() -> bool:
+    """
+    Reinicia el pico de memoria residente al valor actual (solo Linux).
+    
+    El pico (VmHWM) es uno solo para todo el proceso: el reinicio afecta la medición
+    de cualquier otra ejecución en curso en el mismo proceso, y el pico leído después
+    incluye la memoria de todos los hilos. Solo da una medición por ejecución si se
+    procesa un archivo a la vez.
+    
+    Returns:
+        True si se pudo reiniciar
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+class MemoryTracker:
+    """
+    Mide cuánto sube la memoria residente durante una ejecución.
+    
+    La medición es del proceso completo (ver reset_peak_memory): es válida para una
+    ejecución a la vez. Con varias ejecuciones simultáneas en el mismo proceso (por
+    ejemplo, varios hilos que llaman a process_file) cada una reinicia el pico de las
+    demás y los aumentos informados no corresponden a ninguna en particular.
+    PredictionServer no usa esta medición: process_frame no tiene presupuesto de
+    memoria.
+    """
+    
+    def __init__(self):
+        """Toma la memoria actual como punto de partida y reinicia el pico si se puede."""
+        self.baseline_bytes = current_memory_bytes()
+        self._reset = reset_peak_memory()
+        self._start_peak = peak_memory_bytes()
+    
+    def peak_increase_bytes(self) -> Optional[int]:
+        """
+        Calcula el pico de la ejecución por encima de la memoria inicial.
+        
+        Sin reinicio del pico, solo se puede medir si la ejecución superó el pico
+        anterior del proceso.
+        
+        Returns:
+            Bytes de aumento o None si no se puede medir
+        """
+        peak = peak_memory_bytes()
+        if peak is None or self.baseline_bytes is None:
+            return None
+        if not self._reset and (self._start_peak is None or peak <= self._start_peak):
+            return None
+        return max(0, peak - self.baseline_bytes)
+
+
+def estimate_mode_peaks(
+    total_rows: int,
+    bytes_per_row: float,
+    expansion_factor: float,
+    balance_data: bool = True,
+    block_size: int = 10000,
+    chunk_size: int = 10000,
+    queue_size: int = 4
+) -> Dict[str, int]:
+    """
+    Estima la memoria adicional que usa cada modo de procesamiento.
+    
+    - eager: el DataFrame cargado, el dataset balanceado completo y la predicción
+      de todos los registros en un solo bloque.
+    - lazy: el DataFrame cargado y un bloque balanceado a la vez.
+    - pipeline: bloques de lectura en cola. Las predicciones se escriben por bloques
+      y no se conservan. Solo sin balanceo: el pipeline no admite SMOTE.
+    
+    Args:
+        total_rows: Registros del archivo
+        bytes_per_row: Bytes en memoria por registro cargado
+        expansion_factor: Registros balanceados por cada registro real
+        balance_data: Si se aplica balanceo SMOTE
+        block_size: Registros por bloque de predicción (modo lazy)
+        chunk_size: Registros por bloque del pipeline
+        queue_size: Bloques en espera entre etapas del pipeline
+        
+    Returns:
+        Diccionario modo -> bytes estimados (sin 'pipeline' si hay balanceo)
+    """
+    frame_bytes = total_rows * bytes_per_row
+    predicted_rows = total_rows * expansion_factor if balance_data else total_rows
+    workspace = PREDICTION_WORKSPACE_FACTOR * bytes_per_row
+    results = predicted_rows * RESULT_BYTES_PER_ROW
+    
+    eager = frame_bytes + predicted_rows * workspace + results
+    if balance_data:
+        eager += predicted_rows * bytes_per_row
+    
+    lazy_rows = min(block_size, predicted_rows)
+    lazy = frame_bytes + lazy_rows * (bytes_per_row + workspace) + results
+    
+    mode_peaks = {'eager': int(eager), 'lazy': int(lazy)}
+    if not balance_data:
+        pipeline_rows = min(chunk_size, total_rows)
+        pipeline = queue_size * pipeline_rows * bytes_per_row + pipeline_rows * workspace
+        mode_peaks['pipeline'] = int(pipeline)
+    
+    return mode_peaks
+
+
+def select_mode(mode_peaks: Dict[str, int], budget_bytes: Optional[int]) -> str:
+    """
+    Elige el primer modo, en orden de preferencia, que no supera el presupuesto.
+    
+    Args:
+        mode_peaks: Pico de memoria estimado del proceso por modo (solo los modos
+            disponibles)
+        budget_bytes: Presupuesto para el pico del proceso (None = sin límite)
+        
+    Returns:
+        Modo elegido; si ninguno cabe, el de menor pico estimado
+    """
+    if budget_bytes is None:
+        return PROCESSING_MODES[0]
+    
+    modes = [mode for mode in PROCESSING_MODES if mode in mode_peaks]
+    for mode in modes:
+        if mode_peaks[mode] <= budget_bytes:
+            return mode
+    
+    return min(modes, key=lambda mode: mode_peaks[mode])
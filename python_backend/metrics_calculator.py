@@ -4,8 +4,12 @@ y matriz de confusión.
 """
 
 import numpy as np
-from typing import List, Dict, Tuple
+import pandas as pd
+from typing import List, Dict, Tuple, Optional, Sequence
 from collections import defaultdict
+from statistics import NormalDist
+import math
+import time
 
 
 class MetricsCalculator:
@@ -21,6 +25,19 @@ class MetricsCalculator:
         self.class_labels = class_labels
         self.num_classes = len(class_labels)
         self.class_to_index = {label: idx for idx, label in enumerate(class_labels)}
+        self._class_index = pd.Index(class_labels)
+    
+    def encode_labels(self, labels: Sequence[str]) -> np.ndarray:
+        """
+        Convierte etiquetas en códigos de clase (posición en class_labels).
+        
+        Args:
+            labels: Etiquetas de clase
+            
+        Returns:
+            Arreglo de enteros; -1 para las etiquetas desconocidas
+        """
+        return self._class_index.get_indexer(pd.Index(labels, dtype=object))
     
     def build_confusion_matrix(
         self,
@@ -37,15 +54,39 @@ class MetricsCalculator:
         Returns:
             Matriz de confusión (numpy array)
         """
-        confusion_matrix = np.zeros((self.num_classes, self.num_classes), dtype=int)
+        return self.build_confusion_matrix_from_codes(
+            self.encode_labels(actual),
+            self.encode_labels(predicted)
+        )
+    
+    def build_confusion_matrix_from_codes(
+        self,
+        actual_codes: np.ndarray,
+        predicted_codes: np.ndarray
+    ) -> np.ndarray:
+        """
+        Construye la matriz de confusión a partir de códigos de clase, con un solo conteo.
         
-        for actual_label, predicted_label in zip(actual, predicted):
-            if actual_label in self.class_to_index and predicted_label in self.class_to_index:
-                actual_idx = self.class_to_index[actual_label]
-                predicted_idx = self.class_to_index[predicted_label]
-                confusion_matrix[actual_idx][predicted_idx] += 1
+        Los pares con algún código fuera de rango (por ejemplo -1) se ignoran.
         
-        return confusion_matrix
+        Args:
+            actual_codes: Código de clase real de cada registro
+            predicted_codes: Código de clase predicho de cada registro
+            
+        Returns:
+            Matriz de confusión (numpy array)
+        """
+        actual_codes = np.asarray(actual_codes, dtype=np.int64)
+        predicted_codes = np.asarray(predicted_codes, dtype=np.int64)
+        valid = (
+            (actual_codes >= 0) & (actual_codes < self.num_classes) &
+            (predicted_codes >= 0) & (predicted_codes < self.num_classes)
+        )
+        counts = np.bincount(
+            actual_codes[valid] * self.num_classes + predicted_codes[valid],
+            minlength=self.num_classes * self.num_classes
+        )
+        return counts.reshape(self.num_classes, self.num_classes)
     
     def calculate_accuracy(self, confusion_matrix: np.ndarray) -> float:
         """
@@ -74,20 +115,12 @@ class MetricsCalculator:
         Returns:
             Precisión promedio como porcentaje
         """
-        precisions = []
-        
-        for i in range(self.num_classes):
-            tp = confusion_matrix[i, i]
-            fp = np.sum(confusion_matrix[:, i]) - tp
-            
-            if tp + fp > 0:
-                precision = tp / (tp + fp)
-                precisions.append(precision)
-        
-        if not precisions:
+        # Se promedian solo las clases con alguna predicción
+        ratios, valid = self._class_ratios(confusion_matrix, axis=0)
+        if not valid.any():
             return 0.0
         
-        return (np.mean(precisions) * 100)
+        return (np.mean(ratios[valid]) * 100)
     
     def calculate_recall(self, confusion_matrix: np.ndarray) -> float:
         """
@@ -99,20 +132,35 @@ class MetricsCalculator:
         Returns:
             Recall promedio como porcentaje
         """
-        recalls = []
-        
-        for i in range(self.num_classes):
-            tp = confusion_matrix[i, i]
-            fn = np.sum(confusion_matrix[i, :]) - tp
-            
-            if tp + fn > 0:
-                recall = tp / (tp + fn)
-                recalls.append(recall)
-        
-        if not recalls:
+        # Se promedian solo las clases con algún caso real
+        ratios, valid = self._class_ratios(confusion_matrix, axis=1)
+        if not valid.any():
             return 0.0
         
-        return (np.mean(recalls) * 100)
+        return (np.mean(ratios[valid]) * 100)
+    
+    def _class_ratios(self, confusion_matrix: np.ndarray, axis: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calcula tp/total de todas las clases a la vez.
+        
+        Args:
+            confusion_matrix: Matriz de confusión
+            axis: 0 para totales por columna (precisión), 1 por fila (recall)
+            
+        Returns:
+            Tupla con (razón por clase, clases con total mayor que cero)
+        """
+        confusion_matrix = np.asarray(confusion_matrix)
+        true_positives = np.diagonal(confusion_matrix)
+        totals = confusion_matrix.sum(axis=axis)
+        valid = totals > 0
+        ratios = np.divide(
+            true_positives,
+            totals,
+            out=np.zeros(len(totals)),
+            where=valid
+        )
+        return ratios, valid
     
     def calculate_f1_score(
         self,
@@ -150,6 +198,25 @@ class MetricsCalculator:
             Diccionario con todas las métricas
         """
         confusion_matrix = self.build_confusion_matrix(actual, predicted)
+        return self.calculate_metrics_from_confusion_matrix(confusion_matrix)
+    
+    def calculate_metrics_from_confusion_matrix(
+        self,
+        confusion_matrix: np.ndarray
+    ) -> Dict[str, float]:
+        """
+        Calcula todas las métricas a partir de una matriz de confusión ya construida.
+        
+        Permite acumular matrices parciales (por ejemplo, por bloques) y calcular
+        las métricas una sola vez al final.
+        
+        Args:
+            confusion_matrix: Matriz de confusión
+            
+        Returns:
+            Diccionario con todas las métricas
+        """
+        confusion_matrix = np.asarray(confusion_matrix)
         
         accuracy = self.calculate_accuracy(confusion_matrix)
         precision = self.calculate_precision(confusion_matrix)
@@ -164,6 +231,236 @@ class MetricsCalculator:
             'confusion_matrix': confusion_matrix.tolist()
         }
     
+    def calculate_metrics_batch(self, confusion_matrices: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Calcula accuracy, precisión, recall y F1 macro para un lote de matrices de confusión.
+        
+        Aplica las mismas reglas que los métodos individuales (las clases sin
+        predicciones o sin casos reales se excluyen del promedio), pero de forma
+        vectorizada sobre el primer eje.
+        
+        Args:
+            confusion_matrices: Arreglo de forma (n, clases, clases)
+            
+        Returns:
+            Diccionario con un arreglo de longitud n por métrica (en porcentaje)
+        """
+        matrices = np.asarray(confusion_matrices, dtype=float)
+        
+        true_positives = np.diagonal(matrices, axis1=1, axis2=2)
+        predicted_totals = matrices.sum(axis=1)
+        actual_totals = matrices.sum(axis=2)
+        totals = matrices.sum(axis=(1, 2))
+        
+        accuracy = np.divide(
+            true_positives.sum(axis=1),
+            totals,
+            out=np.zeros_like(totals),
+            where=totals > 0
+        ) * 100
+        
+        precision = self._macro_average(true_positives, predicted_totals)
+        recall = self._macro_average(true_positives, actual_totals)
+        
+        denominator = precision + recall
+        f1_score = np.divide(
+            2 * precision * recall,
+            denominator,
+            out=np.zeros_like(denominator),
+            where=denominator > 0
+        )
+        
+        return {
+            'accuracy': accuracy,
+            'precision': precision,
+            'recall': recall,
+            'f1_score': f1_score
+        }
+    
+    def _macro_average(self, true_positives: np.ndarray, totals: np.ndarray) -> np.ndarray:
+        """Promedia tp/total por clase, ignorando las clases con total cero."""
+        valid = totals > 0
+        ratios = np.divide(true_positives, totals, out=np.zeros_like(totals), where=valid)
+        valid_count = valid.sum(axis=1)
+        
+        return np.divide(
+            ratios.sum(axis=1),
+            valid_count,
+            out=np.zeros(len(valid_count)),
+            where=valid_count > 0
+        ) * 100
+    
+    def bootstrap_confidence_intervals(
+        self,
+        confusion_matrix: np.ndarray,
+        n_resamples: int = 10000,
+        confidence: float = 0.95,
+        seed: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        batch_size: int = 2000,
+        population_counts: Optional[Sequence[int]] = None
+    ) -> Dict:
+        """
+        Calcula intervalos de confianza bootstrap para las métricas macro.
+        
+        Remuestrear los pares (real, predicho) con reemplazo equivale a extraer los
+        conteos de la matriz de confusión de una distribución multinomial con las
+        frecuencias observadas, así que cada lote de réplicas se genera con una sola
+        llamada a NumPy y sus métricas se calculan en bloque.
+        
+        Si la matriz proviene de una muestra estratificada por clase real, se indica
+        population_counts: cada fila se remuestrea por separado con su propio tamaño
+        de muestra y se escala a la cantidad de registros de su clase en la población.
+        La estimación puntual usa la matriz escalada. El remuestreo no aplica la
+        corrección por población finita, así que los intervalos son conservadores.
+        
+        Args:
+            confusion_matrix: Matriz de confusión observada
+            n_resamples: Cantidad de réplicas bootstrap
+            confidence: Nivel de confianza (por ejemplo 0.95)
+            seed: Semilla del generador aleatorio
+            max_seconds: Tiempo máximo de cómputo; al agotarse se usan las réplicas
+                generadas hasta ese momento (siempre se completa al menos un lote)
+            batch_size: Cantidad de réplicas generadas por llamada
+            population_counts: Registros de cada clase real en la población (opcional)
+            
+        Returns:
+            Diccionario con estimación e intervalo por métrica y datos de la ejecución
+        """
+        if not 0 < confidence < 1:
+            raise ValueError("El nivel de confianza debe estar entre 0 y 1")
+        
+        confusion_matrix = np.asarray(confusion_matrix)
+        total = int(confusion_matrix.sum())
+        shape = (self.num_classes, self.num_classes)
+        
+        if population_counts is None:
+            row_weights = None
+            point_estimates = self.calculate_metrics_batch(confusion_matrix[np.newaxis])
+        else:
+            row_totals = confusion_matrix.sum(axis=1)
+            row_weights = np.divide(
+                np.asarray(population_counts, dtype=float),
+                row_totals,
+                out=np.zeros(self.num_classes),
+                where=row_totals > 0
+            )
+            point_estimates = self.calculate_metrics_batch(
+                (confusion_matrix * row_weights[:, np.newaxis])[np.newaxis]
+            )
+        
+        rng = np.random.default_rng(seed)
+        start = time.perf_counter()
+        replicates = {name: [] for name in point_estimates}
+        done = 0
+        truncated = False
+        
+        if total > 0:
+            probabilities = confusion_matrix.ravel() / total
+            
+            while done < n_resamples:
+                size = min(batch_size, n_resamples - done)
+                if row_weights is None:
+                    counts = rng.multinomial(total, probabilities, size=size).reshape((size,) + shape)
+                else:
+                    counts = self._stratified_resample(confusion_matrix, row_weights, rng, size)
+                batch_metrics = self.calculate_metrics_batch(counts)
+                for name, values in batch_metrics.items():
+                    replicates[name].append(values)
+                done += size
+                
+                if max_seconds is not None and time.perf_counter() - start > max_seconds:
+                    truncated = done < n_resamples
+                    break
+        
+        alpha = (1 - confidence) / 2
+        intervals = {}
+        for name, estimate in point_estimates.items():
+            if done > 0:
+                values = np.concatenate(replicates[name])
+                lower, upper = np.quantile(values, [alpha, 1 - alpha])
+            else:
+                lower = upper = estimate[0]
+            
+            intervals[name] = {
+                'estimate': float(estimate[0]),
+                'lower': float(lower),
+                'upper': float(upper)
+            }
+        
+        return {
+            'metrics': intervals,
+            'confidence': confidence,
+            'n_resamples': done,
+            'truncated': truncated,
+            'seed': seed,
+            'elapsed_seconds': time.perf_counter() - start
+        }
+    
+    def _stratified_resample(
+        self,
+        confusion_matrix: np.ndarray,
+        row_weights: np.ndarray,
+        rng: np.random.Generator,
+        size: int
+    ) -> np.ndarray:
+        """
+        Genera réplicas remuestreando cada fila (clase real) por separado.
+        
+        Args:
+            confusion_matrix: Matriz de confusión de la muestra
+            row_weights: Factor de expansión de cada fila a la población
+            rng: Generador aleatorio
+            size: Cantidad de réplicas
+            
+        Returns:
+            Arreglo de forma (size, clases, clases) con las matrices escaladas
+        """
+        replicates = np.zeros((size, self.num_classes, self.num_classes))
+        for row, row_counts in enumerate(confusion_matrix):
+            row_total = int(row_counts.sum())
+            if row_total == 0:
+                continue
+            replicates[:, row, :] = rng.multinomial(row_total, row_counts / row_total, size=size)
+        
+        return replicates * row_weights[np.newaxis, :, np.newaxis]
+    
+    def required_sample_size(
+        self,
+        margin_of_error: float,
+        confidence: float = 0.95,
+        population: Optional[int] = None
+    ) -> int:
+        """
+        Calcula el tamaño de muestra para estimar una proporción con un margen dado.
+        
+        Usa n = z² · p(1 - p) / e² con p = 0.5 (el caso más desfavorable) y, si se
+        conoce el tamaño de la población, la corrección por población finita.
+        
+        Args:
+            margin_of_error: Margen de error deseado como fracción (por ejemplo 0.01)
+            confidence: Nivel de confianza (por ejemplo 0.95)
+            population: Tamaño de la población (opcional)
+            
+        Returns:
+            Tamaño de muestra
+        """
+        if not 0 < margin_of_error < 1:
+            raise ValueError("El margen de error debe estar entre 0 y 1")
+        if not 0 < confidence < 1:
+            raise ValueError("El nivel de confianza debe estar entre 0 y 1")
+        
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        sample_size = z ** 2 * 0.25 / margin_of_error ** 2
+        
+        if population is not None:
+            if population <= 0:
+                return 0
+            sample_size = sample_size / (1 + (sample_size - 1) / population)
+            return min(population, math.ceil(sample_size))
+        
+        return math.ceil(sample_size)
+    
     def get_class_metrics(
         self,
         confusion_matrix: np.ndarray,
@@ -182,25 +479,45 @@ class MetricsCalculator:
         if class_label not in self.class_to_index:
             return {}
         
-        idx = self.class_to_index[class_label]
+        return self.calculate_class_metrics(confusion_matrix)[class_label]
+    
+    def calculate_class_metrics(self, confusion_matrix: np.ndarray) -> Dict[str, Dict[str, float]]:
+        """
+        Calcula las métricas de todas las clases a la vez.
         
-        tp = confusion_matrix[idx, idx]
-        fp = np.sum(confusion_matrix[:, idx]) - tp
-        fn = np.sum(confusion_matrix[idx, :]) - tp
-        tn = np.sum(confusion_matrix) - tp - fp - fn
+        Args:
+            confusion_matrix: Matriz de confusión
+            
+        Returns:
+            Diccionario etiqueta -> métricas de la clase (como get_class_metrics)
+        """
+        confusion_matrix = np.asarray(confusion_matrix)
+        tp = np.diagonal(confusion_matrix)
+        fp = confusion_matrix.sum(axis=0) - tp
+        fn = confusion_matrix.sum(axis=1) - tp
+        tn = confusion_matrix.sum() - tp - fp - fn
         
-        precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
-        recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
-        f1 = self.calculate_f1_score(precision * 100, recall * 100)
+        precision = self._class_ratios(confusion_matrix, axis=0)[0] * 100
+        recall = self._class_ratios(confusion_matrix, axis=1)[0] * 100
+        denominator = precision + recall
+        f1 = np.divide(
+            2 * precision * recall,
+            denominator,
+            out=np.zeros(self.num_classes),
+            where=denominator > 0
+        )
         
         return {
-            'precision': precision * 100,
-            'recall': recall * 100,
-            'f1_score': f1,
-            'true_positives': int(tp),
-            'false_positives': int(fp),
-            'false_negatives': int(fn),
-            'true_negatives': int(tn)
+            label: {
+                'precision': float(precision[idx]),
+                'recall': float(recall[idx]),
+                'f1_score': float(f1[idx]),
+                'true_positives': int(tp[idx]),
+                'false_positives': int(fp[idx]),
+                'false_negatives': int(fn[idx]),
+                'true_negatives': int(tn[idx])
+            }
+            for idx, label in enumerate(self.class_labels)
         }
     
     def print_confusion_matrix(self, confusion_matrix: np.ndarray):
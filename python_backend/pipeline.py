@@ -0,0 +1,169 @@
+"""
+Módulo de ejecución en pipeline: encadena etapas mediante colas acotadas para
+solapar lectura, cómputo y escritura durante el procesamiento por lotes.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+
+# Marca de fin de flujo entre etapas
+_END = object()
+
+
+class StagePipeline:
+    """Pipeline lineal de etapas conectadas por colas acotadas."""
+    
+    def __init__(self, queue_size: int = 4, poll_interval: float = 0.1):
+        """
+        Inicializa el pipeline.
+        
+        Args:
+            queue_size: Cantidad máxima de bloques en espera entre dos etapas.
+                Una cola llena bloquea a la etapa productora (contrapresión).
+            poll_interval: Intervalo en segundos para revisar si el pipeline fue detenido
+        """
+        if queue_size < 1:
+            raise ValueError("El tamaño de cola debe ser al menos 1")
+        
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.stages: List[Tuple[str, Callable]] = []
+    
+    def add_stage(self, name: str, func: Callable) -> 'StagePipeline':
+        """
+        Agrega una etapa al final del pipeline.
+        
+        La primera etapa es la fuente: se invoca sin argumentos y debe devolver un
+        iterable de bloques. Las siguientes reciben un iterador con los bloques de la
+        etapa anterior y devuelven un iterable con sus propios bloques. La última etapa
+        solo consume su entrada; lo que devuelva se ignora.
+        
+        Args:
+            name: Nombre de la etapa (usado en las estadísticas)
+            func: Función de la etapa
+            
+        Returns:
+            El mismo pipeline, para encadenar llamadas
+        """
+        self.stages.append((name, func))
+        return self
+    
+    def run(self) -> Dict[str, Any]:
+        """
+        Ejecuta todas las etapas en paralelo hasta agotar la fuente.
+        
+        Cada etapa corre en un hilo de un mismo pool. Si una etapa falla, el resto se
+        detiene y la excepción se propaga al llamador. Si una etapa termina sin leer
+        toda su entrada, su cola de entrada se cierra: las etapas anteriores dejan de
+        producir en lugar de quedar bloqueadas con la cola llena, y las posteriores
+        terminan de procesar lo que ya recibieron.
+        
+        Returns:
+            Diccionario con el tiempo total y las estadísticas por etapa
+            (bloques leídos o producidos, tiempo activo y tiempo en espera)
+        """
+        if not self.stages:
+            raise ValueError("El pipeline no tiene etapas")
+        
+        num_stages = len(self.stages)
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(num_stages - 1)]
+        # Cola cerrada: la etapa que la consume ya terminó
+        closed = [threading.Event() for _ in queues]
+        stop_event = threading.Event()
+        errors: List[BaseException] = []
+        stats = {
+            name: {'blocks': 0, 'busy_seconds': 0.0, 'wait_seconds': 0.0}
+            for name, _ in self.stages
+        }
+        
+        def put(position: int, item: Any, stage_stats: Dict) -> bool:
+            q = queues[position]
+            start = time.perf_counter()
+            try:
+                while not stop_event.is_set() and not closed[position].is_set():
+                    try:
+                        q.put(item, timeout=self.poll_interval)
+                        return True
+                    except queue.Full:
+                        continue
+                return False
+            finally:
+                stage_stats['wait_seconds'] += time.perf_counter() - start
+        
+        def iter_input(q: queue.Queue, stage_stats: Dict) -> Iterator[Any]:
+            while True:
+                start = time.perf_counter()
+                item = _END
+                while not stop_event.is_set():
+                    try:
+                        item = q.get(timeout=self.poll_interval)
+                        break
+                    except queue.Empty:
+                        continue
+                stage_stats['wait_seconds'] += time.perf_counter() - start
+                
+                if item is _END:
+                    return
+                stage_stats['blocks'] += 1
+                yield item
+        
+        def worker(position: int):
+            name, func = self.stages[position]
+            stage_stats = stats[name]
+            in_queue = queues[position - 1] if position > 0 else None
+            has_output = position < num_stages - 1
+            start = time.perf_counter()
+            
+            try:
+                if in_queue is None:
+                    outputs = func()
+                else:
+                    outputs = func(iter_input(in_queue, stage_stats))
+                
+                if not has_output:
+                    # Etapa final: consumir el resultado si es un generador
+                    if outputs is not None:
+                        for _ in outputs:
+                            pass
+                else:
+                    for item in outputs:
+                        if in_queue is None:
+                            stage_stats['blocks'] += 1
+                        if not put(position, item, stage_stats):
+                            return
+                    put(position, _END, stage_stats)
+            except BaseException as e:
+                errors.append(e)
+                stop_event.set()
+            finally:
+                if in_queue is not None:
+                    # Liberar a la etapa anterior si quedó esperando lugar en la cola
+                    closed[position - 1].set()
+                    while True:
+                        try:
+                            in_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                elapsed = time.perf_counter() - start
+                stage_stats['busy_seconds'] = max(0.0, elapsed - stage_stats['wait_seconds'])
+        
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=num_stages, thread_name_prefix="pipeline") as executor:
+            futures = [executor.submit(worker, position) for position in range(num_stages)]
+            for future in futures:
+                future.result()
+        wall_seconds = time.perf_counter() - wall_start
+        
+        if errors:
+            raise errors[0]
+        
+        return {
+            'wall_seconds': wall_seconds,
+            'queue_size': self.queue_size,
+            'stages': stats
+        }
+
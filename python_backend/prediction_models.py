@@ -4,22 +4,389 @@ Simula el comportamiento de modelos entrenados con datos balanceados por SMOTE.
 """
 
 import numpy as np
-from typing import Dict, Any, Tuple
+import pandas as pd
+from typing import Dict, Any, Tuple, List, Optional, Type
 import hashlib
 
+from data_processor import derive_seed, frame_row_keys, label_seed
+
+
+# Columnas aceptadas para cada variable clínica, en orden de prioridad
+NUMERIC_FEATURES = {
+    'plaquetas': ['Plaquetas', 'plaquetas'],
+    'temperatura': ['Temperatura', 'temperatura'],
+    'hemoglobina': ['Hemoglobina', 'hemoglobina'],
+    'edad': ['Edad', 'edad']
+}
+
+BINARY_FEATURES = {
+    'fiebre': ['Fiebre', 'fiebre'],
+    'dolor_cabeza': ['Dolor_Cabeza', 'dolor_cabeza', 'DolorCabeza']
+}
+
+# Diagnósticos que pueden producir las reglas, en el orden de sus códigos
+RULE_LABELS = ["Dengue", "Malaria", "Leptospirosis"]
+
+# Puntos de corte clínicos de las reglas de predicción
+DEFAULT_THRESHOLDS = {
+    'plaquetas_dengue': 100.0,            # plaquetas < umbral
+    'temperatura_dengue': 38.0,           # temperatura > umbral
+    'temperatura_malaria': 39.0,          # temperatura > umbral
+    'hemoglobina_malaria': 12.0,          # hemoglobina < umbral
+    'temperatura_leptospirosis': 38.5,    # temperatura > umbral
+    'hemoglobina_leptospirosis': 13.0     # hemoglobina < umbral
+}
+
+
+def clinical_dtypes(sample: pd.DataFrame) -> Dict[str, str]:
+    """
+    Sugiere tipos de columna para leer un archivo a partir del esquema clínico.
+    
+    Las columnas binarias (sí/no) que en la muestra se leen como texto se piden como
+    category: sus valores siguen siendo texto, así que la representación de cada
+    registro no cambia, y ocupan mucha menos memoria. Las columnas numéricas se dejan
+    a la inferencia del lector para no convertir enteros en decimales.
+    
+    Args:
+        sample: Primeros registros del archivo
+        
+    Returns:
+        Diccionario columna -> tipo para read_csv o read_excel
+    """
+    binary_columns = {key for keys in BINARY_FEATURES.values() for key in keys}
+    return {
+        col: 'category'
+        for col in sample.columns
+        if col in binary_columns and not pd.api.types.is_numeric_dtype(sample[col].dtype)
+    }
+
+
+def _normalize_value(value: Any, default: float = 0.0) -> float:
+    """Normaliza un valor a float."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ['sí', 'si', 'true', '1']:
+            return 1.0
+        if value in ['no', 'false', '0']:
+            return 0.0
+        try:
+            return float(value)
+        except ValueError:
+            return default
+    return default
+
+
+def _binary_decision(value: Any) -> Optional[bool]:
+    """Interpreta un valor como sí/no; devuelve None si no es concluyente."""
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ['sí', 'si', 'true', '1']:
+            return True
+        if value in ['no', 'false', '0']:
+            return False
+        return None
+    if isinstance(value, (int, float)):
+        return bool(value)
+    return None
+
+
+def _map_values(values: List[Any], func) -> List[Any]:
+    """Aplica una función a cada valor, evaluándola una sola vez por valor distinto."""
+    cache = {}
+    result = []
+    for value in values:
+        try:
+            mapped = cache[value]
+        except KeyError:
+            mapped = cache[value] = func(value)
+        except TypeError:
+            mapped = func(value)
+        result.append(mapped)
+    return result
+
+
+class FeatureMatrix:
+    """
+    Variables clínicas de un conjunto de registros, extraídas una sola vez.
+    
+    Guarda como arreglos NumPy las variables que usan las reglas de los modelos y
+    la representación textual de cada registro que alimenta el hash determinístico.
+    Así varios modelos pueden predecir sobre los mismos datos sin volver a recorrer
+    las filas ni a convertir cada registro en diccionario.
+    
+    Los registros idénticos se agrupan: la representación textual, el hash y las
+    variables se calculan una vez por registro distinto y se expanden con inverse
+    al orden original. El índice y el diagnóstico real se guardan por registro,
+    así que las predicciones no cambian respecto a procesar cada fila.
+    """
+    
+    def __init__(
+        self,
+        row_keys: List[str],
+        actual: List[str],
+        index: Any,
+        columns: Dict[str, List[Any]],
+        records: Optional[List[Dict[str, Any]]] = None,
+        frame: Optional[pd.DataFrame] = None,
+        inverse: Optional[np.ndarray] = None
+    ):
+        """
+        Inicializa la matriz de características.
+        
+        Normalmente se construye con from_frame o from_records.
+        
+        Args:
+            row_keys: Representación textual de cada registro distinto (entrada del hash)
+            actual: Diagnóstico real de cada registro
+            index: Índice de cada registro
+            columns: Valores por columna de cada registro distinto, para las columnas
+                clínicas presentes
+            records: Registros originales como diccionarios (opcional)
+            frame: DataFrame de origen (opcional)
+            inverse: Posición en row_keys de cada registro (None si no hay agrupación)
+        """
+        self.row_keys = row_keys
+        self.actual = list(actual)
+        self.index = np.asarray(index)
+        self.unique_count = len(row_keys)
+        self.inverse = np.arange(self.unique_count) if inverse is None else np.asarray(inverse)
+        self.size = len(self.inverse)
+        self._records = records
+        self._frame = frame
+        
+        missing = [None] * self.unique_count
+        
+        self.numeric: Dict[str, np.ndarray] = {}
+        for name, keys in NUMERIC_FEATURES.items():
+            # Equivale a data.get(clave_1) or data.get(clave_2) or ...
+            values = columns.get(keys[0], missing)
+            for key in keys[1:]:
+                fallback = columns.get(key, missing)
+                values = [value if value else other for value, other in zip(values, fallback)]
+            self.numeric[name] = np.array(
+                _map_values(values, _normalize_value),
+                dtype=float
+            )[self.inverse]
+        
+        self.binary: Dict[str, np.ndarray] = {}
+        for name, keys in BINARY_FEATURES.items():
+            decided = np.full(self.unique_count, -1, dtype=np.int8)
+            for key in keys:
+                if key not in columns:
+                    continue
+                decisions = _map_values(columns[key], _binary_decision)
+                codes = np.array(
+                    [-1 if decision is None else int(decision) for decision in decisions],
+                    dtype=np.int8
+                )
+                pending = decided == -1
+                decided[pending] = codes[pending]
+            self.binary[name] = (decided == 1)[self.inverse]
+    
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        target_column: str,
+        deduplicate: bool = True
+    ) -> 'FeatureMatrix':
+        """
+        Construye la matriz a partir de un DataFrame, trabajando por columnas.
+        
+        Con deduplicate, las filas se agrupan por su representación textual (la
+        misma cadena que entra al hash), así que solo se unen filas con valores y
+        tipos idénticos (1 y '1' quedan separadas), y el hash y las variables se
+        calculan sobre la primera aparición de cada una.
+        
+        Args:
+            df: DataFrame con los registros
+            target_column: Nombre de la columna de diagnóstico
+            deduplicate: Si True, agrupa las filas idénticas
+            
+        Returns:
+            Matriz de características
+        """
+        inverse = None
+        column_values = {col: df[col].tolist() for col in df.columns}
+        row_keys = frame_row_keys(df, column_values)
+        
+        if deduplicate and len(df) > 1:
+            codes, unique_keys = pd.factorize(np.array(row_keys, dtype=object))
+            if len(unique_keys) < len(df):
+                # factorize numera en orden de aparición: la primera posición de
+                # cada código conserva el orden original
+                first_positions = np.unique(codes, return_index=True)[1].tolist()
+                inverse = codes
+                row_keys = list(unique_keys)
+                column_values = {
+                    col: [values[position] for position in first_positions]
+                    for col, values in column_values.items()
+                }
+        
+        clinical_columns = {
+            key: column_values[key]
+            for keys in list(NUMERIC_FEATURES.values()) + list(BINARY_FEATURES.values())
+            for key in keys
+            if key in column_values
+        }
+        
+        return cls(
+            row_keys,
+            df[target_column].tolist(),
+            df.index,
+            clinical_columns,
+            frame=df,
+            inverse=inverse
+        )
+    
+    @classmethod
+    def from_records(
+        cls,
+        records: List[Dict[str, Any]],
+        actual: List[str],
+        index: List[int]
+    ) -> 'FeatureMatrix':
+        """
+        Construye la matriz a partir de registros individuales.
+        
+        Args:
+            records: Lista de diccionarios con los datos de cada paciente
+            actual: Diagnóstico real de cada registro
+            index: Índice de cada registro
+            
+        Returns:
+            Matriz de características
+        """
+        row_keys = [str(sorted(record.items())) for record in records]
+        
+        clinical_columns = {}
+        for keys in list(NUMERIC_FEATURES.values()) + list(BINARY_FEATURES.values()):
+            for key in keys:
+                if any(key in record for record in records):
+                    # Las claves ausentes se tratan como en data.get(clave)
+                    clinical_columns[key] = [record.get(key) for record in records]
+        
+        return cls(row_keys, actual, index, clinical_columns, records=records)
+    
+    def records(self) -> List[Dict[str, Any]]:
+        """
+        Devuelve los registros como diccionarios, para modelos que predicen fila a fila.
+        
+        Returns:
+            Lista de diccionarios
+        """
+        if self._records is None:
+            self._records = self._frame.to_dict('records') if self._frame is not None else []
+        return self._records
+    
+    def hash_values(self, seed: int) -> np.ndarray:
+        """
+        Calcula el hash determinístico de cada registro (igual a _get_data_hash).
+        
+        Args:
+            seed: Semilla del modelo
+            
+        Returns:
+            Arreglo con un hash entre 0 y 9999 por registro
+        """
+        suffix = str(seed)
+        unique_hashes = np.fromiter(
+            (
+                int(hashlib.md5((key + suffix).encode()).hexdigest(), 16) % 10000
+                for key in self.row_keys
+            ),
+            dtype=np.int64,
+            count=self.unique_count
+        )
+        return unique_hashes[self.inverse]
+    
+    def deduplication_stats(self) -> Dict[str, Any]:
+        """
+        Resume la agrupación de registros idénticos.
+        
+        Returns:
+            Diccionario con total de registros, registros distintos y la razón
+            total/distintos (1.0 cuando no hay duplicados)
+        """
+        return {
+            'total_rows': self.size,
+            'unique_rows': self.unique_count,
+            'dedup_ratio': self.size / self.unique_count if self.unique_count else 1.0
+        }
+    
+    def label_offsets(self, seed: int) -> np.ndarray:
+        """
+        Devuelve un desplazamiento pseudoaleatorio por el diagnóstico real de cada registro.
+        
+        La semilla completa de la etiqueta (ver label_seed) entra a derive_seed junto
+        con la del modelo, así que etiquetas distintas dan desplazamientos
+        independientes en lugar de reducirse antes a unos pocos valores.
+        
+        Args:
+            seed: Semilla del modelo
+            
+        Returns:
+            Arreglo con un entero entre 0 y 9999 por registro
+        """
+        def offset(label: Any) -> int:
+            return int(derive_seed(seed, label_seed(label)).generate_state(1)[0]) % 10000
+        
+        return np.array(_map_values(self.actual, offset), dtype=np.int64)
+    
+    def label_codes(self, class_labels: List[str]) -> np.ndarray:
+        """
+        Convierte el diagnóstico real de cada registro en su código de clase.
+        
+        Args:
+            class_labels: Etiquetas de clase, en el orden de sus códigos
+            
+        Returns:
+            Arreglo de enteros; -1 para los diagnósticos fuera de class_labels
+        """
+        return pd.Index(class_labels).get_indexer(pd.Index(self.actual, dtype=object))
+
 
 class PredictionModel:
     """Clase base para modelos de predicción."""
     
+    display_name = "Modelo"
+    
+    # Si fit ajusta parámetros con los datos de entrenamiento. Los modelos simulados
+    # no lo hacen, así que balancear su lado de entrenamiento no cambia nada.
+    trainable = False
+    
+    # Se suma a random_seed para que cada tipo de modelo tenga sorteos propios
+    draw_seed_offset = 0
+    
     def __init__(self, random_seed: int = 42):
         """
         Inicializa el modelo de predicción.
         
+        Los sorteos dependen solo de random_seed y de cada registro, sin estado
+        aleatorio compartido, así que varias instancias (o varios hilos con la misma
+        instancia) pueden predecir a la vez.
+        
         Args:
             random_seed: Semilla para reproducibilidad
         """
         self.random_seed = random_seed
-        np.random.seed(random_seed)
+        self.set_class_labels(RULE_LABELS)
+    
+    @property
+    def draw_seed(self) -> int:
+        """Semilla de los sorteos del modelo (random_seed más draw_seed_offset)."""
+        return self.random_seed + self.draw_seed_offset
+    
+    def set_class_labels(self, class_labels: List[str]):
+        """
+        Define las clases de diagnóstico que puede predecir el modelo.
+        
+        Args:
+            class_labels: Etiquetas de clase, en el orden de sus códigos
+        """
+        self.class_labels = list(class_labels)
     
     def _get_data_hash(self, data: Dict[str, Any], seed: int = 0) -> int:
         """Genera un hash determinístico a partir de los datos."""
@@ -28,34 +395,51 @@ class PredictionModel:
     
     def _normalize_value(self, value: Any, default: float = 0.0) -> float:
         """Normaliza un valor a float."""
-        if isinstance(value, (int, float)):
-            return float(value)
-        if isinstance(value, str):
-            value = value.strip().lower()
-            if value in ['sí', 'si', 'true', '1']:
-                return 1.0
-            if value in ['no', 'false', '0']:
-                return 0.0
-            try:
-                return float(value)
-            except ValueError:
-                return default
-        return default
+        return _normalize_value(value, default)
     
     def _get_binary_feature(self, data: Dict[str, Any], keys: list) -> bool:
         """Obtiene un特征 binario de los datos."""
         for key in keys:
-            value = data.get(key, '')
-            if isinstance(value, str):
-                value = value.strip().lower()
-                if value in ['sí', 'si', 'true', '1']:
-                    return True
-                if value in ['no', 'false', '0']:
-                    return False
-            elif isinstance(value, (int, float)):
-                return bool(value)
+            decision = _binary_decision(data.get(key, ''))
+            if decision is not None:
+                return decision
         return False
     
+    def fit(self, data: pd.DataFrame, target_column: str) -> 'PredictionModel':
+        """
+        Ajusta el modelo con los datos de entrenamiento.
+        
+        Los modelos simulados se basan en reglas clínicas fijas y no tienen parámetros
+        que ajustar; el método existe para que la validación cruzada entregue el lado
+        de entrenamiento (balanceado) a través de la misma interfaz que usaría un
+        modelo entrenable.
+        
+        Args:
+            data: DataFrame de entrenamiento
+            target_column: Nombre de la columna objetivo
+            
+        Returns:
+            El mismo modelo
+        """
+        return self
+    
+    def required_columns(self, columns: List[str]) -> List[str]:
+        """
+        Indica qué columnas del archivo usa el modelo.
+        
+        Args:
+            columns: Columnas disponibles
+            
+        Returns:
+            Columnas clínicas presentes, en el orden del archivo
+        """
+        feature_columns = {
+            key
+            for keys in list(NUMERIC_FEATURES.values()) + list(BINARY_FEATURES.values())
+            for key in keys
+        }
+        return [col for col in columns if col in feature_columns]
+    
     def predict(self, data: Dict[str, Any], actual_diagnosis: str, index: int = 0) -> str:
         """
         Realiza una predicción.
@@ -69,13 +453,178 @@ class PredictionModel:
             Diagnóstico predicho
         """
         raise NotImplementedError("Subclases deben implementar este método")
+    
+    def predict_features(self, features: FeatureMatrix) -> List[str]:
+        """
+        Predice todos los registros de una matriz de características.
+        
+        La implementación base predice fila a fila con predict; las subclases pueden
+        sobrescribirla con una versión vectorizada.
+        
+        Args:
+            features: Matriz de características
+            
+        Returns:
+            Lista de diagnósticos predichos
+        """
+        return [
+            self.predict(record, actual_diagnosis, index=index)
+            for record, actual_diagnosis, index in zip(
+                features.records(),
+                features.actual,
+                features.index
+            )
+        ]
 
 
-class LogisticRegressionModel(PredictionModel):
-    """Modelo de Regresión Logística simulado."""
+class RuleBasedModel(PredictionModel):
+    """
+    Clase base para los modelos simulados basados en reglas clínicas.
     
-    def __init__(self, random_seed: int = 42):
+    Las reglas trabajan con códigos de clase (posiciones en prediction_labels: las
+    clases configuradas y, al final, los diagnósticos de RULE_LABELS que no estén
+    entre ellas) y aceptan puntos de corte escalares o arreglos; con arreglos de
+    forma (combinaciones, 1) se evalúan muchas combinaciones de umbrales a la vez
+    por broadcasting.
+    """
+    
+    def __init__(self, random_seed: int = 42, thresholds: Optional[Dict[str, float]] = None):
+        """
+        Inicializa el modelo.
+        
+        Args:
+            random_seed: Semilla para reproducibilidad
+            thresholds: Puntos de corte que reemplazan a DEFAULT_THRESHOLDS (opcional)
+        """
         super().__init__(random_seed)
+        self.thresholds = self.resolve_thresholds(thresholds)
+    
+    def set_class_labels(self, class_labels: List[str]):
+        """
+        Define las clases de diagnóstico y el código de clase de cada regla.
+        
+        Args:
+            class_labels: Etiquetas de clase, en el orden de sus códigos
+        """
+        super().set_class_labels(class_labels)
+        self.prediction_labels = self.class_labels + [
+            label for label in RULE_LABELS if label not in self.class_labels
+        ]
+        # Código de clase de cada diagnóstico de las reglas (posición en RULE_LABELS)
+        self.rule_classes = np.array(
+            [self.prediction_labels.index(label) for label in RULE_LABELS],
+            dtype=np.int64
+        )
+    
+    def resolve_thresholds(self, thresholds: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Combina puntos de corte parciales con los valores por defecto.
+        
+        Args:
+            thresholds: Puntos de corte a reemplazar
+            
+        Returns:
+            Diccionario completo de puntos de corte
+            
+        Raises:
+            ValueError: Si algún nombre de umbral no existe
+        """
+        resolved = dict(DEFAULT_THRESHOLDS)
+        if thresholds:
+            unknown = [name for name in thresholds if name not in DEFAULT_THRESHOLDS]
+            if unknown:
+                raise ValueError(
+                    f"Umbrales desconocidos: {', '.join(unknown)}. "
+                    f"Disponibles: {', '.join(DEFAULT_THRESHOLDS)}"
+                )
+            resolved.update(thresholds)
+        return resolved
+    
+    def _predict_single(self, data: Dict[str, Any], actual_diagnosis: str, index: int) -> str:
+        """Predice un solo registro usando la implementación vectorizada."""
+        features = FeatureMatrix.from_records([data], [actual_diagnosis], [index])
+        return self.predict_features(features)[0]
+    
+    def _fallback_codes(self, rand: np.ndarray) -> np.ndarray:
+        """Asigna una clase configurada por probabilidad cuando no hay características claras."""
+        num_classes = len(self.class_labels)
+        return np.minimum((rand * num_classes).astype(np.int64), num_classes - 1)
+    
+    def random_draws(self, features: FeatureMatrix) -> np.ndarray:
+        """
+        Calcula el valor pseudoaleatorio determinístico (entre 0 y 0.99) de cada registro.
+        
+        Args:
+            features: Matriz de características
+            
+        Returns:
+            Arreglo con un valor por registro
+        """
+        raise NotImplementedError("Subclases deben implementar este método")
+    
+    def rule_codes(
+        self,
+        features: FeatureMatrix,
+        rand: np.ndarray,
+        thresholds: Dict[str, Any]
+    ) -> np.ndarray:
+        """
+        Aplica las reglas clínicas y devuelve el código de clase de cada registro
+        (posición en prediction_labels).
+        
+        Args:
+            features: Matriz de características
+            rand: Valores de random_draws
+            thresholds: Puntos de corte (escalares o arreglos para broadcasting)
+            
+        Returns:
+            Arreglo de códigos de clase
+        """
+        raise NotImplementedError("Subclases deben implementar este método")
+    
+    def predict_codes(self, features: FeatureMatrix) -> np.ndarray:
+        """
+        Predice el código de clase (posición en prediction_labels) de cada registro.
+        
+        Args:
+            features: Matriz de características
+            
+        Returns:
+            Arreglo de códigos; -1 cuando la predicción es un diagnóstico real que no
+            está en prediction_labels
+        """
+        rand = self.random_draws(features)
+        codes = self.rule_codes(features, rand, self.thresholds)
+        
+        # Aplicar accuracy: con probabilidad base_accuracy, la predicción es correcta
+        return np.where(
+            rand < self.base_accuracy,
+            features.label_codes(self.prediction_labels),
+            codes
+        )
+    
+    def predict_features(self, features: FeatureMatrix) -> List[str]:
+        """
+        Predice todos los registros de la matriz con las reglas del modelo.
+        
+        Args:
+            features: Matriz de características
+            
+        Returns:
+            Lista de diagnósticos predichos
+        """
+        codes = self.predict_codes(features)
+        prediction = np.array(self.prediction_labels, dtype=object)[codes]
+        return np.where(codes >= 0, prediction, np.array(features.actual, dtype=object)).tolist()
+
+
+class LogisticRegressionModel(RuleBasedModel):
+    """Modelo de Regresión Logística simulado."""
+    
+    display_name = "Regresión Logística"
+    
+    def __init__(self, random_seed: int = 42, thresholds: Optional[Dict[str, float]] = None):
+        super().__init__(random_seed, thresholds)
         self.base_accuracy = 0.85
     
     def predict(self, data: Dict[str, Any], actual_diagnosis: str, index: int = 0) -> str:
@@ -90,53 +639,53 @@ class LogisticRegressionModel(PredictionModel):
         Returns:
             Diagnóstico predicho
         """
-        # Extraer features
-        plaquetas = self._normalize_value(data.get('Plaquetas') or data.get('plaquetas'), 0)
-        temperatura = self._normalize_value(data.get('Temperatura') or data.get('temperatura'), 0)
-        hemoglobina = self._normalize_value(data.get('Hemoglobina') or data.get('hemoglobina'), 0)
-        
-        fiebre = self._get_binary_feature(data, ['Fiebre', 'fiebre'])
-        dolor_cabeza = self._get_binary_feature(
-            data, 
-            ['Dolor_Cabeza', 'dolor_cabeza', 'DolorCabeza']
-        )
-        
-        # Generar hash determinístico
-        hash_val = self._get_data_hash(data, 42)
-        combined_hash = (hash_val + index * 17 + ord(actual_diagnosis[0]) * 7) % 10000
-        rand = (combined_hash % 100) / 100
-        
-        # Reglas de predicción basadas en características clínicas
-        prediction = actual_diagnosis
-        
-        if plaquetas < 100 and temperatura > 38 and dolor_cabeza and fiebre:
-            prediction = "Dengue"
-        elif temperatura > 39 and hemoglobina < 12 and fiebre:
-            prediction = "Malaria"
-        elif dolor_cabeza and temperatura > 38.5 and hemoglobina < 13:
-            prediction = "Leptospirosis"
-        else:
-            # Si no hay características claras, usar probabilidades
-            class_rand = rand * 3
-            if class_rand < 1.0:
-                prediction = "Dengue"
-            elif class_rand < 2.0:
-                prediction = "Malaria"
-            else:
-                prediction = "Leptospirosis"
+        return self._predict_single(data, actual_diagnosis, index)
+    
+    def random_draws(self, features: FeatureMatrix) -> np.ndarray:
+        """Genera el valor pseudoaleatorio a partir del hash determinístico."""
+        hash_val = features.hash_values(self.draw_seed)
+        combined_hash = (hash_val + features.index * 17 + features.label_offsets(self.draw_seed)) % 10000
+        return (combined_hash % 100) / 100
+    
+    def rule_codes(
+        self,
+        features: FeatureMatrix,
+        rand: np.ndarray,
+        thresholds: Dict[str, Any]
+    ) -> np.ndarray:
+        """Reglas de predicción basadas en características clínicas."""
+        plaquetas = features.numeric['plaquetas']
+        temperatura = features.numeric['temperatura']
+        hemoglobina = features.numeric['hemoglobina']
         
-        # Aplicar accuracy: con probabilidad base_accuracy, la predicción es correcta
-        if rand < self.base_accuracy:
-            return actual_diagnosis
+        fiebre = features.binary['fiebre']
+        dolor_cabeza = features.binary['dolor_cabeza']
         
-        return prediction
+        # Si no hay características claras, usar probabilidades
+        return np.select(
+            [
+                (plaquetas < thresholds['plaquetas_dengue']) &
+                (temperatura > thresholds['temperatura_dengue']) & dolor_cabeza & fiebre,
+                (temperatura > thresholds['temperatura_malaria']) &
+                (hemoglobina < thresholds['hemoglobina_malaria']) & fiebre,
+                dolor_cabeza & (temperatura > thresholds['temperatura_leptospirosis']) &
+                (hemoglobina < thresholds['hemoglobina_leptospirosis'])
+            ],
+            self.rule_classes,
+            default=self._fallback_codes(rand)
+        )
 
 
-class NeuralNetworkModel(PredictionModel):
+class NeuralNetworkModel(RuleBasedModel):
     """Modelo de Red Neuronal simulado."""
     
-    def __init__(self, random_seed: int = 42):
-        super().__init__(random_seed)
+    display_name = "Red Neuronal"
+    
+    # Con la semilla por defecto (42) los sorteos usan 123, la semilla original del modelo
+    draw_seed_offset = 81
+    
+    def __init__(self, random_seed: int = 42, thresholds: Optional[Dict[str, float]] = None):
+        super().__init__(random_seed, thresholds)
         self.base_accuracy = 0.88
     
     def predict(self, data: Dict[str, Any], actual_diagnosis: str, index: int = 0) -> str:
@@ -151,68 +700,98 @@ class NeuralNetworkModel(PredictionModel):
         Returns:
             Diagnóstico predicho
         """
-        # Extraer features
-        plaquetas = self._normalize_value(data.get('Plaquetas') or data.get('plaquetas'), 0)
-        temperatura = self._normalize_value(data.get('Temperatura') or data.get('temperatura'), 0)
-        hemoglobina = self._normalize_value(data.get('Hemoglobina') or data.get('hemoglobina'), 0)
-        edad = self._normalize_value(data.get('Edad') or data.get('edad'), 0)
-        
-        fiebre = self._get_binary_feature(data, ['Fiebre', 'fiebre'])
-        dolor_cabeza = self._get_binary_feature(
-            data, 
-            ['Dolor_Cabeza', 'dolor_cabeza', 'DolorCabeza']
-        )
+        return self._predict_single(data, actual_diagnosis, index)
+    
+    def random_draws(self, features: FeatureMatrix) -> np.ndarray:
+        """Genera el valor pseudoaleatorio a partir del hash determinístico."""
+        hash_val = features.hash_values(self.draw_seed)
+        combined_hash = (hash_val + features.index * 23 + features.label_offsets(self.draw_seed)) % 10000
+        return (combined_hash % 100) / 100
+    
+    def rule_codes(
+        self,
+        features: FeatureMatrix,
+        rand: np.ndarray,
+        thresholds: Dict[str, Any]
+    ) -> np.ndarray:
+        """Sistema de scoring basado en características clínicas."""
+        plaquetas = features.numeric['plaquetas']
+        temperatura = features.numeric['temperatura']
+        hemoglobina = features.numeric['hemoglobina']
+        edad = features.numeric['edad']
         
-        # Generar hash determinístico
-        hash_val = self._get_data_hash(data, 123)
-        combined_hash = (hash_val + index * 23 + ord(actual_diagnosis[0]) * 11) % 10000
-        rand = (combined_hash % 100) / 100
+        fiebre = features.binary['fiebre']
+        dolor_cabeza = features.binary['dolor_cabeza']
         
         # Sistema de scoring
         dengue_score = (
-            (30 if plaquetas < 100 else 0) +
-            (25 if temperatura > 38 else 0) +
-            (20 if dolor_cabeza else 0) +
-            (15 if fiebre else 0) +
-            (10 if 15 < edad < 60 else 0)
+            np.where(plaquetas < thresholds['plaquetas_dengue'], 30, 0) +
+            np.where(temperatura > thresholds['temperatura_dengue'], 25, 0) +
+            np.where(dolor_cabeza, 20, 0) +
+            np.where(fiebre, 15, 0) +
+            np.where((15 < edad) & (edad < 60), 10, 0)
         )
         
         malaria_score = (
-            (30 if temperatura > 39 else 0) +
-            (25 if hemoglobina < 12 else 0) +
-            (20 if fiebre else 0) +
-            (15 if dolor_cabeza else 0)
+            np.where(temperatura > thresholds['temperatura_malaria'], 30, 0) +
+            np.where(hemoglobina < thresholds['hemoglobina_malaria'], 25, 0) +
+            np.where(fiebre, 20, 0) +
+            np.where(dolor_cabeza, 15, 0)
         )
         
         lepto_score = (
-            (25 if dolor_cabeza else 0) +
-            (20 if temperatura > 38.5 else 0) +
-            (15 if fiebre else 0) +
-            (15 if hemoglobina < 13 else 0)
+            np.where(dolor_cabeza, 25, 0) +
+            np.where(temperatura > thresholds['temperatura_leptospirosis'], 20, 0) +
+            np.where(fiebre, 15, 0) +
+            np.where(hemoglobina < thresholds['hemoglobina_leptospirosis'], 15, 0)
         )
         
-        max_score = max(dengue_score, malaria_score, lepto_score)
-        prediction = actual_diagnosis
-        
-        if max_score == dengue_score and dengue_score > 50:
-            prediction = "Dengue"
-        elif max_score == malaria_score and malaria_score > 50:
-            prediction = "Malaria"
-        elif max_score == lepto_score and lepto_score > 50:
-            prediction = "Leptospirosis"
-        else:
-            # Si no hay características claras, usar probabilidades
-            class_rand = rand * 3
-            if class_rand < 1.0:
-                prediction = "Dengue"
-            elif class_rand < 2.0:
-                prediction = "Malaria"
-            else:
-                prediction = "Leptospirosis"
-        
-        # Aplicar accuracy
-        if rand < self.base_accuracy:
-            return actual_diagnosis
-        
-        return prediction
+        max_score = np.maximum(np.maximum(dengue_score, malaria_score), lepto_score)
+        
+        # Si no hay características claras, usar probabilidades
+        return np.select(
+            [
+                (max_score == dengue_score) & (dengue_score > 50),
+                (max_score == malaria_score) & (malaria_score > 50),
+                (max_score == lepto_score) & (lepto_score > 50)
+            ],
+            self.rule_classes,
+            default=self._fallback_codes(rand)
+        )
+
+
+# Registro de modelos disponibles por nombre
+MODEL_REGISTRY: Dict[str, Type[PredictionModel]] = {
+    'logistic': LogisticRegressionModel,
+    'neural': NeuralNetworkModel
+}
 
+
+def register_model(name: str, model_class: Type[PredictionModel]):
+    """
+    Registra un modelo para poder crearlo por nombre.
+    
+    Args:
+        name: Nombre del modelo (por ejemplo, el usado en la línea de comandos)
+        model_class: Subclase de PredictionModel
+    """
+    if not issubclass(model_class, PredictionModel):
+        raise ValueError(f"{model_class.__name__} no es un PredictionModel")
+    MODEL_REGISTRY[name] = model_class
+
+
+def create_model(name: str, random_seed: int = 42, **kwargs) -> PredictionModel:
+    """
+    Crea una instancia de un modelo registrado.
+    
+    Args:
+        name: Nombre del modelo
+        random_seed: Semilla para reproducibilidad
+        **kwargs: Parámetros adicionales del modelo (por ejemplo, thresholds)
+        
+    Returns:
+        Instancia del modelo
+    """
+    if name not in MODEL_REGISTRY:
+        raise ValueError(f"Tipo de modelo no válido: {name}")
+    return MODEL_REGISTRY[name](random_seed=random_seed, **kwargs)
@@ -0,0 +1,238 @@
+"""
+Módulo de perfilado por etapas: mide qué funciones consumen el tiempo de cada
+etapa del procesamiento (carga, balanceo, predicción, métricas).
+
+Dos modos:
+    cprofile  Perfil determinístico con cProfile; guarda un archivo .pstats por
+              etapa (se abre con pstats o con visores como snakeviz).
+    sampling  Muestreo liviano de la pila cada pocos milisegundos; guarda un
+              archivo .folded por etapa con pilas colapsadas ("a;b;c cantidad"),
+              compatible con flamegraph.pl y speedscope.
+"""
+
+import contextlib
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+PROFILE_MODES = ('cprofile', 'sampling')
+
+
+class StageProfiler:
+    """Perfila por separado cada etapa de una ejecución."""
+    
+    def __init__(
+        self,
+        mode: str = 'cprofile',
+        output_dir: Optional[str] = None,
+        top_n: int = 15,
+        interval: float = 0.005
+    ):
+        """
+        Inicializa el perfilador.
+        
+        Args:
+            mode: 'cprofile' (determinístico) o 'sampling' (muestreo de la pila)
+            output_dir: Directorio donde guardar un archivo por etapa (opcional)
+            top_n: Cantidad de funciones del resumen de cada etapa
+            interval: Segundos entre muestras en el modo sampling
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Modo de perfilado no válido: {mode}. Use uno de: {', '.join(PROFILE_MODES)}")
+        
+        self.mode = mode
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.interval = interval
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._current: Optional[Tuple[str, float, Any]] = None
+        
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+    
+    def start_stage(self, name: str):
+        """
+        Empieza a perfilar una etapa (termina la anterior si sigue abierta).
+        
+        Solo se perfila el hilo que llama. Si una etapa se repite, se guarda la
+        última ejecución.
+        
+        Args:
+            name: Nombre de la etapa
+        """
+        self.stop_stage()
+        
+        if self.mode == 'cprofile':
+            collector: Any = cProfile.Profile()
+            collector.enable()
+        else:
+            collector = _StackSampler(threading.get_ident(), self.interval)
+            collector.start()
+        self._current = (name, time.perf_counter(), collector)
+    
+    def stop_stage(self):
+        """Termina la etapa en curso, guarda su archivo y resume sus funciones."""
+        if self._current is None:
+            return
+        
+        name, start, collector = self._current
+        self._current = None
+        if self.mode == 'cprofile':
+            collector.disable()
+            self._finish_cprofile(name, collector, time.perf_counter() - start)
+        else:
+            collector.stop()
+            self._finish_sampling(name, collector, time.perf_counter() - start)
+    
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Perfila el bloque de código de una etapa (ver start_stage).
+        
+        Args:
+            name: Nombre de la etapa
+        """
+        self.start_stage(name)
+        try:
+            yield
+        finally:
+            self.stop_stage()
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Resume el perfil de todas las etapas.
+        
+        Returns:
+            Diccionario con el modo y, por etapa, la duración, el archivo generado y
+            las funciones con mayor tiempo acumulado
+        """
+        return {'mode': self.mode, 'stages': dict(self.stages)}
+    
+    def _output_path(self, name: str, extension: str) -> Optional[str]:
+        if self.output_dir is None:
+            return None
+        safe_name = re.sub(r'[^\w.-]+', '_', name)
+        return os.path.join(self.output_dir, f"{safe_name}.{extension}")
+    
+    def _finish_cprofile(self, name: str, profile: cProfile.Profile, seconds: float):
+        """Guarda el .pstats de la etapa y resume sus funciones."""
+        output_path = self._output_path(name, 'pstats')
+        if output_path is not None:
+            profile.dump_stats(output_path)
+        
+        stats = pstats.Stats(profile).stats
+        ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+        top_functions = [
+            {
+                'function': _function_label(file_name, line, function),
+                'calls': calls,
+                'self_seconds': self_seconds,
+                'cumulative_seconds': cumulative_seconds
+            }
+            for (file_name, line, function), (_, calls, self_seconds, cumulative_seconds, _)
+            in ranked[:self.top_n]
+        ]
+        
+        self.stages[name] = {'seconds': seconds, 'output': output_path, 'top_functions': top_functions}
+    
+    def _finish_sampling(self, name: str, sampler: '_StackSampler', seconds: float):
+        """Guarda las pilas colapsadas de la etapa y resume sus funciones."""
+        output_path = self._output_path(name, 'folded')
+        if output_path is not None:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                for stack, count in sorted(sampler.stacks.items()):
+                    f.write(f"{';'.join(stack)} {count}\n")
+        
+        # Tiempo acumulado: muestras en las que la función aparece en la pila;
+        # tiempo propio: muestras en las que está en la cima. Cada muestra vale la
+        # duración real de la etapa dividida por las muestras tomadas. Los marcos
+        # comunes a todas las muestras (quien llamó a la etapa) no se resumen,
+        # salvo el más interno.
+        seconds_per_sample = seconds / sampler.samples if sampler.samples else sampler.interval
+        caller_depth = max(_common_prefix_length(list(sampler.stacks)) - 1, 0)
+        cumulative: Dict[str, int] = {}
+        own: Dict[str, int] = {}
+        for stack, count in sampler.stacks.items():
+            for function in set(stack[caller_depth:]):
+                cumulative[function] = cumulative.get(function, 0) + count
+            own[stack[-1]] = own.get(stack[-1], 0) + count
+        
+        ranked = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)
+        top_functions = [
+            {
+                'function': function,
+                'samples': count,
+                'self_seconds': own.get(function, 0) * seconds_per_sample,
+                'cumulative_seconds': count * seconds_per_sample
+            }
+            for function, count in ranked[:self.top_n]
+        ]
+        
+        self.stages[name] = {
+            'seconds': seconds,
+            'output': output_path,
+            'samples': sampler.samples,
+            'top_functions': top_functions
+        }
+
+
+class _StackSampler:
+    """Toma muestras periódicas de la pila de un hilo desde un hilo auxiliar."""
+    
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Dict[Tuple[str, ...], int] = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stage-sampler", daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(_function_label(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            stack.reverse()
+            
+            key = tuple(stack)
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+
+def _common_prefix_length(stacks: List[Tuple[str, ...]]) -> int:
+    """Cantidad de marcos iniciales compartidos por todas las pilas."""
+    if not stacks:
+        return 0
+    
+    length = 0
+    for frames in zip(*stacks):
+        if any(frame != frames[0] for frame in frames):
+            break
+        length += 1
+    return length
+
+
+def _function_label(file_name: str, line: int, function: str) -> str:
+    """Nombre legible de una función: nombre (archivo:línea)."""
+    if file_name == '~':
+        # Funciones integradas en cProfile
+        return function
+    return f"{function} ({os.path.basename(file_name)}:{line})"
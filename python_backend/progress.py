@@ -0,0 +1,164 @@
+"""
+Módulo de seguimiento de progreso: registros procesados, velocidad, tiempo
+restante estimado y cancelación cooperativa de ejecuciones largas.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class ProgressTracker:
+    """Acumula el avance de una ejecución y lo publica a quien lo consulte."""
+    
+    def __init__(
+        self,
+        callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        min_interval: float = 0.0
+    ):
+        """
+        Inicializa el seguimiento.
+        
+        Args:
+            callback: Función que recibe una instantánea del progreso en cada
+                actualización (opcional). Se invoca desde el hilo que reporta.
+            min_interval: Segundos mínimos entre dos llamadas al callback; los
+                cambios de etapa y el final siempre se notifican
+        """
+        self.callback = callback
+        self.min_interval = min_interval
+        self.cancel_event = threading.Event()
+        
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._version = 0
+        self._last_callback = 0.0
+        self._start = time.perf_counter()
+        self._stage: Optional[str] = None
+        self._stage_rows: Dict[str, int] = {}
+        self._rows_done = 0
+        self._total_rows: Optional[int] = None
+        self._finished = False
+    
+    @property
+    def cancelled(self) -> bool:
+        """True si se pidió cancelar la ejecución."""
+        return self.cancel_event.is_set()
+    
+    def cancel(self):
+        """Pide detener la ejecución en el siguiente punto de control."""
+        self.cancel_event.set()
+        self._publish(force=True)
+    
+    def set_total(self, total_rows: Optional[int]):
+        """
+        Define la cantidad total de registros a predecir (None si se desconoce).
+        
+        Args:
+            total_rows: Total de registros
+        """
+        with self._lock:
+            self._total_rows = total_rows
+        self._publish()
+    
+    def start_stage(self, name: str):
+        """
+        Marca el inicio de una etapa.
+        
+        Args:
+            name: Nombre de la etapa
+        """
+        with self._lock:
+            self._stage = name
+            self._stage_rows.setdefault(name, 0)
+        self._publish(force=True)
+    
+    def advance(self, rows: int, stage: Optional[str] = None, completed: bool = False):
+        """
+        Registra registros procesados en una etapa.
+        
+        Args:
+            rows: Cantidad de registros procesados desde la última llamada
+            stage: Etapa que reporta (por defecto la etapa actual)
+            completed: Si True, los registros cuentan como predicciones terminadas
+                (son los que se usan para la velocidad y el tiempo restante)
+        """
+        with self._lock:
+            stage = stage or self._stage
+            if stage is not None:
+                self._stage = stage
+                self._stage_rows[stage] = self._stage_rows.get(stage, 0) + rows
+            if completed:
+                self._rows_done += rows
+        self._publish()
+    
+    def finish(self):
+        """Marca la ejecución como terminada."""
+        with self._lock:
+            self._finished = True
+        self._publish(force=True)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado actual del progreso.
+        
+        Returns:
+            Diccionario con etapa, registros completados, total, velocidad (registros
+            por segundo), tiempo transcurrido, tiempo restante estimado y estado
+        """
+        with self._lock:
+            return self._snapshot()
+    
+    def wait_for_update(self, version: int, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Espera a que el progreso cambie respecto a una versión conocida.
+        
+        Args:
+            version: Última versión vista (campo 'version' de la instantánea)
+            timeout: Tiempo máximo de espera en segundos
+            
+        Returns:
+            Instantánea actual (puede ser la misma versión si se agotó el tiempo)
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != version, timeout=timeout)
+            return self._snapshot()
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """Construye la instantánea; se llama con el candado tomado."""
+        elapsed = time.perf_counter() - self._start
+        rows_per_second = self._rows_done / elapsed if elapsed > 0 else 0.0
+        
+        eta_seconds = None
+        if self._total_rows is not None and rows_per_second > 0:
+            eta_seconds = max(0, self._total_rows - self._rows_done) / rows_per_second
+        
+        return {
+            'version': self._version,
+            'stage': self._stage,
+            'rows_done': self._rows_done,
+            'total_rows': self._total_rows,
+            'stage_rows': dict(self._stage_rows),
+            'rows_per_second': rows_per_second,
+            'elapsed_seconds': elapsed,
+            'eta_seconds': eta_seconds,
+            'cancelled': self.cancel_event.is_set(),
+            'finished': self._finished
+        }
+    
+    def _publish(self, force: bool = False):
+        """Notifica a los que esperan y, si corresponde, invoca el callback."""
+        with self._changed:
+            self._version += 1
+            self._changed.notify_all()
+            snapshot = self._snapshot()
+            
+            now = time.perf_counter()
+            notify = self.callback is not None and (
+                force or now - self._last_callback >= self.min_interval
+            )
+            if notify:
+                self._last_callback = now
+        
+        if notify:
+            self.callback(snapshot)
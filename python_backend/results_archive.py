@@ -0,0 +1,393 @@
+"""
+Módulo de archivo de resultados: guarda las predicciones de cada ejecución en
+segmentos columnares comprimidos, ordenados por paciente, con un índice que
+permite consultar un paciente o un rango de pacientes sin recorrer todos los
+archivos.
+
+Uso:
+    python results_archive.py <directorio> ejecuciones
+    python results_archive.py <directorio> paciente <id>
+    python results_archive.py <directorio> rango <id_inicial> <id_final>
+    python results_archive.py <directorio> compactar [--keep=5]
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class ResultsArchive:
+    """Archivo de resultados por ejecución, indexado por paciente."""
+    
+    MANIFEST_NAME = 'index.json'
+    
+    def __init__(self, directory: str, cache_size: int = 16):
+        """
+        Abre (o crea) un archivo de resultados en un directorio.
+        
+        El directorio contiene un manifiesto (index.json) con las ejecuciones y los
+        segmentos, y un archivo .npz por segmento. Cada segmento guarda las columnas
+        identificador de paciente, número de ejecución, diagnóstico real, predicción
+        y confianza, ordenadas por paciente y ejecución.
+        
+        Args:
+            directory: Directorio del archivo
+            cache_size: Cantidad de segmentos que se mantienen cargados en memoria
+        """
+        self.directory = directory
+        self.cache_size = cache_size
+        self._cache: Dict[str, Dict[str, np.ndarray]] = {}
+        
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, self.MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {'labels': [], 'runs': [], 'segments': [], 'next_segment': 0}
+    
+    def append_run(self, results: Dict, run_id: Optional[str] = None) -> str:
+        """
+        Agrega las predicciones y métricas de una ejecución.
+        
+        Se guardan solo los registros con identificador de paciente
+        (results['patient_ids']); las muestras sintéticas del balanceo tienen None y
+        se cuentan pero no se archivan. Si results no trae identificadores, se usa la
+        posición de cada predicción (desde 1).
+        
+        Args:
+            results: Resultados de process_file (predicciones, diagnósticos reales,
+                métricas y, opcionalmente, patient_ids y confidences)
+            run_id: Identificador de la ejecución (por defecto, la fecha y hora)
+            
+        Returns:
+            Identificador de la ejecución
+        """
+        predictions = results['predictions']
+        actual = results['actual']
+        patient_ids = results.get('patient_ids') or list(range(1, len(predictions) + 1))
+        confidences = results.get('confidences')
+        
+        if run_id is None:
+            run_id = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        if any(run['run_id'] == run_id for run in self.manifest['runs']):
+            raise ValueError(f"La ejecución '{run_id}' ya existe en el archivo")
+        
+        keep = np.array([patient_id is not None for patient_id in patient_ids], dtype=bool)
+        positions = np.flatnonzero(keep)
+        run_number = len(self.manifest['runs'])
+        
+        columns = {
+            'patient_id': self._id_array([patient_ids[i] for i in positions]),
+            'run': np.full(len(positions), run_number, dtype=np.int32),
+            'actual': self._label_codes([actual[i] for i in positions]),
+            'predicted': self._label_codes([predictions[i] for i in positions]),
+            'confidence': (
+                np.asarray(confidences, dtype=np.float32)[positions]
+                if confidences is not None
+                else np.full(len(positions), np.nan, dtype=np.float32)
+            )
+        }
+        segment = self._write_segment(columns)
+        
+        self.manifest['runs'].append({
+            'run': run_number,
+            'run_id': run_id,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'file_path': results.get('file_path'),
+            'model_type': results.get('model_type'),
+            'metrics': results.get('metrics'),
+            'confusion_matrix': results.get('confusion_matrix'),
+            'records': int(len(positions)),
+            'synthetic_records': int(len(patient_ids) - len(positions))
+        })
+        self._save_manifest()
+        
+        return run_id
+    
+    def list_runs(self) -> List[Dict]:
+        """
+        Lista las ejecuciones archivadas.
+        
+        Returns:
+            Lista de ejecuciones (identificador, fecha, archivo, modelo, métricas)
+        """
+        return [dict(run) for run in self.manifest['runs']]
+    
+    def lookup(self, patient_id: Any, run_id: Optional[str] = None) -> List[Dict]:
+        """
+        Obtiene las predicciones archivadas de un paciente.
+        
+        Args:
+            patient_id: Identificador del paciente
+            run_id: Limita la búsqueda a una ejecución (opcional)
+            
+        Returns:
+            Lista con una entrada por ejecución, de la más reciente a la más antigua
+        """
+        frame = self.query_range(patient_id, patient_id, run_id)
+        return frame.iloc[::-1].to_dict('records')
+    
+    def query_range(
+        self,
+        start_id: Any,
+        end_id: Any,
+        run_id: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Obtiene las predicciones de los pacientes con identificador entre dos valores.
+        
+        Solo se abren los segmentos cuyo rango de identificadores se superpone con la
+        consulta, y dentro de cada segmento el rango se ubica con búsqueda binaria.
+        
+        Args:
+            start_id: Primer identificador (incluido)
+            end_id: Último identificador (incluido)
+            run_id: Limita la búsqueda a una ejecución (opcional)
+            
+        Returns:
+            DataFrame con paciente, ejecución, fecha, diagnóstico real, predicción y
+            confianza, ordenado por paciente y ejecución
+        """
+        run_number = None
+        if run_id is not None:
+            run_number = self._run_number(run_id)
+        
+        labels = np.array(self.manifest['labels'] + [''], dtype=object)
+        parts = []
+        for segment in self.manifest['segments']:
+            if run_number is not None and run_number not in segment['runs']:
+                continue
+            
+            bounds = self._typed_bounds(segment, start_id, end_id)
+            if bounds is None:
+                continue
+            low, high = bounds
+            
+            columns = self._load_segment(segment['file'])
+            ids = columns['patient_id']
+            first = np.searchsorted(ids, low, side='left')
+            last = np.searchsorted(ids, high, side='right')
+            if first >= last:
+                continue
+            
+            selected = {name: values[first:last] for name, values in columns.items()}
+            if run_number is not None:
+                mask = selected['run'] == run_number
+                selected = {name: values[mask] for name, values in selected.items()}
+            parts.append(selected)
+        
+        if not parts:
+            return pd.DataFrame(columns=[
+                'Paciente_ID', 'run_id', 'created_at', 'Diagnostico_Real', 'Prediccion', 'Confianza'
+            ])
+        
+        merged = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        order = np.lexsort((merged['run'], merged['patient_id']))
+        runs = self.manifest['runs']
+        
+        return pd.DataFrame({
+            'Paciente_ID': merged['patient_id'][order].tolist(),
+            'run_id': [runs[run]['run_id'] for run in merged['run'][order]],
+            'created_at': [runs[run]['created_at'] for run in merged['run'][order]],
+            'Diagnostico_Real': labels[merged['actual'][order]],
+            'Prediccion': labels[merged['predicted'][order]],
+            'Confianza': merged['confidence'][order]
+        })
+    
+    def compact(self, keep_recent: int = 5) -> Dict[str, int]:
+        """
+        Combina los segmentos de las ejecuciones antiguas en un solo segmento.
+        
+        Los segmentos que solo contienen ejecuciones anteriores a las keep_recent más
+        recientes se fusionan y se reordenan, de modo que una consulta sobre el
+        historial abre un archivo en lugar de uno por ejecución. Se genera un
+        segmento por tipo de identificador (enteros o texto).
+        
+        Args:
+            keep_recent: Cantidad de ejecuciones recientes cuyos segmentos no se tocan
+            
+        Returns:
+            Diccionario con la cantidad de segmentos fusionados y de filas
+        """
+        cutoff = len(self.manifest['runs']) - keep_recent
+        # Solo se fusionan segmentos con el mismo tipo de identificador: mezclarlos
+        # convertiría los enteros en texto y cambiaría el orden de las consultas
+        groups: Dict[str, List[Dict]] = {}
+        for segment in self.manifest['segments']:
+            if max(segment['runs'], default=-1) < cutoff:
+                groups.setdefault(segment['id_kind'], []).append(segment)
+        groups = {kind: segments for kind, segments in groups.items() if len(segments) >= 2}
+        if not groups:
+            return {'merged_segments': 0, 'rows': 0}
+        
+        merged_segments = 0
+        rows = 0
+        for old_segments in groups.values():
+            loaded = [self._load_segment(segment['file']) for segment in old_segments]
+            merged = {name: np.concatenate([columns[name] for columns in loaded]) for name in loaded[0]}
+            
+            old_files = {segment['file'] for segment in old_segments}
+            self.manifest['segments'] = [
+                segment for segment in self.manifest['segments']
+                if segment['file'] not in old_files
+            ]
+            self._write_segment(merged)
+            self._save_manifest()
+            
+            for file_name in old_files:
+                self._cache.pop(file_name, None)
+                os.remove(os.path.join(self.directory, file_name))
+            
+            merged_segments += len(old_segments)
+            rows += int(len(merged['run']))
+        
+        return {'merged_segments': merged_segments, 'rows': rows}
+    
+    def _run_number(self, run_id: str) -> int:
+        """Obtiene el número interno de una ejecución."""
+        for run in self.manifest['runs']:
+            if run['run_id'] == run_id:
+                return run['run']
+        raise ValueError(f"La ejecución '{run_id}' no existe en el archivo")
+    
+    def _id_array(self, patient_ids: List[Any]) -> np.ndarray:
+        """Convierte los identificadores en enteros si todos lo son; si no, en texto."""
+        values = np.asarray(patient_ids)
+        if values.dtype.kind in 'iub':
+            return values.astype(np.int64)
+        if values.dtype.kind == 'f' and np.all(np.isfinite(values)) and np.all(values == np.round(values)):
+            return values.astype(np.int64)
+        return np.array([str(value) for value in patient_ids], dtype=str)
+    
+    def _label_codes(self, labels: List[str]) -> np.ndarray:
+        """Codifica etiquetas con el vocabulario del manifiesto (que se amplía si hace falta)."""
+        vocabulary = self.manifest['labels']
+        positions = {label: code for code, label in enumerate(vocabulary)}
+        codes = np.empty(len(labels), dtype=np.int16)
+        for i, label in enumerate(labels):
+            code = positions.get(label)
+            if code is None:
+                code = positions[label] = len(vocabulary)
+                vocabulary.append(label)
+            codes[i] = code
+        return codes
+    
+    def _typed_bounds(self, segment: Dict, start_id: Any, end_id: Any) -> Optional[tuple]:
+        """
+        Convierte los límites de la consulta al tipo de identificador del segmento.
+        
+        Returns:
+            Tupla (inicio, fin) o None si el segmento no puede contener el rango
+        """
+        if segment['rows'] == 0:
+            return None
+        
+        if segment['id_kind'] == 'int':
+            try:
+                low, high = int(start_id), int(end_id)
+            except (TypeError, ValueError):
+                return None
+        else:
+            low, high = str(start_id), str(end_id)
+        
+        if high < segment['min_id'] or low > segment['max_id']:
+            return None
+        return low, high
+    
+    def _write_segment(self, columns: Dict[str, np.ndarray]) -> Dict:
+        """Ordena las columnas por paciente y ejecución y las guarda como segmento nuevo."""
+        order = np.lexsort((columns['run'], columns['patient_id']))
+        columns = {name: values[order] for name, values in columns.items()}
+        ids = columns['patient_id']
+        id_kind = 'int' if ids.dtype.kind in 'iu' else 'str'
+        
+        file_name = f"segment-{self.manifest['next_segment']:06d}.npz"
+        self.manifest['next_segment'] += 1
+        np.savez_compressed(os.path.join(self.directory, file_name), **columns)
+        
+        segment = {
+            'file': file_name,
+            'runs': sorted(int(run) for run in np.unique(columns['run'])),
+            'rows': int(len(ids)),
+            'id_kind': id_kind,
+            'min_id': (int(ids[0]) if id_kind == 'int' else str(ids[0])) if len(ids) else None,
+            'max_id': (int(ids[-1]) if id_kind == 'int' else str(ids[-1])) if len(ids) else None
+        }
+        self.manifest['segments'].append(segment)
+        self._cache[file_name] = columns
+        self._trim_cache()
+        
+        return segment
+    
+    def _load_segment(self, file_name: str) -> Dict[str, np.ndarray]:
+        """Carga un segmento, usando la caché de segmentos recientes."""
+        columns = self._cache.pop(file_name, None)
+        if columns is None:
+            with np.load(os.path.join(self.directory, file_name)) as data:
+                columns = {name: data[name] for name in data.files}
+        
+        # Reinsertar para que quede como el más reciente
+        self._cache[file_name] = columns
+        self._trim_cache()
+        return columns
+    
+    def _trim_cache(self):
+        """Descarta los segmentos menos usados si la caché supera su tamaño."""
+        while len(self._cache) > self.cache_size:
+            self._cache.pop(next(iter(self._cache)))
+    
+    def _save_manifest(self):
+        """Escribe el manifiesto de forma atómica."""
+        manifest_path = os.path.join(self.directory, self.MANIFEST_NAME)
+        temporary_path = manifest_path + '.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temporary_path, manifest_path)
+
+
+def main():
+    """Consulta un archivo de resultados desde la línea de comandos."""
+    positional = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    commands = {'ejecuciones': 0, 'paciente': 1, 'rango': 2, 'compactar': 0}
+    
+    if len(positional) < 2 or positional[1] not in commands or len(positional) < 2 + commands[positional[1]]:
+        print(__doc__.split("Uso:")[1])
+        sys.exit(1)
+    
+    archive = ResultsArchive(positional[0])
+    command = positional[1]
+    start = time.perf_counter()
+    
+    if command == 'ejecuciones':
+        for run in archive.list_runs():
+            accuracy = (run['metrics'] or {}).get('accuracy')
+            accuracy_text = f"{accuracy:.2f}%" if accuracy is not None else "-"
+            print(
+                f"{run['run_id']}  {run['created_at']}  {run['model_type']}  "
+                f"{run['records']} pacientes  accuracy {accuracy_text}  {run['file_path']}"
+            )
+    elif command == 'paciente':
+        for entry in archive.lookup(positional[2]):
+            print(
+                f"{entry['run_id']} ({entry['created_at']}): real {entry['Diagnostico_Real']}, "
+                f"predicho {entry['Prediccion']}"
+            )
+    elif command == 'rango':
+        print(archive.query_range(positional[2], positional[3]).to_string(index=False))
+    else:
+        keep = int(next((arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--keep=")), "5"))
+        summary = archive.compact(keep_recent=keep)
+        print(f"Segmentos fusionados: {summary['merged_segments']} ({summary['rows']} filas)")
+    
+    print(f"\n({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
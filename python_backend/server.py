@@ -0,0 +1,346 @@
+"""
+Servidores HTTP locales del backend.
+
+ProgressServer publica el progreso de una ejecución y permite cancelarla:
+    GET  /progress  Instantánea del progreso en JSON (consulta periódica)
+    GET  /events    Flujo Server-Sent Events con cada actualización del progreso
+    POST /cancel    Pide la cancelación cooperativa de la ejecución
+
+PredictionServer predice lotes enviados por el frontend:
+    GET  /formats   Formatos de transporte disponibles
+    POST /predict   Recibe un lote (columnar, Arrow IPC o JSON, según Content-Type)
+                    y responde las predicciones en el formato pedido en Accept,
+                    con las métricas y la matriz de confusión en los metadatos.
+                    Parámetros opcionales: ?balance=false&diagnosis=<columna>
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+from urllib.parse import parse_qs, urlsplit
+
+from progress import ProgressTracker
+from transport import decode_frame, encode_results, supported_content_types
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    """Base de los manejadores: respuestas JSON, CORS y sin registro en consola."""
+    
+    def do_OPTIONS(self):
+        """Responde la verificación previa de CORS del navegador."""
+        self.send_response(204)
+        self._send_cors_headers()
+        self.end_headers()
+    
+    def log_message(self, format: str, *args: Any):
+        """Silencia el registro de cada solicitud en la consola."""
+    
+    def _send_cors_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Accept')
+    
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        self._send_body(status, json.dumps(payload).encode('utf-8'), 'application/json')
+    
+    def _send_body(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self._send_cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _ProgressHandler(_JSONHandler):
+    """Atiende las solicitudes de progreso de un ProgressTracker."""
+    
+    server: '_ProgressHTTPServer'
+    
+    def do_GET(self):
+        """Atiende /progress y /events."""
+        if self.path == '/progress':
+            self._send_json(200, self.server.tracker.snapshot())
+        elif self.path == '/events':
+            self._stream_events()
+        else:
+            self._send_json(404, {'error': f"Ruta no encontrada: {self.path}"})
+    
+    def do_POST(self):
+        """Atiende /cancel."""
+        if self.path == '/cancel':
+            self.server.tracker.cancel()
+            self._send_json(202, self.server.tracker.snapshot())
+        else:
+            self._send_json(404, {'error': f"Ruta no encontrada: {self.path}"})
+    
+    def _stream_events(self):
+        """Envía una instantánea por evento hasta que la ejecución termina."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self._send_cors_headers()
+        self.end_headers()
+        
+        tracker = self.server.tracker
+        snapshot = tracker.snapshot()
+        try:
+            while True:
+                self.wfile.write(f"data: {json.dumps(snapshot)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                if snapshot['finished'] or self.server.stopping.is_set():
+                    return
+                
+                version = snapshot['version']
+                snapshot = tracker.wait_for_update(version, timeout=self.server.keepalive_seconds)
+                if snapshot['version'] == version:
+                    # Sin cambios: comentario SSE para mantener viva la conexión
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente cerró la conexión
+            return
+
+
+class _ProgressHTTPServer(ThreadingHTTPServer):
+    """Servidor con referencia al seguimiento que publica."""
+    
+    daemon_threads = True
+    
+    def __init__(self, address, tracker: ProgressTracker, keepalive_seconds: float):
+        super().__init__(address, _ProgressHandler)
+        self.tracker = tracker
+        self.keepalive_seconds = keepalive_seconds
+        self.stopping = threading.Event()
+
+
+class ProgressServer:
+    """Publica un ProgressTracker en un servidor HTTP local en segundo plano."""
+    
+    def __init__(
+        self,
+        tracker: ProgressTracker,
+        host: str = '127.0.0.1',
+        port: int = 8765,
+        keepalive_seconds: float = 15.0
+    ):
+        """
+        Inicializa el servidor (no empieza a escuchar hasta llamar a start).
+        
+        Args:
+            tracker: Seguimiento de la ejecución a publicar
+            host: Dirección de escucha (por defecto solo local)
+            port: Puerto de escucha (0 elige uno libre)
+            keepalive_seconds: Intervalo de los comentarios de mantenimiento en /events
+        """
+        self.tracker = tracker
+        self.host = host
+        self.port = port
+        self.keepalive_seconds = keepalive_seconds
+        self._httpd = None
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        """URL base del servidor."""
+        return f"http://{self.host}:{self.port}"
+    
+    def start(self) -> 'ProgressServer':
+        """
+        Empieza a atender solicitudes en un hilo en segundo plano.
+        
+        Returns:
+            El mismo servidor, para encadenar llamadas
+        """
+        self._httpd = _ProgressHTTPServer((self.host, self.port), self.tracker, self.keepalive_seconds)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            name="progress-server",
+            daemon=True
+        )
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Detiene el servidor; los flujos de eventos abiertos terminan en su próximo envío."""
+        if self._httpd is None:
+            return
+        
+        self._httpd.stopping.set()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._httpd = None
+        self._thread = None
+    
+    def __enter__(self) -> 'ProgressServer':
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _PredictionHandler(_JSONHandler):
+    """Atiende las solicitudes de predicción por lotes."""
+    
+    server: '_PredictionHTTPServer'
+    
+    def do_GET(self):
+        """Atiende /formats."""
+        if self.path == '/formats':
+            self._send_json(200, {'content_types': supported_content_types()})
+        else:
+            self._send_json(404, {'error': f"Ruta no encontrada: {self.path}"})
+    
+    def do_POST(self):
+        """Atiende /predict."""
+        url = urlsplit(self.path)
+        if url.path != '/predict':
+            self._send_json(404, {'error': f"Ruta no encontrada: {self.path}"})
+            return
+        
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in supported_content_types():
+            self._send_json(415, {
+                'error': f"Formato no soportado: {content_type or '(sin Content-Type)'}",
+                'content_types': supported_content_types()
+            })
+            return
+        
+        # La respuesta usa el primer formato aceptado disponible o el de la solicitud
+        accepted = [value.split(';')[0].strip() for value in self.headers.get('Accept', '').split(',')]
+        response_type = next(
+            (value for value in accepted if value in supported_content_types()),
+            content_type
+        )
+        
+        query = parse_qs(url.query)
+        balance_data = query.get('balance', ['true'])[0].lower() not in ('false', '0', 'no')
+        diagnosis_column = query.get('diagnosis', [None])[0]
+        
+        try:
+            length = int(self.headers['Content-Length'])
+        except (TypeError, ValueError):
+            self._send_json(411, {'error': "Falta Content-Length o no es un entero"})
+            return
+        if length < 0:
+            self._send_json(400, {'error': "Content-Length no puede ser negativo"})
+            return
+        if length > self.server.max_request_bytes:
+            self._send_json(413, {'error': f"El lote supera {self.server.max_request_bytes} bytes"})
+            return
+        
+        try:
+            df, _ = decode_frame(self.rfile.read(length), content_type)
+            # Sin candado: process_frame no modifica el estado del sistema y los
+            # sorteos no usan generadores compartidos, así que los lotes se procesan
+            # en paralelo (un hilo por solicitud)
+            results = self.server.system.process_frame(
+                df,
+                diagnosis_column=diagnosis_column,
+                balance_data=balance_data
+            )
+        except (ValueError, KeyError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            # Cualquier otro fallo se informa en lugar de cerrar la conexión sin respuesta
+            self._send_json(500, {'error': f"Error al procesar el lote: {str(e)}"})
+            return
+        
+        try:
+            body = encode_results(results, response_type, self.server.system.class_labels)
+        except Exception as e:
+            # El lote era válido: un fallo al codificar la respuesta es del servidor
+            self._send_json(500, {'error': f"Error al codificar la respuesta: {str(e)}"})
+            return
+        self._send_body(200, body, response_type)
+
+
+class _PredictionHTTPServer(ThreadingHTTPServer):
+    """Servidor con referencia al sistema de predicción que atiende."""
+    
+    daemon_threads = True
+    
+    def __init__(self, address, system: Any, max_request_bytes: int):
+        super().__init__(address, _PredictionHandler)
+        self.system = system
+        self.max_request_bytes = max_request_bytes
+
+
+class PredictionServer:
+    """Atiende predicciones por lotes en un servidor HTTP local en segundo plano."""
+    
+    def __init__(
+        self,
+        system: Any,
+        host: str = '127.0.0.1',
+        port: int = 8766,
+        max_request_bytes: int = 512 * 1024 * 1024
+    ):
+        """
+        Inicializa el servidor (no empieza a escuchar hasta llamar a start).
+        
+        Args:
+            system: BatchPredictionSystem que procesa los lotes
+            host: Dirección de escucha (por defecto solo local)
+            port: Puerto de escucha (0 elige uno libre)
+            max_request_bytes: Tamaño máximo de un lote
+        """
+        self.system = system
+        self.host = host
+        self.port = port
+        self.max_request_bytes = max_request_bytes
+        self._httpd = None
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        """URL base del servidor."""
+        return f"http://{self.host}:{self.port}"
+    
+    def start(self) -> 'PredictionServer':
+        """
+        Empieza a atender solicitudes en un hilo en segundo plano.
+        
+        Returns:
+            El mismo servidor, para encadenar llamadas
+        """
+        self._httpd = _PredictionHTTPServer((self.host, self.port), self.system, self.max_request_bytes)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            name="prediction-server",
+            daemon=True
+        )
+        self._thread.start()
+        return self
+    
+    def serve_forever(self):
+        """Atiende solicitudes en el hilo actual hasta que se interrumpa."""
+        self._httpd = _PredictionHTTPServer((self.host, self.port), self.system, self.max_request_bytes)
+        self.port = self._httpd.server_address[1]
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+            self._httpd = None
+    
+    def stop(self):
+        """Detiene el servidor."""
+        if self._httpd is None:
+            return
+        
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._httpd = None
+        self._thread = None
+    
+    def __enter__(self) -> 'PredictionServer':
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
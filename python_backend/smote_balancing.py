@@ -5,9 +5,12 @@ Genera datos sintéticos para balancear clases desbalanceadas en el dataset.
 
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Iterator
+import functools
 import hashlib
 
+from data_processor import frame_row_keys, label_seed
+
 
 class SMOTEBalancer:
     """Clase para balancear clases usando técnica SMOTE simplificada."""
@@ -20,7 +23,9 @@ class SMOTEBalancer:
             random_seed: Semilla para reproducibilidad
         """
         self.random_seed = random_seed
-        np.random.seed(random_seed)
+        
+        # Tipos de columna resueltos por dtype, por esquema (columnas y dtypes)
+        self._schema_cache: Dict[Tuple, Dict[str, Any]] = {}
     
     def _get_data_hash(self, data: Dict[str, Any], seed: int = 0) -> int:
         """
@@ -72,29 +77,206 @@ class SMOTEBalancer:
         if not samples:
             return [], []
         
-        numeric_columns = []
-        categorical_columns = []
+        profile = self.profile_columns(pd.DataFrame(samples))
+        numeric_columns = [col for col, is_numeric in profile.items() if is_numeric]
+        categorical_columns = [col for col, is_numeric in profile.items() if not is_numeric]
+        
+        return numeric_columns, categorical_columns
+    
+    def profile_columns(self, data: pd.DataFrame) -> Dict[str, bool]:
+        """
+        Determina qué columnas son numéricas revisando cada columna completa.
+        
+        Las columnas con tipo numérico o booleano se resuelven por su dtype, y esa
+        decisión se guarda por esquema (columnas y dtypes) para reutilizarla. Las
+        columnas de texto se revisan sobre sus valores únicos: son numéricas solo si
+        todos los valores no vacíos se pueden convertir a número.
+        
+        Args:
+            data: DataFrame con las muestras de una clase
+            
+        Returns:
+            Diccionario columna -> True si es numérica
+        """
+        schema = tuple((col, str(dtype)) for col, dtype in data.dtypes.items())
+        dtype_profile = self._schema_cache.get(schema)
+        
+        if dtype_profile is None:
+            dtype_profile = {
+                col: True if pd.api.types.is_numeric_dtype(dtype) else None
+                for col, dtype in data.dtypes.items()
+            }
+            self._schema_cache[schema] = dtype_profile
+        
+        return {
+            col: is_numeric if is_numeric is not None else self._is_numeric_column(data[col])
+            for col, is_numeric in dtype_profile.items()
+        }
+    
+    def _is_numeric_column(self, column: pd.Series) -> bool:
+        """
+        Determina si una columna de texto es numérica a partir de sus valores únicos.
+        
+        Args:
+            column: Columna a evaluar
+            
+        Returns:
+            True si todos los valores no vacíos son numéricos
+        """
+        values = pd.Series(column.dropna().unique(), dtype=object)
+        if values.empty:
+            return False
+        
+        is_text = values.map(lambda value: isinstance(value, str)).astype(bool)
+        others = values[~is_text]
+        if not others.map(lambda value: isinstance(value, (int, float))).all():
+            return False
+        
+        text = values[is_text].str.strip().str.lower()
+        if text.isin(['sí', 'si', 'no', 'true', 'false', '']).any():
+            return False
+        
+        return bool(pd.to_numeric(text, errors='coerce').notna().all())
+    
+    def _numeric_values(self, column: pd.Series) -> np.ndarray:
+        """
+        Convierte una columna numérica en un arreglo de floats.
         
-        first_sample = samples[0]
-        check_count = min(3, len(samples))
+        Los valores None cuentan como 0, igual que float(valor or 0) al interpolar
+        registro por registro; los NaN se mantienen como NaN.
         
-        for key in first_sample.keys():
-            is_numeric = True
-            numeric_count = 0
+        Args:
+            column: Columna numérica
             
-            for j in range(check_count):
-                value = samples[j].get(key)
+        Returns:
+            Arreglo de floats
+        """
+        if pd.api.types.is_numeric_dtype(column.dtype):
+            return column.to_numpy(dtype=float, na_value=np.nan)
+        
+        stripped = column.map(
+            lambda value: 0 if value is None else value.strip() if isinstance(value, str) else value
+        )
+        return pd.to_numeric(stripped, errors='coerce').to_numpy(dtype=float)
+    
+    def _hash_keys(self, keys: List[str], seeds: List[int]) -> np.ndarray:
+        """
+        Calcula _get_data_hash para pares (cadena del registro, semilla).
+        
+        Args:
+            keys: Cadenas str(sorted(registro.items())) de cada registro
+            seeds: Semilla de cada par
+            
+        Returns:
+            Arreglo con un hash entre 0 y 9999 por par
+        """
+        return np.fromiter(
+            (
+                int(hashlib.md5((key + str(seed)).encode()).hexdigest(), 16) % 10000
+                for key, seed in zip(keys, seeds)
+            ),
+            dtype=np.int64,
+            count=len(keys)
+        )
+    
+    def _synthetic_block(
+        self,
+        samples: pd.DataFrame,
+        row_keys: List[str],
+        profile: Dict[str, bool],
+        seed: int,
+        start: int,
+        stop: int
+    ) -> pd.DataFrame:
+        """
+        Genera las muestras sintéticas número start a stop - 1 de una clase.
+        
+        Cada muestra sintética depende solo de su número, de la semilla y de las
+        muestras originales, así que cualquier rango se puede generar por separado
+        con el mismo resultado que generando todas juntas.
+        
+        Args:
+            samples: Muestras originales de la clase (con índice 0..n-1)
+            row_keys: Cadena str(sorted(registro.items())) de cada muestra original
+            profile: Resultado de profile_columns para las muestras
+            seed: Semilla de la clase
+            start: Número de la primera muestra sintética
+            stop: Número siguiente a la última muestra sintética
+            
+        Returns:
+            DataFrame con las muestras sintéticas
+        """
+        positions = np.arange(start, stop)
+        num_samples = len(samples)
+        
+        # Caso especial: solo una muestra (variación de ±5% en los valores numéricos)
+        if num_samples == 1:
+            single_sample = samples.iloc[0].to_dict()
+            synthetic = {}
+            for key, value in single_sample.items():
+                synthetic[key] = [value] * len(positions)
                 if not self._is_numeric(value):
-                    is_numeric = False
-                    break
-                numeric_count += 1
+                    continue
+                try:
+                    num_value = float(value)
+                except (ValueError, TypeError):
+                    continue
+                if num_value == 0:
+                    continue
+                
+                column_seed = label_seed(key)
+                seeds = [seed + int(i) + column_seed for i in positions]
+                hash_vals = self._hash_keys(row_keys[:1] * len(positions), seeds)
+                variations = ((hash_vals % 10) - 5) / 100
+                synthetic[key] = [num_value * (1 + variation) for variation in variations.tolist()]
             
-            if is_numeric and numeric_count > 0:
-                numeric_columns.append(key)
-            else:
-                categorical_columns.append(key)
+            return pd.DataFrame(synthetic, columns=list(single_sample))
         
-        return numeric_columns, categorical_columns
+        # Seleccionar dos muestras diferentes por cada muestra sintética. Cada par usa
+        # la cadena de _get_data_hash({'index': i, 'seed': seed}, ...), armada una vez
+        numbers = positions.tolist()
+        pair_keys = [f"[('index', {i!r}), ('seed', {seed!r})]" for i in numbers]
+        hash1 = self._hash_keys(pair_keys, [seed + i * 2 for i in numbers])
+        hash2 = self._hash_keys(pair_keys, [seed + i * 2 + 1 for i in numbers])
+        
+        idx1 = hash1 % num_samples
+        idx2 = hash2 % num_samples
+        idx2 = np.where(idx1 == idx2, (idx2 + 1) % num_samples, idx2)
+        
+        # Factor de interpolación (0.1 a 0.9 para evitar extremos)
+        alpha = ((hash1 % 100) / 100) * 0.8 + 0.1
+        
+        synthetic = {}
+        numeric_columns = [col for col in samples.columns if profile[col]]
+        categorical_columns = [col for col in samples.columns if not profile[col]]
+        
+        # Interpolación para columnas numéricas
+        for col in numeric_columns:
+            values = self._numeric_values(samples[col])
+            val1 = values[idx1]
+            val2 = values[idx2]
+            synthetic_values = val1 + alpha * (val2 - val1)
+            
+            # Redondear apropiadamente
+            synthetic[col] = [
+                round(value, 2) if abs(value) < 1 else round(value, 1)
+                for value in synthetic_values.tolist()
+            ]
+        
+        # Selección aleatoria para columnas categóricas (con el tipo de la columna
+        # original, para que todos los bloques de una clase tengan los mismos tipos)
+        sample_keys = [row_keys[j] for j in idx1.tolist()]
+        for col in categorical_columns:
+            values = np.array(samples[col].tolist(), dtype=object)
+            column_seed = label_seed(col)
+            seeds = [seed + int(i) * 1000 + column_seed for i in positions]
+            use_first = (self._hash_keys(sample_keys, seeds) % 2) == 0
+            synthetic[col] = pd.Series(
+                np.where(use_first, values[idx1], values[idx2]),
+                dtype=samples[col].dtype
+            )
+        
+        return pd.DataFrame(synthetic, columns=numeric_columns + categorical_columns)
     
     def generate_synthetic_samples(
         self,
@@ -119,81 +301,20 @@ class SMOTEBalancer:
         if len(samples) >= target_count:
             return samples.copy()
         
-        synthetic_samples = samples.copy()
-        needed = target_count - len(samples)
-        
-        # Caso especial: solo una muestra
-        if len(samples) == 1:
-            single_sample = samples[0]
-            for i in range(needed):
-                synthetic_row = {}
-                for key, value in single_sample.items():
-                    hash_val = self._get_data_hash(single_sample, seed + i + ord(key[0]) if key else 0)
-                    
-                    if self._is_numeric(value):
-                        try:
-                            num_value = float(value)
-                            if num_value != 0:
-                                variation = ((hash_val % 10) - 5) / 100  # ±5%
-                                synthetic_row[key] = num_value * (1 + variation)
-                            else:
-                                synthetic_row[key] = value
-                        except (ValueError, TypeError):
-                            synthetic_row[key] = value
-                    else:
-                        synthetic_row[key] = value
-                
-                synthetic_samples.append(synthetic_row)
-            
-            return synthetic_samples
+        frame = pd.DataFrame(samples)
+        row_keys = [str(sorted(sample.items())) for sample in samples]
+        profile = self.profile_columns(frame)
         
-        # Clasificar columnas
-        numeric_columns, categorical_columns = self._classify_columns(samples)
+        synthetic = self._synthetic_block(
+            frame,
+            row_keys,
+            profile,
+            seed,
+            0,
+            target_count - len(samples)
+        )
         
-        # Generar muestras sintéticas
-        for i in range(needed):
-            # Seleccionar dos muestras diferentes
-            hash1 = self._get_data_hash({'index': i, 'seed': seed}, seed + i * 2)
-            hash2 = self._get_data_hash({'index': i, 'seed': seed}, seed + i * 2 + 1)
-            
-            idx1 = hash1 % len(samples)
-            idx2 = hash2 % len(samples)
-            
-            if idx1 == idx2:
-                idx2 = (idx2 + 1) % len(samples)
-            
-            sample1 = samples[idx1]
-            sample2 = samples[idx2]
-            
-            # Factor de interpolación (0.1 a 0.9 para evitar extremos)
-            alpha = ((hash1 % 100) / 100) * 0.8 + 0.1
-            
-            synthetic_row = {}
-            
-            # Interpolación para columnas numéricas
-            for col in numeric_columns:
-                try:
-                    val1 = float(sample1.get(col, 0) or 0)
-                    val2 = float(sample2.get(col, 0) or 0)
-                    synthetic_value = val1 + alpha * (val2 - val1)
-                    
-                    # Redondear apropiadamente
-                    if abs(synthetic_value) < 1:
-                        synthetic_row[col] = round(synthetic_value, 2)
-                    else:
-                        synthetic_row[col] = round(synthetic_value, 1)
-                except (ValueError, TypeError):
-                    synthetic_row[col] = sample1.get(col) or sample2.get(col)
-            
-            # Selección aleatoria para columnas categóricas
-            for col in categorical_columns:
-                hash_col = self._get_data_hash(sample1, seed + i * 1000 + ord(col[0]) if col else 0)
-                use_first = (hash_col % 2) == 0
-                synthetic_row[col] = sample1.get(col) if use_first else sample2.get(col)
-            
-            synthetic_samples.append(synthetic_row)
-        
-        return synthetic_samples
+        return samples.copy() + synthetic.to_dict('records')
     
     def balance_classes(
         self,
@@ -215,31 +336,177 @@ class SMOTEBalancer:
         # Encontrar la clase mayoritaria
         class_counts = data[target_column].value_counts().to_dict()
         max_count = max(class_counts.values(), default=0)
-        majority_class = max(class_counts.items(), key=lambda x: x[1])[0] if class_counts else None
         
         if max_count == 0:
             return data
         
-        balanced_samples = []
+        balanced_parts = []
         
-        for label in class_labels:
-            class_data = data[data[target_column] == label].copy()
-            target_count = max_count
+        for label, class_data in self._class_frames(data, target_column, class_labels):
             
-            # Convertir a lista de diccionarios
-            samples = class_data.to_dict('records')
+            balanced_parts.append(class_data)
+            needed = max_count - len(class_data)
+            if needed <= 0:
+                continue
             
-            # Generar muestras sintéticas
-            balanced_class_samples = self.generate_synthetic_samples(
-                samples,
-                target_count,
-                seed=ord(label[0]) * 1000 if label else 0
+            # Generar muestras sintéticas con tipos de columna perfilados una vez por clase
+            synthetic = self._synthetic_block(
+                class_data,
+                frame_row_keys(class_data),
+                self.profile_columns(class_data),
+                label_seed(label),
+                0,
+                needed
             )
-            
-            balanced_samples.extend(balanced_class_samples)
+            balanced_parts.append(synthetic)
         
         # Crear DataFrame balanceado
-        balanced_df = pd.DataFrame(balanced_samples)
+        balanced_df = pd.concat(balanced_parts, ignore_index=True)
         
         return balanced_df
-
+    
+    def _class_frames(
+        self,
+        data: pd.DataFrame,
+        target_column: str,
+        class_labels: List[str]
+    ) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Separa los registros de cada clase con una sola pasada sobre el objetivo.
+        
+        Args:
+            data: DataFrame con los datos
+            target_column: Nombre de la columna objetivo
+            class_labels: Lista de etiquetas de clase
+            
+        Yields:
+            Tuplas (etiqueta, registros de la clase con índice 0..n-1), en el orden de
+            class_labels y solo para las clases presentes
+        """
+        codes = pd.Index(class_labels).get_indexer(pd.Index(data[target_column], dtype=object))
+        # Orden estable: dentro de cada clase se conserva el orden original
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(class_labels) + 1))
+        
+        for code, label in enumerate(class_labels):
+            start, stop = bounds[code], bounds[code + 1]
+            if start < stop:
+                yield label, data.iloc[order[start:stop]].reset_index(drop=True)
+    
+    def real_row_mask(self, class_counts: Dict[str, int], class_labels: List[str]) -> np.ndarray:
+        """
+        Indica qué filas del dataset balanceado son registros reales.
+        
+        Describe el orden que producen balance_classes e iter_balanced_blocks: por
+        cada clase, sus registros reales seguidos de sus muestras sintéticas.
+        
+        Args:
+            class_counts: Registros reales por clase (antes del balanceo)
+            class_labels: Lista de etiquetas de clase
+            
+        Returns:
+            Arreglo booleano con una posición por fila del dataset balanceado
+        """
+        max_count = max(class_counts.values(), default=0)
+        parts = []
+        for label in class_labels:
+            count = class_counts.get(label, 0)
+            if count > 0:
+                parts.append(np.ones(count, dtype=bool))
+                parts.append(np.zeros(max_count - count, dtype=bool))
+        
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=bool)
+    
+    def iter_balanced_blocks(
+        self,
+        data: pd.DataFrame,
+        target_column: str,
+        class_labels: List[str],
+        block_size: int = 10000
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Genera el dataset balanceado por bloques, sin materializarlo completo.
+        
+        Produce las mismas filas que balance_classes, en el mismo orden y con el mismo
+        índice y tipos de columna. Las muestras sintéticas se generan al pedir cada
+        bloque, así que la memoria adicional depende de block_size y no del tamaño
+        del dataset balanceado. Los bloques no cruzan el límite entre los registros
+        reales y los sintéticos de una clase.
+        
+        Args:
+            data: DataFrame con los datos
+            target_column: Nombre de la columna objetivo
+            class_labels: Lista de etiquetas de clase
+            block_size: Cantidad máxima de filas por bloque
+            
+        Yields:
+            Bloques consecutivos del DataFrame balanceado
+        """
+        if block_size < 1:
+            raise ValueError("El tamaño de bloque debe ser al menos 1")
+        
+        class_counts = data[target_column].value_counts().to_dict()
+        max_count = max(class_counts.values(), default=0)
+        
+        if max_count == 0:
+            for start in range(0, len(data), block_size):
+                yield data.iloc[start:start + block_size]
+            return
+        
+        # Por clase: registros reales, muestras faltantes y generador de sintéticos
+        parts = []
+        for label, class_data in self._class_frames(data, target_column, class_labels):
+            needed = max(0, max_count - len(class_data))
+            synthesize = None
+            if needed > 0:
+                synthesize = functools.partial(
+                    self._synthetic_block,
+                    class_data,
+                    frame_row_keys(class_data),
+                    self.profile_columns(class_data),
+                    label_seed(label)
+                )
+            parts.append((class_data, needed, synthesize))
+        
+        if not parts:
+            return
+        
+        # Tipos de columna del DataFrame concatenado, a partir de una fila de cada parte
+        probes = []
+        for class_data, needed, synthesize in parts:
+            probes.append(class_data.iloc[:1])
+            if needed > 0:
+                probes.append(synthesize(0, 1))
+        dtypes = pd.concat(probes, ignore_index=True).dtypes
+        
+        offset = 0
+        for class_data, needed, synthesize in parts:
+            for start in range(0, len(class_data), block_size):
+                block = class_data.iloc[start:start + block_size]
+                yield self._conform_block(block, dtypes, offset)
+                offset += len(block)
+            
+            for start in range(0, needed, block_size):
+                block = synthesize(start, min(start + block_size, needed))
+                yield self._conform_block(block, dtypes, offset)
+                offset += len(block)
+    
+    def _conform_block(self, block: pd.DataFrame, dtypes: pd.Series, offset: int) -> pd.DataFrame:
+        """
+        Ajusta un bloque al orden de columnas, tipos e índice del dataset concatenado.
+        
+        Args:
+            block: Bloque de registros reales o sintéticos
+            dtypes: Tipo de cada columna en el dataset concatenado
+            offset: Posición del primer registro del bloque en el dataset
+            
+        Returns:
+            Bloque ajustado
+        """
+        block = block[list(dtypes.index)]
+        changed = {col: dtype for col, dtype in dtypes.items() if block[col].dtype != dtype}
+        if changed:
+            block = block.astype(changed)
+        
+        block.index = pd.RangeIndex(offset, offset + len(block))
+        return block
@@ -0,0 +1,48 @@
+"""
+Configuración compartida de las pruebas del backend.
+
+Los módulos del backend se importan por nombre (from data_processor import ...),
+así que se agrega la carpeta python_backend al path de importación.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_clinical_frame(rows: int = 400, seed: int = 0) -> pd.DataFrame:
+    """
+    Genera registros clínicos sintéticos con clases desbalanceadas.
+    
+    Args:
+        rows: Cantidad de registros
+        seed: Semilla del generador
+        
+    Returns:
+        DataFrame con identificador, variables clínicas y diagnóstico
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'ID': np.arange(1000, 1000 + rows),
+        'Plaquetas': rng.integers(20, 300, rows),
+        'Temperatura': np.round(rng.normal(38.5, 1, rows), 1),
+        'Hemoglobina': np.round(rng.normal(12.5, 1.5, rows), 1),
+        'Fiebre': rng.choice(['Sí', 'No'], rows),
+        'Dolor_Cabeza': rng.choice(['Sí', 'No'], rows),
+        'Edad': rng.integers(1, 90, rows),
+        'Ciudad': rng.choice(['Neiva', 'Bogota', 'Cali'], rows),
+        'Diagnóstico': rng.choice(['Dengue', 'Malaria', 'Leptospirosis'], rows, p=[0.6, 0.25, 0.15])
+    })
+
+
+@pytest.fixture
+def clinical_csv(tmp_path) -> str:
+    """Archivo CSV con registros clínicos sintéticos."""
+    path = tmp_path / 'pacientes.csv'
+    make_clinical_frame().to_csv(path, index=False)
+    return str(path)
@@ -0,0 +1,15 @@
+"""Pruebas de la validación cruzada estratificada."""
+
+from main import BatchPredictionSystem
+
+
+def test_untrainable_model_skips_fold_balancing(clinical_csv):
+    system = BatchPredictionSystem(random_seed=3)
+    assert not system.prediction_model.trainable
+    
+    balanced = system.cross_validate(clinical_csv, n_folds=3, balance_data=True, n_jobs=1)
+    unbalanced = system.cross_validate(clinical_csv, n_folds=3, balance_data=False, n_jobs=1)
+    
+    assert not balanced['balanced_folds']
+    assert balanced['confusion_matrix'] == unbalanced['confusion_matrix']
+    assert sum(fold['train_records'] for fold in balanced['folds']) == 2 * balanced['total_records']
@@ -0,0 +1,44 @@
+"""Pruebas de los motores de lectura de CSV."""
+
+import pytest
+
+from conftest import make_clinical_frame
+from data_processor import DataProcessor
+from main import BatchPredictionSystem
+
+pytest.importorskip('pyarrow')
+
+
+def _predict(file_path, csv_engine):
+    system = BatchPredictionSystem(csv_engine=csv_engine)
+    results = system.process_file(file_path)
+    return results, system.data_processor.csv_engine
+
+
+def test_engines_produce_identical_predictions(clinical_csv):
+    expected, expected_engine = _predict(clinical_csv, 'c')
+    results, engine = _predict(clinical_csv, 'pyarrow')
+    
+    assert expected_engine == 'c'
+    assert engine == 'pyarrow'
+    assert results['predictions'] == expected['predictions']
+    assert results['confusion_matrix'] == expected['confusion_matrix']
+
+
+def test_pyarrow_falls_back_when_values_differ(tmp_path):
+    # pyarrow convierte las fechas; el lector de pandas las deja como texto
+    df = make_clinical_frame(rows=120)
+    df['Fecha_Consulta'] = '2024-03-01'
+    path = tmp_path / 'con_fechas.csv'
+    df.to_csv(path, index=False)
+    
+    expected, _ = _predict(str(path), 'c')
+    results, engine = _predict(str(path), 'pyarrow')
+    
+    assert engine == 'c'
+    assert results['predictions'] == expected['predictions']
+
+
+def test_invalid_engine_is_rejected():
+    with pytest.raises(ValueError):
+        DataProcessor(csv_engine='rapido')
@@ -0,0 +1,50 @@
+"""Pruebas de la lectura de libros Excel con varias hojas."""
+
+import pandas as pd
+import pytest
+
+from conftest import make_clinical_frame
+from data_processor import SOURCE_SHEET_COLUMN, DataProcessor
+
+pytest.importorskip('openpyxl')
+
+
+@pytest.fixture
+def workbook(tmp_path) -> str:
+    """Libro con tres hojas; la última no tiene la columna Ciudad."""
+    df = make_clinical_frame(rows=90)
+    path = tmp_path / 'pacientes.xlsx'
+    with pd.ExcelWriter(path) as writer:
+        df.iloc[:30].to_excel(writer, sheet_name='Enero', index=False)
+        df.iloc[30:60].to_excel(writer, sheet_name='Febrero', index=False)
+        df.iloc[60:].drop(columns='Ciudad').to_excel(writer, sheet_name='Marzo', index=False)
+    return str(path)
+
+
+def test_inspect_file_lists_sheets_and_reads_first_rows(workbook):
+    sample, sheet_names = DataProcessor().inspect_file(workbook, n_rows=10)
+    
+    assert sheet_names == ['Enero', 'Febrero', 'Marzo']
+    assert len(sample) == 10
+    assert sample['ID'].tolist() == list(range(1000, 1010))
+
+
+def test_load_data_with_known_sheets_matches_full_load(workbook):
+    processor = DataProcessor()
+    _, sheet_names = processor.inspect_file(workbook)
+    
+    expected = processor.load_data(workbook)
+    df = processor.load_data(workbook, sheet_names=sheet_names)
+    
+    pd.testing.assert_frame_equal(df, expected)
+    assert df[SOURCE_SHEET_COLUMN].unique().tolist() == ['Enero', 'Febrero', 'Marzo']
+    assert df['Ciudad'].isna().sum() == 30
+
+
+def test_read_header_matches_loaded_columns(workbook):
+    processor = DataProcessor()
+    
+    header = processor.read_header(workbook)
+    
+    assert len(header) == 0
+    assert list(header.columns) == list(processor.load_data(workbook).columns)
@@ -0,0 +1,34 @@
+"""Pruebas del modo diferido (balanceo y predicción por bloques)."""
+
+import pytest
+
+from main import BatchPredictionSystem
+from progress import ProgressTracker
+
+
+def _comparable(results):
+    return {
+        name: results[name]
+        for name in ('predictions', 'actual', 'patient_ids', 'balanced_counts', 'confusion_matrix', 'metrics')
+    }
+
+
+@pytest.mark.parametrize('model_type', ['logistic', 'neural'])
+@pytest.mark.parametrize('balance_data', [True, False])
+def test_lazy_matches_eager(clinical_csv, model_type, balance_data):
+    system = BatchPredictionSystem(model_type=model_type)
+    
+    eager = system.process_file(clinical_csv, balance_data=balance_data)
+    lazy = system.process_file(clinical_csv, balance_data=balance_data, lazy=True, block_size=37)
+    
+    assert _comparable(lazy) == _comparable(eager)
+
+
+def test_lazy_with_progress_matches_eager(clinical_csv):
+    system = BatchPredictionSystem()
+    
+    eager = system.process_file(clinical_csv)
+    lazy = system.process_file(clinical_csv, lazy=True, block_size=50, progress=ProgressTracker())
+    
+    assert lazy['cancelled'] is False
+    assert _comparable(lazy) == _comparable(eager)
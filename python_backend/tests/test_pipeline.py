@@ -0,0 +1,71 @@
+"""Pruebas del pipeline por etapas y del modo pipeline del sistema."""
+
+import pytest
+
+from main import BatchPredictionSystem
+from pipeline import StagePipeline
+
+
+def test_pipeline_preserves_order():
+    results = []
+    pipeline = StagePipeline(queue_size=2)
+    pipeline.add_stage('fuente', lambda: iter(range(50)))
+    pipeline.add_stage('doble', lambda items: (item * 2 for item in items))
+    pipeline.add_stage('destino', lambda items: results.extend(items))
+    
+    stats = pipeline.run()
+    
+    assert results == [item * 2 for item in range(50)]
+    assert stats['stages']['fuente']['blocks'] == 50
+
+
+def test_stage_that_stops_early_does_not_block_upstream():
+    produced = []
+    results = []
+    
+    def source():
+        for item in range(1000):
+            produced.append(item)
+            yield item
+    
+    def take_three(items):
+        for _ in range(3):
+            yield next(items)
+    
+    pipeline = StagePipeline(queue_size=1, poll_interval=0.01)
+    pipeline.add_stage('fuente', source)
+    pipeline.add_stage('primeros', take_three)
+    pipeline.add_stage('destino', lambda items: results.extend(items))
+    pipeline.run()
+    
+    assert results == [0, 1, 2]
+    assert len(produced) < 1000
+
+
+def test_stage_error_propagates():
+    def failing(items):
+        for item in items:
+            raise RuntimeError("falla de etapa")
+        yield
+    
+    pipeline = StagePipeline(queue_size=1, poll_interval=0.01)
+    pipeline.add_stage('fuente', lambda: iter(range(100)))
+    pipeline.add_stage('falla', failing)
+    pipeline.add_stage('destino', lambda items: list(items))
+    
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+
+
+def test_pipeline_mode_matches_eager_without_balance(clinical_csv):
+    system = BatchPredictionSystem(random_seed=7)
+    eager = system.process_file(clinical_csv, balance_data=False)
+    piped = system.process_file_pipeline(clinical_csv, chunk_size=64, queue_size=2)
+    
+    assert piped['predictions'] == eager['predictions']
+    assert piped['confusion_matrix'] == eager['confusion_matrix']
+
+
+def test_pipeline_mode_rejects_balancing(clinical_csv):
+    with pytest.raises(ValueError):
+        BatchPredictionSystem().process_file_pipeline(clinical_csv, balance_data=True)
@@ -0,0 +1,38 @@
+"""Pruebas del perfilado por etapas de process_file."""
+
+import sys
+
+import pytest
+
+import main
+from main import BatchPredictionSystem
+from profiling import StageProfiler
+
+
+def test_stages_are_profiled(clinical_csv):
+    profile = StageProfiler(mode='cprofile')
+    
+    results = BatchPredictionSystem().process_file(clinical_csv, profile=profile)
+    
+    assert list(results['profile']['stages']) == ['carga', 'balanceo', 'prediccion', 'metricas']
+
+
+def test_profiler_stops_when_a_stage_fails(clinical_csv):
+    profile = StageProfiler(mode='cprofile')
+    
+    with pytest.raises(ValueError):
+        BatchPredictionSystem().process_file(clinical_csv, diagnosis_column='No_Existe', profile=profile)
+    
+    assert profile._current is None
+    assert 'carga' in profile.summary()['stages']
+    assert sys.getprofile() is None
+
+
+@pytest.mark.parametrize('option', ['--pipeline', '--compare', '--cv', '--approximate'])
+def test_profile_is_rejected_outside_process_file(clinical_csv, monkeypatch, capsys, option):
+    monkeypatch.setattr(sys, 'argv', ['main.py', clinical_csv, option, '--no-balance', '--profile'])
+    
+    with pytest.raises(SystemExit):
+        main.main()
+    
+    assert '--profile solo se puede usar' in capsys.readouterr().out
@@ -0,0 +1,75 @@
+"""Pruebas del archivo de resultados indexado por paciente."""
+
+import pytest
+
+from results_archive import ResultsArchive
+
+
+def _results(patient_ids, predictions, actual, model_type='logistic'):
+    return {
+        'file_path': 'pacientes.csv',
+        'model_type': model_type,
+        'patient_ids': patient_ids,
+        'predictions': predictions,
+        'actual': actual,
+        'metrics': {'accuracy': 50.0},
+        'confusion_matrix': [[1, 0], [1, 0]]
+    }
+
+
+def test_runs_round_trip_through_reopened_archive(tmp_path):
+    archive = ResultsArchive(str(tmp_path))
+    archive.append_run(
+        _results([1003, 1001, None, 1002], ['Dengue', 'Malaria', 'Dengue', 'Dengue'],
+                 ['Dengue', 'Dengue', 'Malaria', 'Malaria']),
+        run_id='primera'
+    )
+    archive.append_run(
+        _results([1001, 1002], ['Dengue', 'Malaria'], ['Dengue', 'Malaria'], model_type='neural'),
+        run_id='segunda'
+    )
+    
+    reopened = ResultsArchive(str(tmp_path))
+    
+    runs = reopened.list_runs()
+    assert [run['run_id'] for run in runs] == ['primera', 'segunda']
+    assert runs[0]['records'] == 3
+    assert runs[0]['synthetic_records'] == 1
+    assert runs[1]['model_type'] == 'neural'
+    
+    history = reopened.lookup(1001)
+    assert [entry['run_id'] for entry in history] == ['segunda', 'primera']
+    assert [entry['Prediccion'] for entry in history] == ['Dengue', 'Malaria']
+    assert [entry['Diagnostico_Real'] for entry in history] == ['Dengue', 'Dengue']
+    
+    frame = reopened.query_range(1002, 1003, run_id='primera')
+    assert frame['Paciente_ID'].tolist() == [1002, 1003]
+    assert frame['Prediccion'].tolist() == ['Dengue', 'Dengue']
+    assert frame['Diagnostico_Real'].tolist() == ['Malaria', 'Dengue']
+
+
+def test_compact_keeps_query_results(tmp_path):
+    archive = ResultsArchive(str(tmp_path))
+    for run in range(4):
+        labels = ['Dengue' if (patient + run) % 2 else 'Malaria' for patient in range(5)]
+        archive.append_run(_results(list(range(1, 6)), labels, labels), run_id=f"run-{run}")
+    archive.append_run(_results(['A-1', 'A-2'], ['Dengue', 'Malaria'], ['Dengue', 'Malaria']), run_id='texto')
+    expected = archive.query_range(1, 5)
+    
+    summary = archive.compact(keep_recent=1)
+    
+    assert summary == {'merged_segments': 4, 'rows': 20}
+    assert len(archive.manifest['segments']) == 2
+    reopened = ResultsArchive(str(tmp_path))
+    assert reopened.query_range(1, 5).equals(expected)
+    assert reopened.lookup('A-2')[0]['Prediccion'] == 'Malaria'
+
+
+def test_duplicate_and_unknown_runs_are_rejected(tmp_path):
+    archive = ResultsArchive(str(tmp_path))
+    archive.append_run(_results([1], ['Dengue'], ['Dengue']), run_id='unica')
+    
+    with pytest.raises(ValueError):
+        archive.append_run(_results([2], ['Dengue'], ['Dengue']), run_id='unica')
+    with pytest.raises(ValueError):
+        archive.lookup(1, run_id='otra')
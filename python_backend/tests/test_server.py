@@ -0,0 +1,128 @@
+"""Pruebas del servidor de predicción por lotes."""
+
+import http.client
+import json
+import struct
+
+import pytest
+
+from conftest import make_clinical_frame
+from main import BatchPredictionSystem
+from server import PredictionServer
+from transport import COLUMNAR_CONTENT_TYPE, COLUMNAR_MAGIC, JSON_CONTENT_TYPE, decode_frame, encode_frame
+
+
+class _BrokenResultsSystem:
+    """Sistema cuyos resultados no se pueden codificar (faltan los diagnósticos)."""
+    
+    class_labels = ['Dengue', 'Malaria', 'Leptospirosis']
+    
+    def process_frame(self, df, diagnosis_column=None, balance_data=True):
+        return {'predictions': ['Dengue'] * len(df)}
+
+
+@pytest.fixture(scope='module')
+def server():
+    with PredictionServer(BatchPredictionSystem(), port=0) as prediction_server:
+        yield prediction_server
+
+
+def _post(server, body, headers, path='/predict'):
+    connection = http.client.HTTPConnection(server.host, server.port, timeout=30)
+    try:
+        connection.putrequest('POST', path)
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders()
+        if body:
+            connection.send(body)
+        response = connection.getresponse()
+        return response.status, response.getheader('Content-Type'), response.read()
+    finally:
+        connection.close()
+
+
+def _post_frame(server, body, content_type, path='/predict'):
+    return _post(server, body, {'Content-Type': content_type, 'Content-Length': str(len(body))}, path)
+
+
+def test_columnar_batch_is_predicted(server):
+    df = make_clinical_frame(rows=60)
+    
+    status, content_type, body = _post_frame(
+        server, encode_frame(df), COLUMNAR_CONTENT_TYPE, '/predict?balance=false'
+    )
+    
+    assert status == 200
+    assert content_type == COLUMNAR_CONTENT_TYPE
+    frame, metadata = decode_frame(body)
+    assert len(frame) == 60
+    assert metadata['total_records'] == 60
+    assert frame['Paciente_ID'].astype(int).tolist() == df['ID'].tolist()
+
+
+@pytest.mark.parametrize('body', [b'{no es json', b'"texto"', b'{"records": [1, 2]}', b'{"metadata": []}'])
+def test_invalid_json_batch_is_rejected(server, body):
+    status, _, response = _post_frame(server, body, JSON_CONTENT_TYPE)
+    
+    assert status == 400
+    assert 'error' in json.loads(response)
+
+
+def test_invalid_columnar_header_is_rejected(server):
+    header = json.dumps({'rows': 2, 'columns': [{'name': 'Edad', 'dtype': '<f8'}]}).encode('utf-8')
+    body = COLUMNAR_MAGIC + struct.pack('<I', len(header)) + header
+    
+    status, _, response = _post_frame(server, body, COLUMNAR_CONTENT_TYPE)
+    
+    assert status == 400
+    assert 'Edad' in json.loads(response)['error']
+
+
+def test_unknown_columnar_dtype_is_rejected(server):
+    header = json.dumps({
+        'rows': 1,
+        'columns': [{'name': 'Edad', 'dtype': '<M8[ns]', 'offset': 0, 'nbytes': 8}]
+    }).encode('utf-8')
+    body = COLUMNAR_MAGIC + struct.pack('<I', len(header)) + header + b'\0' * 8
+    
+    status, _, response = _post_frame(server, body, COLUMNAR_CONTENT_TYPE)
+    
+    assert status == 400
+    assert 'tipo no soportado' in json.loads(response)['error']
+
+
+def test_unsupported_content_type_is_rejected(server):
+    status, _, response = _post_frame(server, b'a,b\n1,2\n', 'text/csv')
+    
+    assert status == 415
+    assert COLUMNAR_CONTENT_TYPE in json.loads(response)['content_types']
+
+
+@pytest.mark.parametrize('length, expected_status', [(None, 411), ('abc', 411), ('-1', 400)])
+def test_invalid_content_length_is_rejected(server, length, expected_status):
+    headers = {'Content-Type': JSON_CONTENT_TYPE}
+    if length is not None:
+        headers['Content-Length'] = length
+    
+    status, _, response = _post(server, b'', headers)
+    
+    assert status == expected_status
+    assert 'error' in json.loads(response)
+
+
+def test_unknown_path_returns_404(server):
+    status, _, _ = _post_frame(server, b'[]', JSON_CONTENT_TYPE, '/otra')
+    
+    assert status == 404
+
+
+def test_encoding_failure_returns_json_error():
+    body = encode_frame(make_clinical_frame(rows=5))
+    
+    with PredictionServer(_BrokenResultsSystem(), port=0) as broken_server:
+        status, content_type, response = _post_frame(broken_server, body, COLUMNAR_CONTENT_TYPE)
+    
+    assert status == 500
+    assert content_type == 'application/json'
+    assert 'codificar' in json.loads(response)['error']
@@ -0,0 +1,56 @@
+"""Pruebas del balanceo SMOTE."""
+
+import numpy as np
+import pandas as pd
+
+from data_processor import frame_row_keys
+from smote_balancing import SMOTEBalancer
+
+
+def test_pair_hashes_match_per_row_hash():
+    balancer = SMOTEBalancer()
+    seed = 12345
+    numbers = list(range(40, 60))
+    keys = [f"[('index', {i!r}), ('seed', {seed!r})]" for i in numbers]
+    
+    hashes = balancer._hash_keys(keys, [seed + i * 2 for i in numbers])
+    
+    expected = [balancer._get_data_hash({'index': i, 'seed': seed}, seed + i * 2) for i in numbers]
+    assert hashes.tolist() == expected
+
+
+def test_numeric_values_treat_none_as_zero_and_keep_nan():
+    column = pd.Series([' 1.5', None, np.nan, 4], dtype=object)
+    
+    values = SMOTEBalancer()._numeric_values(column)
+    
+    assert values[0] == 1.5
+    assert values[1] == 0.0
+    assert np.isnan(values[2])
+    assert values[3] == 4.0
+
+
+def test_balanced_blocks_match_full_balancing(clinical_csv):
+    df = pd.read_csv(clinical_csv)
+    labels = ['Dengue', 'Malaria', 'Leptospirosis']
+    balancer = SMOTEBalancer()
+    
+    full = balancer.balance_classes(df, 'Diagnóstico', labels)
+    blocks = pd.concat(balancer.iter_balanced_blocks(df, 'Diagnóstico', labels, block_size=37))
+    
+    assert full['Diagnóstico'].value_counts().nunique() == 1
+    assert frame_row_keys(blocks) == frame_row_keys(full)
+
+
+def test_columns_with_the_same_initial_draw_independently():
+    df = pd.DataFrame({
+        'Fiebre': ['Alta', 'Baja'] + ['Alta'] * 60,
+        'Fatiga': ['Alta', 'Baja'] + ['Alta'] * 60,
+        'Diagnóstico': ['Malaria'] * 2 + ['Dengue'] * 60
+    })
+    
+    balanced = SMOTEBalancer().balance_classes(df, 'Diagnóstico', ['Dengue', 'Malaria'])
+    
+    synthetic = balanced[balanced['Diagnóstico'] == 'Malaria'].iloc[2:]
+    assert len(synthetic) == 58
+    assert (synthetic['Fiebre'] != synthetic['Fatiga']).any()
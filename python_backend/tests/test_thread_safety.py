@@ -0,0 +1,68 @@
+"""Pruebas de reproducibilidad y de predicción concurrente sin estado aleatorio compartido."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from conftest import make_clinical_frame
+from main import BatchPredictionSystem
+from prediction_models import FeatureMatrix, MODEL_REGISTRY
+
+
+def _outputs(results):
+    return results['predictions'], results['confusion_matrix'], results['balanced_counts']
+
+
+def test_random_seed_drives_model_draws():
+    features = FeatureMatrix.from_frame(make_clinical_frame(), 'Diagnóstico')
+    
+    for model_class in MODEL_REGISTRY.values():
+        same = model_class(random_seed=5).random_draws(features)
+        assert np.array_equal(same, model_class(random_seed=5).random_draws(features))
+        assert not np.array_equal(same, model_class(random_seed=6).random_draws(features))
+
+
+def test_concurrent_runs_match_serial_runs():
+    frames = [make_clinical_frame(rows=300, seed=seed) for seed in range(4)]
+    jobs = [
+        (model_type, seed, frame)
+        for model_type in MODEL_REGISTRY
+        for seed, frame in zip((11, 12), frames)
+    ]
+    shared = BatchPredictionSystem(random_seed=11)
+    
+    def run(job):
+        model_type, seed, frame = job
+        system = BatchPredictionSystem(model_type=model_type, random_seed=seed)
+        return _outputs(system.process_frame(frame))
+    
+    def run_shared(frame):
+        # Una misma instancia atendiendo varios lotes a la vez, como PredictionServer
+        return _outputs(shared.process_frame(frame))
+    
+    expected = [run(job) for job in jobs]
+    expected_shared = [run_shared(frame) for frame in frames]
+    
+    # Otro hilo reinicia y consume el estado aleatorio global de NumPy: si algún
+    # componente dependiera de él, las ejecuciones en hilos diferirían
+    stop = threading.Event()
+    
+    def disturb_global_state():
+        while not stop.is_set():
+            np.random.seed(time.perf_counter_ns() % 2**32)
+            np.random.random(1000)
+    
+    disturber = threading.Thread(target=disturb_global_state, daemon=True)
+    disturber.start()
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            concurrent = list(executor.map(run, jobs * 2))
+            concurrent_shared = list(executor.map(run_shared, frames * 2))
+    finally:
+        stop.set()
+        disturber.join()
+    
+    assert concurrent == expected * 2
+    assert concurrent_shared == expected_shared * 2
@@ -0,0 +1,103 @@
+"""Pruebas de ida y vuelta de los formatos de transporte."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_clinical_frame
+from transport import (
+    ARROW_CONTENT_TYPE,
+    COLUMNAR_CONTENT_TYPE,
+    JSON_CONTENT_TYPE,
+    PYARROW_AVAILABLE,
+    decode_frame,
+    encode_frame,
+    encode_results,
+    supported_content_types
+)
+
+CONTENT_TYPES = [
+    COLUMNAR_CONTENT_TYPE,
+    JSON_CONTENT_TYPE,
+    pytest.param(
+        ARROW_CONTENT_TYPE,
+        marks=pytest.mark.skipif(not PYARROW_AVAILABLE, reason="requiere pyarrow")
+    )
+]
+
+
+def _frame_with_missing_values() -> pd.DataFrame:
+    df = make_clinical_frame(rows=50)
+    df.loc[3, 'Temperatura'] = np.nan
+    df['Ciudad'] = df['Ciudad'].astype(object)
+    df.loc[7, 'Ciudad'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('content_type', CONTENT_TYPES)
+def test_frame_round_trip(content_type):
+    df = _frame_with_missing_values()
+    metadata = {'origen': 'prueba', 'lote': 3}
+    
+    decoded, decoded_metadata = decode_frame(encode_frame(df, content_type, metadata), content_type)
+    
+    assert decoded_metadata == metadata
+    assert list(decoded.columns) == list(df.columns)
+    for name in ('ID', 'Plaquetas', 'Temperatura', 'Hemoglobina', 'Edad'):
+        np.testing.assert_array_equal(decoded[name].to_numpy(dtype=float), df[name].to_numpy(dtype=float))
+    for name in ('Fiebre', 'Ciudad', 'Diagnóstico'):
+        assert decoded[name].astype(object).where(decoded[name].notna(), None).tolist() == \
+            df[name].where(df[name].notna(), None).tolist()
+
+
+def test_columnar_keeps_numeric_dtypes_and_categorizes_text():
+    df = make_clinical_frame(rows=20)
+    
+    decoded, _ = decode_frame(encode_frame(df))
+    
+    assert decoded['Plaquetas'].dtype == df['Plaquetas'].dtype
+    assert decoded['Temperatura'].dtype == np.float64
+    assert isinstance(decoded['Diagnóstico'].dtype, pd.CategoricalDtype)
+
+
+@pytest.mark.parametrize('content_type', CONTENT_TYPES)
+def test_results_round_trip(content_type):
+    results = {
+        'model_type': 'logistic',
+        'total_records': 3,
+        'original_counts': {'Dengue': 2, 'Malaria': 1},
+        'predictions': ['Dengue', 'Malaria', 'Dengue'],
+        'actual': ['Dengue', 'Dengue', 'Malaria'],
+        'patient_ids': [1001, 1002, None],
+        'confusion_matrix': [[1, 1], [1, 0]]
+    }
+    
+    frame, metadata = decode_frame(
+        encode_results(results, content_type, ['Dengue', 'Malaria']),
+        content_type
+    )
+    
+    assert frame['Prediccion'].astype(object).tolist() == results['predictions']
+    assert frame['Diagnostico_Real'].astype(object).tolist() == results['actual']
+    assert frame['Paciente_ID'].astype(object).where(frame['Paciente_ID'].notna(), None).tolist() == \
+        results['patient_ids']
+    assert metadata['class_labels'] == ['Dengue', 'Malaria']
+    assert metadata['confusion_matrix'] == results['confusion_matrix']
+    assert metadata['original_counts'] == results['original_counts']
+
+
+def test_columnar_rejects_malformed_messages():
+    payload = encode_frame(make_clinical_frame(rows=10))
+    
+    with pytest.raises(ValueError):
+        decode_frame(b'no es columnar')
+    with pytest.raises(ValueError):
+        decode_frame(payload[:-16])
+
+
+def test_unknown_content_type_is_rejected():
+    assert 'text/csv' not in supported_content_types()
+    with pytest.raises(ValueError):
+        encode_frame(make_clinical_frame(rows=5), 'text/csv')
+    with pytest.raises(ValueError):
+        decode_frame(b'', 'text/csv')
@@ -0,0 +1,113 @@
+"""
+Módulo para barrido de puntos de corte clínicos: evalúa muchas combinaciones de
+umbrales de las reglas de predicción sobre una sola matriz de características.
+"""
+
+import itertools
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Sequence
+
+from prediction_models import FeatureMatrix, RuleBasedModel
+from metrics_calculator import MetricsCalculator
+
+
+class ThresholdSweep:
+    """Evalúa combinaciones de umbrales de un modelo basado en reglas."""
+    
+    def __init__(
+        self,
+        model: RuleBasedModel,
+        class_labels: List[str],
+        max_elements: int = 4_000_000
+    ):
+        """
+        Inicializa el barrido.
+        
+        Args:
+            model: Modelo basado en reglas cuyos umbrales se van a variar
+            class_labels: Lista de etiquetas de clase
+            max_elements: Máximo de celdas (combinaciones × registros) evaluadas a la
+                vez; limita la memoria de cada bloque de combinaciones
+        """
+        if not isinstance(model, RuleBasedModel):
+            raise ValueError("El barrido de umbrales requiere un modelo basado en reglas")
+        
+        self.model = model
+        self.class_labels = class_labels
+        self.max_elements = max_elements
+        self.metrics_calculator = MetricsCalculator(class_labels)
+    
+    def run(
+        self,
+        features: FeatureMatrix,
+        grid: Dict[str, Sequence[float]]
+    ) -> pd.DataFrame:
+        """
+        Evalúa todas las combinaciones de la grilla de umbrales.
+        
+        Los umbrales que no aparecen en la grilla conservan el valor del modelo. El
+        hash determinístico de cada registro se calcula una sola vez; cada bloque de
+        combinaciones se evalúa por broadcasting (combinaciones × registros) y sus
+        matrices de confusión se obtienen con un único conteo.
+        
+        Args:
+            features: Matriz de características
+            grid: Valores a probar por nombre de umbral
+            
+        Returns:
+            DataFrame con una fila por combinación: los umbrales, las métricas y la
+            matriz de confusión
+        """
+        if not grid:
+            raise ValueError("La grilla de umbrales está vacía")
+        # Valida los nombres de los umbrales
+        self.model.resolve_thresholds({name: values[0] for name, values in grid.items()})
+        
+        names = list(grid)
+        combinations = np.array(
+            list(itertools.product(*[list(grid[name]) for name in names])),
+            dtype=float
+        ).reshape(-1, len(names))
+        
+        # Solo se evalúan registros con diagnóstico real conocido
+        actual_codes = features.label_codes(self.class_labels)
+        valid = actual_codes >= 0
+        
+        rand = self.model.random_draws(features)
+        # Código de cada clase del modelo (prediction_labels) entre las del barrido
+        rule_to_class = pd.Index(self.class_labels).get_indexer(self.model.prediction_labels)
+        
+        num_classes = len(self.class_labels)
+        cells = num_classes * num_classes
+        block_size = max(1, self.max_elements // max(1, features.size))
+        confusion_matrices = np.zeros((len(combinations), num_classes, num_classes), dtype=np.int64)
+        
+        for start in range(0, len(combinations), block_size):
+            block = combinations[start:start + block_size]
+            thresholds = dict(self.model.thresholds)
+            for position, name in enumerate(names):
+                thresholds[name] = block[:, position:position + 1]
+            
+            codes = np.broadcast_to(
+                self.model.rule_codes(features, rand, thresholds),
+                (len(block), features.size)
+            )
+            predicted = np.where(rand < self.model.base_accuracy, actual_codes, rule_to_class[codes])
+            
+            # Pares (real, predicho) válidos, desplazados por combinación para un solo bincount
+            keep = valid & (predicted >= 0)
+            flat = actual_codes * num_classes + predicted
+            flat = flat + (np.arange(len(block)) * cells)[:, np.newaxis]
+            counts = np.bincount(flat[keep], minlength=len(block) * cells)
+            confusion_matrices[start:start + len(block)] = counts.reshape(len(block), num_classes, num_classes)
+        
+        metrics = self.metrics_calculator.calculate_metrics_batch(confusion_matrices)
+        
+        table = pd.DataFrame(combinations, columns=names)
+        for name, values in metrics.items():
+            table[name] = values
+        table['confusion_matrix'] = [matrix.tolist() for matrix in confusion_matrices]
+        
+        return table
+
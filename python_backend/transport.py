@@ -0,0 +1,342 @@
+"""
+Módulo de transporte binario de lotes entre el frontend y el backend.
+
+Codifica tablas de registros (y de resultados) por columnas, sin objetos por fila:
+    
+    application/x-prediccion-columnar  Formato propio con búferes de NumPy
+    application/vnd.apache.arrow.stream  Arrow IPC (requiere pyarrow)
+    application/json  Lista de registros, para clientes sin soporte binario
+
+Formato columnar (todos los enteros en little-endian):
+    
+    8 bytes   b'PRDCOL01' (identificador y versión)
+    4 bytes   Longitud del encabezado (uint32)
+    N bytes   Encabezado JSON en UTF-8:
+                  {"rows": n, "metadata": {...}, "columns": [
+                      {"name": ..., "dtype": "<f8", "offset": o, "nbytes": b},
+                      {"name": ..., "dtype": "<i4", "offset": o, "nbytes": b,
+                       "categories": [...]}, ...]}
+    búferes   Datos de cada columna, alineados a 8 bytes. "offset" se cuenta
+              desde el final del encabezado.
+
+Las columnas numéricas y booleanas se envían tal cual. Las demás se codifican por
+diccionario: códigos int32 (-1 para valores faltantes) y la lista de categorías en
+el encabezado; al decodificar quedan como columnas categóricas.
+"""
+
+import json
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+COLUMNAR_CONTENT_TYPE = 'application/x-prediccion-columnar'
+ARROW_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+JSON_CONTENT_TYPE = 'application/json'
+
+COLUMNAR_MAGIC = b'PRDCOL01'
+
+# Campos de los resultados que viajan como metadatos de la respuesta
+RESULT_METADATA_FIELDS = (
+    'model_type', 'total_records', 'original_counts', 'balanced_counts',
+    'metrics', 'confusion_matrix'
+)
+
+# Clave de los metadatos propios en el esquema Arrow
+_ARROW_METADATA_KEY = b'prediccion'
+_ALIGNMENT = 8
+
+# Tipos de columna aceptados en el formato columnar (los que produce encode_frame)
+_COLUMNAR_DTYPES = frozenset([
+    '|b1', '|i1', '|u1', '<i2', '<u2', '<i4', '<u4', '<i8', '<u8', '<f2', '<f4', '<f8'
+])
+
+
+def supported_content_types() -> List[str]:
+    """
+    Lista los formatos que se pueden codificar y decodificar en este entorno.
+    
+    Returns:
+        Tipos de contenido, del más compacto al menos compacto
+    """
+    content_types = [COLUMNAR_CONTENT_TYPE, JSON_CONTENT_TYPE]
+    if PYARROW_AVAILABLE:
+        content_types.insert(1, ARROW_CONTENT_TYPE)
+    return content_types
+
+
+def encode_frame(
+    df: pd.DataFrame,
+    content_type: str = COLUMNAR_CONTENT_TYPE,
+    metadata: Optional[Dict[str, Any]] = None
+) -> bytes:
+    """
+    Codifica un DataFrame y sus metadatos en el formato indicado.
+    
+    Args:
+        df: Registros a codificar
+        content_type: Formato de salida (ver supported_content_types)
+        metadata: Datos adicionales serializables en JSON (métricas, opciones, ...)
+        
+    Returns:
+        Bytes del mensaje
+        
+    Raises:
+        ValueError: Si el formato no es válido o no está disponible
+    """
+    metadata = metadata or {}
+    if content_type == COLUMNAR_CONTENT_TYPE:
+        return _encode_columnar(df, metadata)
+    if content_type == ARROW_CONTENT_TYPE:
+        return _encode_arrow(df, metadata)
+    if content_type == JSON_CONTENT_TYPE:
+        # JSON no admite NaN: los valores faltantes se envían como null
+        records = df.astype(object).where(df.notna(), None).to_dict('records')
+        return _dump_json({'records': records, 'metadata': metadata})
+    
+    raise ValueError(f"Formato de transporte no soportado: {content_type}")
+
+
+def decode_frame(
+    payload: bytes,
+    content_type: str = COLUMNAR_CONTENT_TYPE
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Decodifica un mensaje en un DataFrame y sus metadatos.
+    
+    Las columnas numéricas del formato columnar son vistas sobre el mensaje (sin
+    copia); las codificadas por diccionario quedan como columnas categóricas.
+    
+    Args:
+        payload: Bytes del mensaje
+        content_type: Formato del mensaje
+        
+    Returns:
+        Tupla con (DataFrame, metadatos)
+        
+    Raises:
+        ValueError: Si el formato no es válido o el mensaje está mal formado
+    """
+    if content_type == COLUMNAR_CONTENT_TYPE:
+        return _decode_columnar(payload)
+    if content_type == ARROW_CONTENT_TYPE:
+        return _decode_arrow(payload)
+    if content_type == JSON_CONTENT_TYPE:
+        try:
+            message = json.loads(payload)
+        except ValueError as e:
+            raise ValueError(f"Mensaje JSON inválido: {str(e)}")
+        if isinstance(message, list):
+            message = {'records': message}
+        if not isinstance(message, dict):
+            raise ValueError("El mensaje JSON debe ser una lista de registros o un objeto con 'records'")
+        records = message.get('records', [])
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise ValueError("'records' debe ser una lista de objetos")
+        metadata = message.get('metadata', {})
+        if not isinstance(metadata, dict):
+            raise ValueError("'metadata' debe ser un objeto")
+        
+        df = pd.DataFrame.from_records(records)
+        # Los null de columnas de texto quedan como NaN, igual que al leer un CSV
+        for name in df.columns:
+            if df[name].dtype == object:
+                df[name] = df[name].where(df[name].notna(), np.nan)
+        return df, metadata
+    
+    raise ValueError(f"Formato de transporte no soportado: {content_type}")
+
+
+def encode_results(
+    results: Dict[str, Any],
+    content_type: str = COLUMNAR_CONTENT_TYPE,
+    class_labels: Optional[List[str]] = None
+) -> bytes:
+    """
+    Codifica los resultados de una predicción por lotes.
+    
+    La tabla tiene una fila por registro predicho (Paciente_ID, Diagnostico_Real,
+    Prediccion); los registros sintéticos del balanceo tienen Paciente_ID vacío.
+    Las métricas, la matriz de confusión y los conteos van en los metadatos.
+    
+    Args:
+        results: Resultados de BatchPredictionSystem.process_frame o process_file
+        content_type: Formato de salida
+        class_labels: Etiquetas de clase, en el orden de la matriz de confusión
+        
+    Returns:
+        Bytes del mensaje
+    """
+    frame = pd.DataFrame({
+        'Paciente_ID': pd.Series(
+            results.get('patient_ids') or range(1, len(results['predictions']) + 1),
+            dtype=object
+        ),
+        'Diagnostico_Real': results['actual'],
+        'Prediccion': results['predictions']
+    })
+    metadata = {name: results[name] for name in RESULT_METADATA_FIELDS if name in results}
+    if class_labels is not None:
+        metadata['class_labels'] = list(class_labels)
+    
+    return encode_frame(frame, content_type, metadata)
+
+
+def _encode_columnar(df: pd.DataFrame, metadata: Dict[str, Any]) -> bytes:
+    """Codifica un DataFrame en el formato columnar propio."""
+    columns = []
+    buffers = []
+    offset = 0
+    
+    for name in df.columns:
+        series = df[name]
+        entry: Dict[str, Any] = {'name': str(name)}
+        
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biuf':
+            values = np.ascontiguousarray(series.to_numpy(), dtype=series.dtype.newbyteorder('<'))
+        else:
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                categories = series.cat.categories
+            else:
+                codes, categories = pd.factorize(series, use_na_sentinel=True)
+            values = np.ascontiguousarray(codes, dtype='<i4')
+            entry['categories'] = [_json_value(value) for value in categories.tolist()]
+        
+        data = values.tobytes()
+        padding = -len(data) % _ALIGNMENT
+        entry.update({'dtype': values.dtype.str, 'offset': offset, 'nbytes': len(data)})
+        columns.append(entry)
+        buffers.append(data + b'\0' * padding)
+        offset += len(data) + padding
+    
+    header = _dump_json({'rows': len(df), 'metadata': metadata, 'columns': columns})
+    # El bloque de datos empieza alineado a 8 bytes
+    header += b' ' * (-(len(COLUMNAR_MAGIC) + 4 + len(header)) % _ALIGNMENT)
+    
+    return b''.join([COLUMNAR_MAGIC, struct.pack('<I', len(header)), header] + buffers)
+
+
+def _decode_columnar(payload: bytes) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Decodifica un mensaje del formato columnar propio."""
+    prefix = len(COLUMNAR_MAGIC) + 4
+    if len(payload) < prefix or payload[:len(COLUMNAR_MAGIC)] != COLUMNAR_MAGIC:
+        raise ValueError("El mensaje no tiene el formato columnar esperado")
+    
+    (header_length,) = struct.unpack_from('<I', payload, len(COLUMNAR_MAGIC))
+    data_start = prefix + header_length
+    try:
+        header = json.loads(payload[prefix:data_start])
+    except ValueError as e:
+        raise ValueError(f"Encabezado columnar inválido: {str(e)}")
+    _validate_columnar_header(header)
+    
+    rows = header['rows']
+    data = {}
+    for entry in header['columns']:
+        dtype = np.dtype(entry['dtype'])
+        start = data_start + entry['offset']
+        if entry['nbytes'] != rows * dtype.itemsize or start + entry['nbytes'] > len(payload):
+            raise ValueError(f"Columna '{entry['name']}' truncada o con tamaño inválido")
+        
+        values = np.frombuffer(payload, dtype=dtype, count=rows, offset=start)
+        if 'categories' in entry:
+            try:
+                categories = pd.Index(entry['categories'], dtype=object)
+                values = pd.Categorical.from_codes(values, categories=categories)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Columna '{entry['name']}' con categorías inválidas: {str(e)}")
+        data[entry['name']] = values
+    
+    return pd.DataFrame(data, columns=[entry['name'] for entry in header['columns']]), header.get('metadata', {})
+
+
+def _validate_columnar_header(header: Any):
+    """
+    Verifica la estructura del encabezado columnar antes de usarlo.
+    
+    Raises:
+        ValueError: Si falta un campo o tiene un tipo o valor no válido
+    """
+    def is_count(value: Any) -> bool:
+        return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+    
+    if not isinstance(header, dict):
+        raise ValueError("El encabezado columnar debe ser un objeto JSON")
+    if not is_count(header.get('rows')):
+        raise ValueError("El encabezado columnar no indica una cantidad de filas válida")
+    if not isinstance(header.get('columns'), list):
+        raise ValueError("El encabezado columnar no tiene la lista de columnas")
+    if not isinstance(header.get('metadata', {}), dict):
+        raise ValueError("Los metadatos del encabezado columnar deben ser un objeto")
+    
+    for entry in header['columns']:
+        if not isinstance(entry, dict) or not isinstance(entry.get('name'), str):
+            raise ValueError("Columna sin nombre en el encabezado columnar")
+        if entry.get('dtype') not in _COLUMNAR_DTYPES:
+            raise ValueError(f"Columna '{entry['name']}' con tipo no soportado: {entry.get('dtype')}")
+        if not is_count(entry.get('offset')) or not is_count(entry.get('nbytes')):
+            raise ValueError(f"Columna '{entry['name']}' con posición o tamaño inválido")
+        if 'categories' in entry:
+            if not isinstance(entry['categories'], list):
+                raise ValueError(f"Columna '{entry['name']}' con categorías inválidas")
+            if np.dtype(entry['dtype']).kind not in 'iu':
+                raise ValueError(f"Columna '{entry['name']}' codificada por diccionario sin códigos enteros")
+
+
+def _encode_arrow(df: pd.DataFrame, metadata: Dict[str, Any]) -> bytes:
+    """Codifica un DataFrame como flujo Arrow IPC."""
+    if not PYARROW_AVAILABLE:
+        raise ValueError("El formato Arrow requiere pyarrow (pip install pyarrow)")
+    
+    table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[_ARROW_METADATA_KEY] = _dump_json(metadata)
+    table = table.replace_schema_metadata(schema_metadata)
+    
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _decode_arrow(payload: bytes) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Decodifica un flujo Arrow IPC."""
+    if not PYARROW_AVAILABLE:
+        raise ValueError("El formato Arrow requiere pyarrow (pip install pyarrow)")
+    
+    try:
+        table = pyarrow.ipc.open_stream(payload).read_all()
+    except pyarrow.ArrowInvalid as e:
+        raise ValueError(f"Mensaje Arrow inválido: {str(e)}")
+    
+    try:
+        metadata = json.loads((table.schema.metadata or {}).get(_ARROW_METADATA_KEY, b'{}'))
+    except ValueError as e:
+        raise ValueError(f"Metadatos Arrow inválidos: {str(e)}")
+    if not isinstance(metadata, dict):
+        raise ValueError("Los metadatos Arrow deben ser un objeto")
+    return table.to_pandas(), metadata
+
+
+def _json_value(value: Any) -> Any:
+    """Convierte escalares de NumPy en valores nativos serializables."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _dump_json(value: Any) -> bytes:
+    """Serializa en JSON compacto, aceptando escalares y arreglos de NumPy."""
+    def default(obj: Any) -> Any:
+        if isinstance(obj, (np.generic, np.ndarray)):
+            return obj.tolist()
+        return str(obj)
+    
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=default).encode('utf-8')